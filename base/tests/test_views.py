@@ -49,6 +49,7 @@ class HomeViewTestCase(TestCase):
         self.assertIn(reverse('signup'), links)
 
     def test_logged_in_with_matches(self):
+        Team(player=self.player2, game=self.game1).save()
         self.client.login(
             username=self.user1.username,
             password='password'
@@ -66,6 +67,7 @@ class HomeViewTestCase(TestCase):
         self.assertIn(reverse('game', args=[self.game1.id]), links)
         self.assertNotIn(reverse('game', args=[self.game2.id]), links)
         self.assertIn(reverse('create_game'), links)
+        self.assertIn('vs. user2', pq('.container li a').text())
 
     def test_logged_in_without_matches(self):
         self.client.login(
@@ -124,6 +126,7 @@ class SignupViewTestCase(TestCase):
         player = Player.objects.all().order_by('-id')[0]
 
         self.assertEqual(player.user.username, 'newuser')
+        self.assertEqual(player.stats.in_progress_count, 0)
         self.assertTrue(player.user.check_password('password'))
         self.assertRedirects(resp, reverse('home'))
         self.assertIn('_auth_user_id', self.client.session)
@@ -7,11 +7,11 @@ from django.http import HttpResponseRedirect
 from django.shortcuts import render
 from django.views.generic import View
 
-from games.models import Team
-from games.presentation import GamePresenter
+from games.presentation import GameSummaryPresenter
 from players.forms import UserForm
 from players.forms import PlayerForm
 from players.models import Player
+from players.models import PlayerStats
 
 
 class HomeView(View):
@@ -22,11 +22,7 @@ class HomeView(View):
         context = {}
         if request.user.is_authenticated():
             player = Player.objects.get(user=request.user)
-            teams = Team.objects.filter(player=player)
-            context['games'] = [
-                GamePresenter.from_game(team.game)
-                for team in teams if team.alive
-            ]
+            context['games'] = GameSummaryPresenter.for_player(player)
         return render(request, self.template_name, context)
 
 
@@ -55,6 +51,7 @@ class SignupView(View):
 
             player = Player(user=user)
             player.save()
+            PlayerStats(player=player).save()
 
             user = authenticate(
                 username=user_form.cleaned_data['username'],
@@ -47,6 +47,7 @@ LOCAL_APPS = (
     'base',
     'games',
     'players',
+    'benchmarks',
 )
 
 INSTALLED_APPS = DEFAULT_APPS + THIRD_PARTY_APPS + LOCAL_APPS
@@ -131,3 +132,13 @@ STATICFILES_DIRS = (
 )
 
 LOGIN_URL = '/login/'
+
+# Publish/subscribe hub used to push game events to players.
+# LocalEventHub only reaches players connected to the same process; use
+# games.events.CacheEventHub with a shared cache when running several workers.
+GAMES_EVENT_HUB = 'games.events.LocalEventHub'
+# Seconds an event stream stays open before the client reconnects
+GAMES_EVENT_STREAM_TIMEOUT = 60
+# Cache holding the heatmaps of likely ship positions shown on opponents'
+# boards. Use a shared cache when running several workers.
+GAMES_HEATMAP_CACHE = 'default'
@@ -19,6 +19,7 @@ from django.contrib import admin
 urlpatterns = [
     url(r'^games/', include('games.urls')),
     url(r'^players/', include('players.urls')),
+    url(r'^', include('players.leaderboard_urls')),
     url(r'^admin/', include(admin.site.urls)),
 
     url(r'', include('base.urls')),
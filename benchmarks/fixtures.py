@@ -0,0 +1,184 @@
+import random
+from collections import OrderedDict
+from collections import namedtuple
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+
+from games.ai import choose_shot
+from games.history import SNAPSHOT_INTERVAL
+from games.history import attack_events
+from games.history import creation_events
+from games.history import take_snapshot
+from games.models import Game
+from games.models import GameEvent
+from games.models import GameSnapshot
+from games.models import MAX_PLAYERS
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.persistence import StoredGame
+from games.util import make_ships
+from games.util import place_ships
+from players.models import Player
+from players.models import PlayerStats
+from players.util import compute_stats
+
+# Games are spread evenly across these stages, each the fraction of the hits
+# needed to win which have been made. Finished games are played until won.
+STAGES = OrderedDict([
+    ('new', 0.0),
+    ('early', 0.25),
+    ('midgame', 0.5),
+    ('late', 0.9),
+    ('finished', 1.0),
+])
+# Numbers of teams games are drawn from. Most are between two players.
+TEAM_COUNTS = [2, 2, 2, 3, MAX_PLAYERS]
+PASSWORD = 'password'
+
+
+class Fixture(namedtuple('Fixture', ['player_ids', 'game_ids'])):
+    """Ids of the players and games generated, with game_ids a list of ids
+    for each stage in STAGES."""
+
+    def games(self, stage):
+        return list(
+            Game.objects.filter(id__in=self.game_ids[stage]).order_by('id')
+        )
+
+
+def create_players(count, prefix='player'):
+    """Creates count players in bulk, all with the password PASSWORD, and
+    returns their ids."""
+    # Hashed once, as hashing a password for every player is slow
+    password = make_password(PASSWORD)
+    usernames = ['{}-{}'.format(prefix, i) for i in range(count)]
+    User.objects.bulk_create([
+        User(username=username, password=password)
+        for username in usernames
+    ])
+    Player.objects.bulk_create([
+        Player(user=user)
+        for user in User.objects.filter(username__in=usernames)
+    ])
+    return list(
+        Player.objects.filter(
+            user__username__in=usernames
+        ).order_by('id').values_list('id', flat=True)
+    )
+
+
+def create_game(players, rng):
+    """Creates a game between players as CreateGameView does, with the first
+    player moving first, and returns it loaded into a StoredGame."""
+    game = Game(alive_count=len(players))
+    game.save()
+
+    fleets = [
+        make_ships(None, game.get_fleet(), rng, game.width, game.height)
+        for player in players
+    ]
+    new_teams = []
+    for i, (player, ships) in enumerate(zip(players, fleets)):
+        team = Team(player=player, game=game, last_turn=i - len(players))
+        place_ships(team, ships, game.width, game.height)
+        new_teams.append(team)
+    Team.objects.bulk_create(new_teams)
+
+    teams = list(game.teams.order_by('id'))
+    for team, ships in zip(teams, fleets):
+        for ship in ships:
+            ship.team = team
+    Ship.objects.bulk_create([ship for ships in fleets for ship in ships])
+    GameEvent.objects.bulk_create(creation_events(game, teams, fleets))
+
+    game.next_team = teams[0]
+    game.save(update_fields=['next_team'])
+    return StoredGame.load(game)
+
+
+def play_game(stored_game, progress, rng):
+    """Plays bots' moves in a stored game until progress, the fraction of
+    the hits needed to win, has been made or the game is won. The shots are
+    saved and logged in bulk."""
+    engine = stored_game.engine
+    game = stored_game.game
+    team_count = len(engine.team_ids)
+    # Every team but the winner is sunk by the end of the game
+    hits_to_win = sum(
+        bin(mask).count('1') for mask in engine.occupancy_masks
+    ) * (team_count - 1) // team_count
+    target_hits = hits_to_win * progress if progress < 1 else float('inf')
+
+    hits = 0
+    attacks = []
+    snapshots = []
+    while hits < target_hits and engine.winner() is None:
+        attacking_team = stored_game.team(engine.next_team())
+        # No time budget, so the same seed always plays the same moves
+        move = choose_shot(engine, attacking_team.id, rng, budget=float('inf'))
+        if move is None:
+            break
+        target_id, x, y = move
+
+        shot = Shot(
+            game=game,
+            attacking_team=attacking_team,
+            defending_team=stored_game.team(target_id),
+            x=x,
+            y=y,
+            turn=engine.turn
+        )
+        shot.result = engine.fire(target_id, x, y)
+        if shot.result != Shot.RESULTS['MISS']:
+            hits += 1
+        attacks.append({
+            'game': game,
+            'shot': shot,
+            'defending_team': stored_game.team(target_id),
+        })
+        if engine.turn % SNAPSHOT_INTERVAL == 0:
+            snapshots.append(take_snapshot(game, engine))
+
+    Shot.objects.bulk_create([attack['shot'] for attack in attacks])
+    GameEvent.objects.bulk_create(attack_events(attacks))
+    GameSnapshot.objects.bulk_create(snapshots)
+    stored_game.save()
+
+
+def generate(player_count, game_count, seed=0):
+    """Creates player_count players and game_count games between them, spread
+    across STAGES and played by bots, then each player's stats. The same
+    seed always generates the same games. Returns a Fixture."""
+    rng = random.Random(seed)
+    player_ids = create_players(player_count)
+    players = list(Player.objects.filter(id__in=player_ids).order_by('id'))
+
+    stages = list(STAGES.items())
+    game_ids = OrderedDict((stage, []) for stage in STAGES)
+    for i in range(game_count):
+        team_count = min(rng.choice(TEAM_COUNTS), len(players))
+        stage, progress = stages[i % len(stages)]
+        stored_game = create_game(rng.sample(players, team_count), rng)
+        play_game(stored_game, progress, rng)
+        game_ids[stage].append(stored_game.game.id)
+
+    stats = compute_stats(players)
+    new_stats = []
+    for player in players:
+        win_count, loss_count, in_progress_count = stats.get(
+            player.id,
+            (0, 0, 0)
+        )
+        player_stats = PlayerStats(
+            player=player,
+            win_count=win_count,
+            loss_count=loss_count,
+            in_progress_count=in_progress_count
+        )
+        player_stats.update_ranking()
+        new_stats.append(player_stats)
+    PlayerStats.objects.bulk_create(new_stats)
+
+    return Fixture(player_ids=player_ids, game_ids=game_ids)
@@ -0,0 +1,151 @@
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+
+from benchmarks.fixtures import STAGES
+from benchmarks.fixtures import generate
+from benchmarks.results import compare
+from benchmarks.results import load_results
+from benchmarks.results import summarize
+from benchmarks.results import write_results
+from benchmarks.suite import BENCHMARKS
+from benchmarks.suite import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Generates a database of players and games in every stage, times '\
+        'the hot paths of the game against it and writes the results to a '\
+        'JSON file, optionally compared against a baseline from an earlier '\
+        'run. The database is a fresh test database, so the same seed '\
+        'always times the same games.'
+    # Benchmarks run against their own test database rather than the one in
+    # settings, so models needn't be checked
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--players',
+            type=int,
+            default=200,
+            help='Number of players to generate.'
+        )
+        parser.add_argument(
+            '--games',
+            type=int,
+            default=100,
+            help='Number of games to generate, spread across every stage '
+                 'from new to finished.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the generated players and games.'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=20,
+            help='Number of times each benchmark is timed.'
+        )
+        parser.add_argument(
+            '--only',
+            default=None,
+            help='Comma separated names of the benchmarks to run, out of: '
+                 '{}.'.format(', '.join(BENCHMARKS))
+        )
+        parser.add_argument(
+            '--output',
+            default='benchmark.json',
+            help='File to write the results to.'
+        )
+        parser.add_argument(
+            '--baseline',
+            default=None,
+            help='Results of an earlier run to compare against. The command '
+                 'fails if any benchmark is slower than the baseline by more '
+                 'than the tolerance.'
+        )
+        parser.add_argument(
+            '--tolerance',
+            type=float,
+            default=0.2,
+            help='Fraction slower than the baseline a benchmark may be.'
+        )
+
+    def handle(self, *args, **options):
+        if options['games'] < len(STAGES):
+            raise CommandError(
+                'At least {} games are needed, one in each stage.'.format(
+                    len(STAGES)
+                )
+            )
+        names = None
+        if options['only']:
+            names = options['only'].split(',')
+            unknown = [name for name in names if name not in BENCHMARKS]
+            if unknown:
+                raise CommandError(
+                    'Unknown benchmarks: {}'.format(', '.join(unknown))
+                )
+        baseline = None
+        if options['baseline']:
+            baseline = load_results(options['baseline'])
+
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(
+            verbosity=0,
+            autoclobber=True,
+            serialize=False
+        )
+        try:
+            fixture = generate(
+                options['players'],
+                options['games'],
+                options['seed']
+            )
+            timings = run_benchmarks(fixture, options['repeat'], names)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        summary = summarize(timings)
+
+        write_results(
+            options['output'],
+            summary,
+            players=options['players'],
+            games=options['games'],
+            seed=options['seed'],
+            repeat=options['repeat']
+        )
+        for name, result in summary.items():
+            self.stdout.write(
+                '{}: median {:.2f}ms min {:.2f}ms ({} samples)'.format(
+                    name,
+                    result['median'] * 1000,
+                    result['min'] * 1000,
+                    result['samples']
+                )
+            )
+        for name, samples in timings.items():
+            if not samples:
+                self.stdout.write('{}: no samples'.format(name))
+
+        if baseline is not None:
+            self.report_comparison(summary, baseline, options['tolerance'])
+
+    def report_comparison(self, summary, baseline, tolerance):
+        comparisons, regressions = compare(summary, baseline, tolerance)
+        for name, before, after, change in comparisons:
+            self.stdout.write(
+                '{}: {:.2f}ms -> {:.2f}ms ({:+.1%})'.format(
+                    name,
+                    before * 1000,
+                    after * 1000,
+                    change
+                )
+            )
+        if regressions:
+            raise CommandError(
+                'Slower than the baseline: {}'.format(', '.join(regressions))
+            )
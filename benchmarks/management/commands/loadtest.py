@@ -0,0 +1,295 @@
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.core.urlresolvers import resolve
+from django.core.urlresolvers import reverse
+from django.db import OperationalError
+from django.db import connection
+from django.test import Client
+
+from games.models import GAME_SIZE
+from games.models import Game
+from games.models import MAX_TEAMS
+from games.persistence import is_lock_error
+from games.views import GAME_BUSY_MESSAGE
+
+PASSWORD = 'loadtest'
+# Failed requests in a row after which a game is abandoned
+MAX_FAILURES = 10
+
+
+def percentile(timings, fraction):
+    """Returns the sample below which fraction of sorted timings fall."""
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+def is_busy(response):
+    """Checks if a view gave up waiting for a game's lock, which AttackView
+    reports with a message rather than an error status."""
+    return GAME_BUSY_MESSAGE in [
+        message.message
+        for message in get_messages(response.wsgi_request)
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Signs up synthetic players, creates games between them through '\
+        'CreateGameView and plays every game to completion through the '\
+        'site\'s URLs from a pool of threads, then reports the throughput, '\
+        'latency percentiles and errors of each endpoint. Everything '\
+        'created is deleted afterwards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--players',
+            type=int,
+            default=20,
+            help='Number of players to sign up.'
+        )
+        parser.add_argument(
+            '--teams',
+            type=int,
+            default=2,
+            help='Number of players in each game.'
+        )
+        parser.add_argument('--width', type=int, default=GAME_SIZE)
+        parser.add_argument('--height', type=int, default=GAME_SIZE)
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Number of threads making requests.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the players\' choices of shots.'
+        )
+
+    def handle(self, *args, **options):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = Counter()
+        self.lock_errors = 0
+
+        teams = options['teams']
+        if not 2 <= teams <= MAX_TEAMS:
+            raise CommandError(
+                'Games must have between 2 and {} players.'.format(MAX_TEAMS)
+            )
+        if options['players'] < teams:
+            raise CommandError('There aren\'t enough players for a game.')
+        prefix = 'loadtest-{}'.format(uuid.uuid4().hex[:8])
+        usernames = [
+            '{}-{}'.format(prefix, i)
+            for i in range(options['players'])
+        ]
+        self.threads = options['threads']
+        try:
+            start = time.time()
+            clients = dict(zip(usernames, self.run(self.sign_up, usernames)))
+            groups = [
+                usernames[i:i + teams]
+                for i in range(0, len(usernames) - teams + 1, teams)
+            ]
+            game_ids = self.run(
+                lambda group: self.create_game(
+                    clients,
+                    group,
+                    options['width'],
+                    options['height']
+                ),
+                groups
+            )
+            games = [
+                (game_id, group, random.Random(options['seed'] + i))
+                for i, (game_id, group) in enumerate(zip(game_ids, groups))
+                if game_id is not None
+            ]
+            self.run(lambda game: self.play(clients, *game), games)
+            elapsed = time.time() - start
+
+            self.report(elapsed, len(usernames), [
+                game_id for game_id, group, rng in games
+            ])
+        finally:
+            Game.objects.filter(
+                teams__player__user__username__in=usernames
+            ).delete()
+            User.objects.filter(username__in=usernames).delete()
+
+    def run(self, func, items):
+        """Calls func on each of items from the pool of threads, returning
+        the results in order."""
+        if self.threads == 1:
+            return [func(item) for item in items]
+
+        def call(item):
+            try:
+                return func(item)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(self.threads) as pool:
+            return list(pool.map(call, items))
+
+    def request(self, endpoint, method, path, data=None):
+        """Makes a request with a client's method, recording its time under
+        endpoint. Returns the response, or None if the request failed."""
+        error = None
+        start = time.time()
+        try:
+            response = method(path, data)
+        except Exception as e:
+            # Server errors are counted rather than ending the run
+            response = None
+            error = e
+        elapsed = time.time() - start
+
+        with self.lock:
+            self.timings[endpoint].append(elapsed)
+            if response is None or response.status_code >= 400:
+                self.errors[endpoint] += 1
+                if isinstance(error, OperationalError) and \
+                        is_lock_error(error):
+                    self.lock_errors += 1
+                return None
+            if response.status_code == 302 and is_busy(response):
+                self.errors[endpoint] += 1
+                self.lock_errors += 1
+                return None
+        return response
+
+    def sign_up(self, username):
+        """Signs up a player through SignupView and returns a client logged
+        in as them."""
+        client = Client()
+        self.request('signup', client.post, reverse('signup'), {
+            'username': username,
+            'password': PASSWORD,
+        })
+        return client
+
+    def create_game(self, clients, usernames, width, height):
+        """Creates a game between usernames, with the first as its creator,
+        through CreateGameView. Returns its id, or None if it wasn't
+        created."""
+        response = self.request(
+            'create_game',
+            clients[usernames[0]].post,
+            reverse('create_game'),
+            {
+                'opponent_username_0': usernames[1],
+                'more_opponents': ' '.join(usernames[2:]),
+                'width': width,
+                'height': height,
+            }
+        )
+        if response is None or response.status_code != 302:
+            return None
+        match = resolve(urlparse(response['Location']).path)
+        if match.url_name != 'game':
+            return None
+        return match.kwargs['game_id']
+
+    def play(self, clients, game_id, usernames, rng):
+        """Plays a game to completion as its players' clients would: the
+        player who moved last polls the game's state, then the player due to
+        move shoots a random opponent's tile which hasn't been shot and loads
+        the game page it is redirected to."""
+        state_url = reverse('game_state', args=[game_id])
+        attack_url = reverse('attack', args=[game_id])
+        game_url = reverse('game', args=[game_id])
+
+        client = clients[usernames[0]]
+        failures = 0
+        while failures < MAX_FAILURES:
+            response = self.request('game_state', client.get, state_url)
+            if response is None:
+                failures += 1
+                continue
+            state = json.loads(response.content.decode())
+
+            next_teams = [team for team in state['teams'] if team['is_next']]
+            if not next_teams or any(
+                team['winner'] for team in state['teams']
+            ):
+                return
+            attacker = next_teams[0]
+            client = clients[attacker['username']]
+
+            target = rng.choice([
+                team
+                for team in state['teams']
+                if team['alive'] and team['id'] != attacker['id']
+            ])
+            shot = {(tile['x'], tile['y']) for tile in target['shots']}
+            x, y = rng.choice([
+                (x, y)
+                for x in range(state['width'])
+                for y in range(state['height'])
+                if (x, y) not in shot
+            ])
+
+            response = self.request('attack', client.post, attack_url, {
+                'target_x': x,
+                'target_y': y,
+                'target_team': target['id'],
+            })
+            # Busy attacks are redirected to the game page too, which shows
+            # and clears their message
+            self.request('game', client.get, game_url)
+            if response is None:
+                failures += 1
+                continue
+            failures = 0
+
+    def report(self, elapsed, player_count, game_ids):
+        requests = sum(len(timings) for timings in self.timings.values())
+        errors = sum(self.errors.values())
+        finished = Game.objects.filter(
+            id__in=game_ids,
+            alive_count__lte=1
+        ).count()
+        self.stdout.write('Players: {}'.format(player_count))
+        self.stdout.write('Games: {} ({} finished)'.format(
+            len(game_ids),
+            finished
+        ))
+        self.stdout.write('Requests: {} in {:.2f}s ({:.1f} requests/s)'.format(
+            requests,
+            elapsed,
+            requests / elapsed if elapsed else 0
+        ))
+        self.stdout.write('Errors: {} ({:.1%})'.format(
+            errors,
+            errors / requests if requests else 0
+        ))
+        self.stdout.write('Lock errors: {}'.format(self.lock_errors))
+
+        for endpoint, timings in sorted(self.timings.items()):
+            timings = sorted(timings)
+            self.stdout.write(
+                '{}: {} requests ({:.1f}/s), p50 {:.1f}ms p95 {:.1f}ms '
+                'p99 {:.1f}ms, {} errors'.format(
+                    endpoint,
+                    len(timings),
+                    len(timings) / elapsed if elapsed else 0,
+                    percentile(timings, 0.5) * 1000,
+                    percentile(timings, 0.95) * 1000,
+                    percentile(timings, 0.99) * 1000,
+                    self.errors[endpoint]
+                )
+            )
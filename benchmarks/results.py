@@ -0,0 +1,64 @@
+import json
+import platform
+import statistics
+from collections import OrderedDict
+
+import django
+
+# Benchmarks are compared on their median sample, which is less swayed by
+# the odd slow sample than the mean
+COMPARED_STATISTIC = 'median'
+
+
+def summarize(timings):
+    """Returns the min, median, mean and number of samples of each
+    benchmark's timings, in seconds. Benchmarks with no samples, e.g. with
+    no games in the stage they time, are left out."""
+    return OrderedDict(
+        (name, OrderedDict([
+            ('min', min(samples)),
+            ('median', statistics.median(samples)),
+            ('mean', statistics.mean(samples)),
+            ('samples', len(samples)),
+        ]))
+        for name, samples in timings.items()
+        if samples
+    )
+
+
+def write_results(path, summary, **parameters):
+    """Writes a summary, the parameters it was measured with and the versions
+    it ran on to a JSON file at path."""
+    with open(path, 'w') as output:
+        json.dump(OrderedDict([
+            ('parameters', parameters),
+            ('python', platform.python_version()),
+            ('django', django.get_version()),
+            ('results', summary),
+        ]), output, indent=2)
+        output.write('\n')
+
+
+def load_results(path):
+    """Returns the summary written to path by write_results."""
+    with open(path) as results:
+        return json.load(results)['results']
+
+
+def compare(summary, baseline, tolerance):
+    """Returns (name, baseline seconds, seconds, change) for each benchmark
+    in both summary and baseline, where change is the fraction slower than
+    the baseline, and a list of the names of any slower by more than
+    tolerance."""
+    comparisons = []
+    regressions = []
+    for name, result in summary.items():
+        if name not in baseline:
+            continue
+        before = baseline[name][COMPARED_STATISTIC]
+        after = result[COMPARED_STATISTIC]
+        change = after / before - 1 if before else 0.0
+        comparisons.append((name, before, after, change))
+        if change > tolerance:
+            regressions.append(name)
+    return comparisons, regressions
@@ -0,0 +1,172 @@
+import random
+import time
+from collections import OrderedDict
+
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from games.ai import choose_shot
+from games.boards import GameBoards
+from games.models import Game
+from games.models import Ship
+from games.persistence import StoredGame
+from games.presentation import GamePresenter
+from games.presentation import TeamPresenter
+from games.util import make_ships
+from games.views import AttackView
+from players.models import Player
+from players.presentation import PlayerPresenter
+
+# Benchmarks are generators given a Fixture, which yield a function to time
+# for each sample. Anything a sample needs, such as choosing the next move,
+# is done between yields so it isn't timed.
+
+# Fleets placed by each sample of make_ships
+FLEET_COUNT = 100
+
+
+def bench_make_ships(fixture):
+    """Places FLEET_COUNT fleets on the default board."""
+    rng = random.Random(0)
+
+    def run():
+        for i in range(FLEET_COUNT):
+            make_ships(None, Ship.LENGTHS, rng)
+
+    while True:
+        yield run
+
+
+def bench_ship_get_tiles(fixture):
+    """Lists the tiles of every ship in games still being played."""
+    ships = list(Ship.objects.filter(
+        team__game__id__in=fixture.game_ids['midgame']
+    ))
+
+    def run():
+        for ship in ships:
+            ship.get_tiles()
+
+    while True:
+        yield run
+
+
+def bench_make_tiles(fixture):
+    """Presents the tiles of every board in games still being played, with
+    the boards already loaded."""
+    loaded = [
+        (game, GameBoards.load(game))
+        for game in fixture.games('midgame')
+    ]
+
+    def run():
+        for game, boards in loaded:
+            for team in boards.teams:
+                TeamPresenter.make_tiles(team, game, boards)
+
+    while True:
+        yield run
+
+
+def bench_game_presenter(fixture):
+    """Loads and presents every game still being played."""
+    games = fixture.games('midgame')
+
+    def run():
+        for game in games:
+            GamePresenter.from_game(game)
+
+    while True:
+        yield run
+
+
+def bench_player_presenter(fixture):
+    """Loads and presents every player, as PlayerProfileView does."""
+    def run():
+        players = Player.objects.select_related('user', 'stats').filter(
+            id__in=fixture.player_ids
+        )
+        for player in players:
+            PlayerPresenter.from_player(player)
+
+    while True:
+        yield run
+
+
+def bench_attack(fixture):
+    """Posts a single bot's move to AttackView, in whichever game still being
+    played is furthest behind."""
+    rng = random.Random(0)
+    factory = RequestFactory()
+    while True:
+        game = Game.objects.filter(
+            id__in=fixture.game_ids['midgame'],
+            alive_count__gt=1
+        ).order_by('turn', 'id').first()
+        if game is None:
+            return
+        stored_game = StoredGame.load(game)
+        team = stored_game.team(stored_game.engine.next_team())
+        target_id, x, y = choose_shot(
+            stored_game.engine,
+            team.id,
+            rng,
+            budget=float('inf')
+        )
+
+        request = factory.post('/', {
+            'target_x': x,
+            'target_y': y,
+            'target_team': target_id,
+        })
+        request.user = team.player.user
+        request._messages = CookieStorage(request)
+        yield lambda: AttackView.as_view()(request, game_id=game.id)
+
+
+def bench_board_templates(fixture):
+    """Renders the player's and opponents' boards of every game still being
+    played, with the games already presented."""
+    presenters = [
+        GamePresenter.from_game(game)
+        for game in fixture.games('midgame')
+    ]
+
+    def run():
+        for presenter in presenters:
+            for team in presenter.teams:
+                render_to_string('games/player_board.html', {'team': team})
+                render_to_string('games/opponent_board.html', {'team': team})
+
+    while True:
+        yield run
+
+
+BENCHMARKS = OrderedDict([
+    ('make_ships', bench_make_ships),
+    ('ship_get_tiles', bench_ship_get_tiles),
+    ('make_tiles', bench_make_tiles),
+    ('game_presenter', bench_game_presenter),
+    ('player_presenter', bench_player_presenter),
+    ('attack', bench_attack),
+    ('board_templates', bench_board_templates),
+])
+
+
+def run_benchmarks(fixture, repeat, names=None):
+    """Times repeat samples of each benchmark named, or of every benchmark,
+    or as many as it yields if fewer. Returns a list of the seconds each
+    sample took by benchmark name."""
+    if names is None:
+        names = list(BENCHMARKS)
+
+    timings = OrderedDict()
+    for name in names:
+        samples = BENCHMARKS[name](fixture)
+        timings[name] = []
+        for i, run in zip(range(repeat), samples):
+            start = time.perf_counter()
+            run()
+            timings[name].append(time.perf_counter() - start)
+    return timings
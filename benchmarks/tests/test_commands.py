@@ -0,0 +1,82 @@
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from games.models import Game
+from games.persistence import lock_game
+
+
+class LoadTestTestCase(TestCase):
+
+    def test_loadtest(self):
+        out = StringIO()
+        call_command(
+            'loadtest',
+            players=5,
+            width=6,
+            height=6,
+            threads=1,
+            stdout=out
+        )
+
+        # The odd player out isn't given a game
+        self.assertIn('Players: 5', out.getvalue())
+        self.assertIn('Games: 2 (2 finished)', out.getvalue())
+        self.assertIn('Errors: 0 (0.0%)', out.getvalue())
+        self.assertIn('Lock errors: 0', out.getvalue())
+        for endpoint in ['signup', 'create_game', 'game_state', 'attack']:
+            self.assertIn('{}: '.format(endpoint), out.getvalue())
+        self.assertIn('signup: 5 requests', out.getvalue())
+        self.assertIn('create_game: 2 requests', out.getvalue())
+
+        # Everything created for the load test is cleaned up afterwards
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_loadtest_lock_errors(self):
+        """Test that attacks AttackView rejects as busy are counted as lock
+        errors, though it redirects rather than failing."""
+        calls = []
+
+        def lock_game_once_busy(game_id):
+            calls.append(game_id)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return lock_game(game_id)
+
+        out = StringIO()
+        with mock.patch(
+            'games.views.lock_game',
+            side_effect=lock_game_once_busy
+        ):
+            call_command(
+                'loadtest',
+                players=2,
+                width=6,
+                height=6,
+                threads=1,
+                stdout=out
+            )
+
+        self.assertIn('Games: 1 (1 finished)', out.getvalue())
+        self.assertIn('Lock errors: 1', out.getvalue())
+        self.assertIn('Errors: 1 ', out.getvalue())
+        self.assertRegex(out.getvalue(), r'attack: .*, 1 errors')
+
+    def test_loadtest_invalid_teams(self):
+        with self.assertRaises(CommandError):
+            call_command('loadtest', players=4, teams=1, stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command('loadtest', players=2, teams=3, stdout=StringIO())
+
+
+class BenchmarkTestCase(TestCase):
+
+    def test_benchmark_too_few_games(self):
+        with self.assertRaises(CommandError):
+            call_command('benchmark', games=1, stdout=StringIO())
@@ -0,0 +1,85 @@
+from django.test import TestCase
+
+from benchmarks.fixtures import STAGES
+from benchmarks.fixtures import generate
+from benchmarks.suite import BENCHMARKS
+from benchmarks.suite import run_benchmarks
+from games.history import replay
+from games.models import Game
+from games.models import Shot
+from players.models import Player
+
+
+class GenerateTestCase(TestCase):
+
+    def setUp(self):
+        self.fixture = generate(10, 2 * len(STAGES), seed=1)
+
+    def test_players(self):
+        players = Player.objects.select_related('stats').filter(
+            id__in=self.fixture.player_ids
+        )
+        self.assertEqual(len(players), 10)
+        for player in players:
+            self.assertEqual(
+                player.stats.in_progress_count,
+                player.teams.filter(alive=True, winner=False).count()
+            )
+
+    def test_stages(self):
+        self.assertEqual(list(self.fixture.game_ids), list(STAGES))
+        for stage, game_ids in self.fixture.game_ids.items():
+            self.assertEqual(len(game_ids), 2)
+
+        for game in self.fixture.games('new'):
+            self.assertEqual(game.turn, 0)
+        for game in self.fixture.games('midgame'):
+            self.assertGreater(game.turn, 0)
+            self.assertGreater(game.alive_count, 1)
+        for game in self.fixture.games('finished'):
+            self.assertEqual(game.alive_count, 1)
+            self.assertEqual(game.teams.filter(winner=True).count(), 1)
+
+    def test_games_replay(self):
+        # Shots are logged as if they had been played through AttackView
+        for game in Game.objects.filter(
+            id__in=self.fixture.game_ids['late']
+        ):
+            self.assertEqual(
+                Shot.objects.filter(game=game).count(),
+                game.turn
+            )
+            engine = replay(game, game.turn)
+            for team in game.teams.all():
+                self.assertEqual(
+                    engine.team_state(team.id).hit_mask,
+                    team.hit_mask
+                )
+
+
+class RunBenchmarksTestCase(TestCase):
+
+    def test_run_benchmarks(self):
+        fixture = generate(6, len(STAGES))
+        turns = {game.id: game.turn for game in fixture.games('midgame')}
+
+        timings = run_benchmarks(fixture, 2)
+
+        self.assertEqual(list(timings), list(BENCHMARKS))
+        for name, samples in timings.items():
+            self.assertEqual(len(samples), 2)
+            self.assertTrue(all(seconds >= 0 for seconds in samples))
+        # Each sample of the attack benchmark plays a turn
+        self.assertEqual(
+            sum(game.turn for game in fixture.games('midgame')),
+            sum(turns.values()) + 2
+        )
+
+    def test_run_some_benchmarks(self):
+        fixture = generate(2, 1)
+
+        timings = run_benchmarks(fixture, 3, ['make_ships', 'attack'])
+
+        self.assertEqual(len(timings['make_ships']), 3)
+        # There are no games being played to attack in
+        self.assertEqual(timings['attack'], [])
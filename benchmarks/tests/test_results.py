@@ -0,0 +1,60 @@
+import json
+import tempfile
+import unittest
+
+from benchmarks.results import compare
+from benchmarks.results import load_results
+from benchmarks.results import summarize
+from benchmarks.results import write_results
+
+
+class ResultsTestCase(unittest.TestCase):
+
+    def test_summarize(self):
+        summary = summarize({'make_ships': [0.3, 0.1, 0.2, 0.6]})
+
+        self.assertEqual(summary['make_ships']['min'], 0.1)
+        self.assertAlmostEqual(summary['make_ships']['median'], 0.25)
+        self.assertAlmostEqual(summary['make_ships']['mean'], 0.3)
+        self.assertEqual(summary['make_ships']['samples'], 4)
+
+    def test_summarize_no_samples(self):
+        summary = summarize({'make_ships': [0.1], 'attack': []})
+
+        self.assertEqual(list(summary), ['make_ships'])
+
+    def test_write_and_load(self):
+        summary = summarize({'attack': [0.01, 0.02]})
+        with tempfile.NamedTemporaryFile(suffix='.json') as output:
+            write_results(output.name, summary, players=10, games=5)
+
+            self.assertEqual(load_results(output.name), summary)
+            with open(output.name) as results:
+                data = json.load(results)
+        self.assertEqual(data['parameters'], {'players': 10, 'games': 5})
+        self.assertIn('python', data)
+        self.assertIn('django', data)
+
+    def test_compare(self):
+        baseline = summarize({
+            'make_ships': [0.1],
+            'make_tiles': [0.1],
+            'attack': [0.1],
+        })
+        summary = summarize({
+            'make_ships': [0.115],
+            'make_tiles': [0.13],
+            'board_templates': [0.1],
+        })
+
+        comparisons, regressions = compare(summary, baseline, 0.2)
+
+        self.assertEqual(
+            [name for name, before, after, change in comparisons],
+            ['make_ships', 'make_tiles']
+        )
+        self.assertAlmostEqual(comparisons[1][3], 0.3)
+        self.assertEqual(regressions, ['make_tiles'])
+
+        comparisons, regressions = compare(summary, baseline, 0.1)
+        self.assertEqual(regressions, ['make_ships', 'make_tiles'])
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
 from games.models import Game
+from games.models import GameEvent
 from games.models import Ship
 from games.models import Shot
 from games.models import Team
@@ -27,6 +28,7 @@ class TeamAdmin(admin.ModelAdmin):
 
 
 admin.site.register(Game, GameAdmin)
+admin.site.register(GameEvent)
 admin.site.register(Ship)
 admin.site.register(Shot)
 admin.site.register(Team, TeamAdmin)
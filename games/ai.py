@@ -0,0 +1,248 @@
+import random
+import time
+from collections import Counter
+from functools import lru_cache
+
+import numpy
+
+from games.bitboard import placement_ranges
+from games.models import Ship
+
+# Seconds a bot may spend choosing a shot, including picking its target. Once
+# spent, it shoots at random, so a move never stalls a request.
+MOVE_TIME_BUDGET = 0.0005
+# Placements which run through a hit on a ship not yet sunk are weighted this
+# many times more for each such hit, so damaged ships are finished off first
+HIT_WEIGHT = 50
+# Boards larger than this are searched a window at a time rather than all
+# at once. While hunting, a window of this size is picked at random.
+HUNT_WINDOW = 12
+HUNT_ATTEMPTS = 8
+# While targeting a hit on a large board, ships are weighed as if no longer
+# than this, so the window around the hit stays small however long the
+# ship. The tiles next to the hit are still the most likely.
+MAX_TARGET_LENGTH = HUNT_WINDOW
+
+
+@lru_cache(maxsize=256)
+def placement_tiles(length, width, height):
+    """Returns the tiles covered by every placement of a ship of the given
+    length on a width x height board, as an array with a row of tile
+    indexes for each placement."""
+    steps = {
+        Ship.CARDINAL_DIRECTIONS['NORTH']: -width,
+        Ship.CARDINAL_DIRECTIONS['SOUTH']: width,
+        Ship.CARDINAL_DIRECTIONS['EAST']: 1,
+        Ship.CARDINAL_DIRECTIONS['WEST']: -1,
+    }
+    rows = [numpy.zeros((0, length), dtype=numpy.intp)]
+    for direction, step in sorted(steps.items()):
+        x_range, y_range = placement_ranges(length, direction, width, height)
+        xs, ys = numpy.meshgrid(
+            numpy.array(x_range, dtype=numpy.intp),
+            numpy.array(y_range, dtype=numpy.intp)
+        )
+        starts = (ys * width + xs).ravel()
+        rows.append(starts[:, None] + step * numpy.arange(length))
+    return numpy.concatenate(rows)
+
+
+@lru_cache(maxsize=256)
+def fleet_placements(fleet, width, height):
+    """Returns the placements of every ship of a fleet, given as sorted
+    (length, count) pairs, as a single array of tile indexes padded with the
+    index one past the end of the board, plus the count of ships each
+    placement may be for. Weighing a whole fleet then takes a fixed number
+    of array operations, whatever the number of ship lengths."""
+    max_length = max(length for length, count in fleet)
+    rows = []
+    counts = []
+    for length, count in fleet:
+        tiles = placement_tiles(length, width, height)
+        padding = numpy.full(
+            (len(tiles), max_length - length),
+            width * height,
+            dtype=numpy.intp
+        )
+        rows.append(numpy.hstack([tiles, padding]))
+        counts.append(numpy.full(len(tiles), count))
+    return numpy.concatenate(rows), numpy.concatenate(counts)
+
+
+def window_tiles(mask, width, x0, y0, window_width, window_height):
+    """Returns whether each tile of a window of a board's mask is set, as a
+    flat array of booleans laid out row by row like the mask."""
+    rows = (mask >> (y0 * width)) & ((1 << (window_height * width)) - 1)
+    if window_width == width:
+        packed = rows
+    else:
+        packed = 0
+        row_mask = (1 << window_width) - 1
+        for y in range(window_height):
+            row = (rows >> (y * width + x0)) & row_mask
+            packed |= row << (y * window_width)
+
+    size = window_width * window_height
+    data = packed.to_bytes((size + 7) // 8, 'little')
+    bits = numpy.unpackbits(
+        numpy.frombuffer(data, dtype=numpy.uint8),
+        bitorder='little'
+    )
+    return bits[:size].astype(bool)
+
+
+def lowest_bit(mask):
+    """Returns the index of the lowest bit set in a non-zero mask. Avoids
+    negative ints, which are slow to combine with very large masks."""
+    return (mask ^ (mask - 1)).bit_length() - 1
+
+
+def ship_length(ship_mask, width):
+    """Returns the length of the ship occupying a mask. Only the bits next to
+    its highest tile are read, which is quick even for very large masks."""
+    high = ship_mask.bit_length() - 1
+    for step in [1, width]:
+        length = 1
+        while length * step <= high and (
+            ship_mask >> (high - length * step)
+        ) & 1:
+            length += 1
+        if length > 1:
+            return length
+    return 1
+
+
+def afloat_lengths(engine, index):
+    """Returns the lengths of a team's ships not yet sunk in an engine."""
+    return [
+        ship_length(ship_mask, engine.width)
+        for ship_mask in engine.afloat_masks[index]
+    ]
+
+
+def is_windowed(engine):
+    """Checks if a board is too large to search whole."""
+    return engine.width * engine.height > HUNT_WINDOW * HUNT_WINDOW
+
+
+def search_windows(engine, unresolved, lengths, rng):
+    """Yields (x, y, width, height) windows of a board in which to look for
+    ships. Small boards are searched whole. On large boards, the window is
+    centred on a hit if there is one, or else picked at random. lengths must
+    be no longer than MAX_TARGET_LENGTH on large boards."""
+    if not is_windowed(engine):
+        yield 0, 0, engine.width, engine.height
+        return
+
+    if unresolved:
+        reach = max(lengths) - 1
+        index = lowest_bit(unresolved)
+        x, y = index % engine.width, index // engine.width
+        x0 = max(0, x - reach)
+        y0 = max(0, y - reach)
+        yield (
+            x0,
+            y0,
+            min(engine.width, x + reach + 1) - x0,
+            min(engine.height, y + reach + 1) - y0
+        )
+        return
+
+    window_width = min(engine.width, HUNT_WINDOW)
+    window_height = min(engine.height, HUNT_WINDOW)
+    for i in range(HUNT_ATTEMPTS):
+        yield (
+            rng.randrange(engine.width - window_width + 1),
+            rng.randrange(engine.height - window_height + 1),
+            window_width,
+            window_height
+        )
+
+
+def placement_density(lengths, shot, hits, width, height):
+    """Returns, for each tile of a board, the weighted number of placements
+    of the remaining ships which cover it. Placements may not cover a tile
+    which has been shot, other than hits on ships not yet sunk."""
+    size = width * height
+    tiles, counts = fleet_placements(
+        tuple(sorted(Counter(lengths).items())),
+        width,
+        height
+    )
+
+    # Padding tiles are never blocked or hit. Tiles are summed over each
+    # placement as floats, which numpy does far quicker than booleans.
+    blocked = numpy.append(shot & ~hits, False).astype(float)
+    hits = numpy.append(hits, False).astype(float)
+    ones = numpy.ones(tiles.shape[1])
+    valid = blocked[tiles].dot(ones) == 0
+    weights = valid * counts * (1 + HIT_WEIGHT * hits[tiles].dot(ones))
+    density = numpy.bincount(
+        tiles.ravel(),
+        weights=numpy.repeat(weights, tiles.shape[1]),
+        minlength=size + 1
+    )[:size]
+    density[shot] = 0
+    return density
+
+
+def choose_shot(engine, team_id, rng=random, budget=MOVE_TIME_BUDGET):
+    """Returns the (target team id, x, y) of a shot for a team, using hunt
+    and target play: the tile most likely to hold a ship, weighed over the
+    placements of the target's remaining ships, with damaged ships finished
+    off first. Only what the team has seen is used: shots, hits and which
+    ships have been sunk. Returns None if no shot can be found."""
+    deadline = time.time() + budget
+    attacker = engine.indexes[team_id]
+
+    # Finish off damaged ships before hunting for new ones
+    damaged = [index for index in engine.damaged if index != attacker]
+    if damaged:
+        index = min(damaged)
+    else:
+        targets = [
+            index
+            for index in range(len(engine.team_ids))
+            if index != attacker and engine.alive[index]
+        ]
+        if not targets:
+            return None
+        index = rng.choice(targets)
+    unresolved = engine.unresolved_masks[index]
+    lengths = afloat_lengths(engine, index)
+    if is_windowed(engine):
+        lengths = [min(length, MAX_TARGET_LENGTH) for length in lengths]
+
+    hit_mask = engine.hit_masks[index]
+    for x0, y0, width, height in search_windows(
+        engine,
+        unresolved,
+        lengths,
+        rng
+    ):
+        if time.time() > deadline:
+            break
+        density = placement_density(
+            lengths,
+            window_tiles(hit_mask, engine.width, x0, y0, width, height),
+            window_tiles(unresolved, engine.width, x0, y0, width, height),
+            width,
+            height
+        )
+        best = density.max()
+        if best > 0:
+            candidates = numpy.flatnonzero(density == best)
+            tile = int(candidates[rng.randrange(len(candidates))])
+            return (
+                engine.team_ids[index],
+                x0 + tile % width,
+                y0 + tile // width
+            )
+
+    # Out of time, so take any tile not yet shot
+    for i in range(HUNT_ATTEMPTS * HUNT_WINDOW):
+        x = rng.randrange(engine.width)
+        y = rng.randrange(engine.height)
+        if not (hit_mask >> (y * engine.width + x)) & 1:
+            return engine.team_ids[index], x, y
+    return None
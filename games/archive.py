@@ -0,0 +1,259 @@
+import struct
+import zlib
+from collections import defaultdict
+from collections import namedtuple
+
+from django.db import transaction
+
+from games.bitboard import ship_mask
+from games.engine import GameEngine
+from games.models import ArchivedGame
+from games.models import GameEvent
+from games.models import GameSnapshot
+from games.models import Ship
+from games.models import Shot
+from games.persistence import lock_game
+
+ARCHIVE_VERSION = 1
+# Rows deleted by each query once games are archived, so no single delete
+# holds its locks for long
+DELETE_BATCH_SIZE = 500
+
+# Little-endian records: a header, the fleet's lengths, then each team
+# followed by its ships, then every shot in the order fired. Teams are
+# referred to by their position, which fits a byte as games have at most
+# MAX_TEAMS teams.
+HEADER = struct.Struct('<BHHHHI')
+LENGTH = struct.Struct('<H')
+TEAM = struct.Struct('<IIiBH')
+SHIP = struct.Struct('<HHHB')
+SHOT = struct.Struct('<BBHHB')
+
+ALIVE = 1
+WINNER = 2
+
+
+class ArchivedTeam(namedtuple(
+    'ArchivedTeam',
+    ['id', 'player_id', 'first_turn', 'alive', 'winner', 'ships']
+)):
+    """A team of an archived game. ships are (x, y, length, direction)
+    tuples, and first_turn orders the teams' first moves as Team.last_turn
+    did when the game was created."""
+
+
+class ArchivedShot(namedtuple(
+    'ArchivedShot',
+    ['attacking_team_id', 'defending_team_id', 'x', 'y', 'result']
+)):
+    """A shot of an archived game, in the order fired."""
+
+
+class GameArchive(namedtuple(
+    'GameArchive',
+    ['width', 'height', 'fleet', 'teams', 'shots']
+)):
+    """Everything needed to replay a finished game."""
+
+    @classmethod
+    def from_game(cls, game):
+        """Reads a game's teams, ships and shots in three queries."""
+        teams = list(game.teams.order_by('id'))
+        ships = defaultdict(list)
+        for ship in Ship.objects.filter(team__game=game).order_by('id'):
+            ships[ship.team_id].append(
+                (ship.x, ship.y, ship.length, ship.direction)
+            )
+        # Games which predate Shot.turn fired every shot on turn 0, so the
+        # order they were saved in breaks ties
+        shots = [
+            ArchivedShot(
+                attacking_team_id=shot.attacking_team_id,
+                defending_team_id=shot.defending_team_id,
+                x=shot.x,
+                y=shot.y,
+                result=shot.result
+            )
+            for shot in Shot.objects.filter(game=game).order_by('turn', 'id')
+        ]
+
+        # Teams first move in the order they first shot, so are given
+        # negative last turns in that order. Any which never shot were
+        # defeated before their first move, so can go last.
+        first_turns = {team.id: 0 for team in teams}
+        for turn, shot in enumerate(shots[:len(teams)]):
+            if first_turns[shot.attacking_team_id] == 0:
+                first_turns[shot.attacking_team_id] = turn - len(teams)
+
+        return cls(
+            width=game.width,
+            height=game.height,
+            fleet=game.get_fleet(),
+            teams=[
+                ArchivedTeam(
+                    id=team.id,
+                    player_id=team.player_id,
+                    first_turn=first_turns[team.id],
+                    alive=team.alive,
+                    winner=team.winner,
+                    ships=ships[team.id]
+                )
+                for team in teams
+            ],
+            shots=shots
+        )
+
+    def pack(self):
+        """Returns the archive as compressed bytes."""
+        indexes = {team.id: index for index, team in enumerate(self.teams)}
+        parts = [HEADER.pack(
+            ARCHIVE_VERSION,
+            self.width,
+            self.height,
+            len(self.fleet),
+            len(self.teams),
+            len(self.shots)
+        )]
+        parts.extend(LENGTH.pack(length) for length in self.fleet)
+        for team in self.teams:
+            parts.append(TEAM.pack(
+                team.id,
+                team.player_id,
+                team.first_turn,
+                (ALIVE if team.alive else 0) | (WINNER if team.winner else 0),
+                len(team.ships)
+            ))
+            parts.extend(SHIP.pack(*ship) for ship in team.ships)
+        parts.extend(
+            SHOT.pack(
+                indexes[shot.attacking_team_id],
+                indexes[shot.defending_team_id],
+                shot.x,
+                shot.y,
+                shot.result
+            )
+            for shot in self.shots
+        )
+        return zlib.compress(b''.join(parts), 9)
+
+    @classmethod
+    def unpack(cls, data):
+        """Returns the archive packed into bytes by pack. Raises ValueError
+        if they aren't an archive this version can read."""
+        data = zlib.decompress(bytes(data))
+        version, width, height, fleet_count, team_count, shot_count = \
+            HEADER.unpack_from(data)
+        if version != ARCHIVE_VERSION:
+            raise ValueError('Unknown archive version: {}'.format(version))
+        offset = HEADER.size
+
+        fleet = []
+        for i in range(fleet_count):
+            fleet.append(LENGTH.unpack_from(data, offset)[0])
+            offset += LENGTH.size
+
+        teams = []
+        for i in range(team_count):
+            team_id, player_id, first_turn, flags, ship_count = \
+                TEAM.unpack_from(data, offset)
+            offset += TEAM.size
+            ships = []
+            for j in range(ship_count):
+                ships.append(SHIP.unpack_from(data, offset))
+                offset += SHIP.size
+            teams.append(ArchivedTeam(
+                id=team_id,
+                player_id=player_id,
+                first_turn=first_turn,
+                alive=bool(flags & ALIVE),
+                winner=bool(flags & WINNER),
+                ships=ships
+            ))
+
+        shots = []
+        for attacker, defender, x, y, result in SHOT.iter_unpack(
+            data[offset:offset + shot_count * SHOT.size]
+        ):
+            shots.append(ArchivedShot(
+                attacking_team_id=teams[attacker].id,
+                defending_team_id=teams[defender].id,
+                x=x,
+                y=y,
+                result=result
+            ))
+
+        return cls(
+            width=width,
+            height=height,
+            fleet=fleet,
+            teams=teams,
+            shots=shots
+        )
+
+    def replay(self, turn):
+        """Returns a GameEngine holding the game's boards at the start of a
+        turn."""
+        engine = GameEngine(self.width, self.height)
+        for team in self.teams:
+            engine.add_team(
+                team.id,
+                [
+                    ship_mask(
+                        Ship(x=x, y=y, length=length, direction=direction),
+                        self.width,
+                        self.height
+                    )
+                    for x, y, length, direction in team.ships
+                ],
+                last_turn=team.first_turn
+            )
+        for shot in self.shots[:turn]:
+            engine.fire(shot.defending_team_id, shot.x, shot.y)
+        return engine
+
+
+def archive_game(game):
+    """Packs a finished game into an ArchivedGame and marks it archived,
+    returning False if it isn't finished or is already archived. Its rows
+    are left for delete_archived_rows."""
+    with transaction.atomic():
+        game = lock_game(game.pk)
+        if game.archived or game.alive_count is None or \
+                game.alive_count > 1:
+            return False
+
+        ArchivedGame(
+            game=game,
+            data=GameArchive.from_game(game).pack()
+        ).save()
+        game.archived = True
+        game.save(update_fields=['archived'])
+    return True
+
+
+def delete_in_batches(queryset, batch_size=DELETE_BATCH_SIZE):
+    """Deletes the rows matched by queryset, batch_size at a time, each
+    batch in its own transaction. Returns the number of rows deleted."""
+    model = queryset.model
+    deleted = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        with transaction.atomic():
+            model.objects.filter(id__in=ids).delete()
+        deleted += len(ids)
+
+
+def delete_archived_rows(batch_size=DELETE_BATCH_SIZE):
+    """Deletes the ships, shots and log of every archived game. Returns the
+    number of rows deleted."""
+    return sum(
+        delete_in_batches(queryset, batch_size)
+        for queryset in [
+            Ship.objects.filter(team__game__archived=True),
+            Shot.objects.filter(game__archived=True),
+            GameEvent.objects.filter(game__archived=True),
+            GameSnapshot.objects.filter(game__archived=True),
+        ]
+    )
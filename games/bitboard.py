@@ -0,0 +1,172 @@
+import random
+from collections import namedtuple
+from functools import lru_cache
+
+from games.fields import set_bits
+from games.models import GAME_SIZE
+from games.models import Ship
+
+# Boards with more tiles than this place ships by rejection sampling rather
+# than from a table of every placement, which would grow too large.
+PLACEMENT_TABLE_TILES = 2500
+# Tables of placements kept for reuse. Boards' sizes are chosen by players,
+# and a table for the largest board takes a few MB.
+PLACEMENT_CACHE_SIZE = 16
+# Attempts at placing a single ship by rejection sampling before giving up
+MAX_PLACEMENT_ATTEMPTS = 1000
+
+Placement = namedtuple('Placement', ['mask', 'x', 'y', 'direction'])
+
+
+def is_on_board(x, y, width=GAME_SIZE, height=GAME_SIZE):
+    """Checks if a tile lies on the board."""
+    return 0 <= x < width and 0 <= y < height
+
+
+def tile_bit(x, y, width=GAME_SIZE):
+    """Returns a mask with only the bit for tile (x, y) set. Tiles are mapped
+    row by row, so a whole board fits in a single int."""
+    return 1 << (y * width + x)
+
+
+def tiles_mask(tiles, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns a mask of all tiles in an iterable of (x, y) pairs. Tiles which
+    lie off the board are ignored."""
+    mask = 0
+    for x, y in tiles:
+        if is_on_board(x, y, width, height):
+            mask |= tile_bit(x, y, width)
+    return mask
+
+
+def mask_tiles(mask, width=GAME_SIZE):
+    """Returns the (x, y) tiles set in a mask, row by row."""
+    return [(index % width, index // width) for index in set_bits(mask)]
+
+
+def ship_mask(ship, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns a mask of all tiles occupied by a ship."""
+    return tiles_mask(ship.get_tiles(), width, height)
+
+
+def occupancy_mask(ships, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns a mask of all tiles occupied by any of the given ships."""
+    mask = 0
+    for ship in ships:
+        mask |= ship_mask(ship, width, height)
+    return mask
+
+
+def shots_mask(shots, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns a mask of all tiles targeted by the given shots."""
+    return tiles_mask(((shot.x, shot.y) for shot in shots), width, height)
+
+
+def has_tile(mask, x, y, width=GAME_SIZE):
+    """Checks if tile (x, y) is set in a mask."""
+    return bool(mask & tile_bit(x, y, width))
+
+
+def is_sunk(ship_mask, hit_mask):
+    """Checks if every tile of a single ship has been shot."""
+    return ship_mask & ~hit_mask == 0
+
+
+def is_eliminated(occupancy_mask, hit_mask):
+    """Checks if every tile occupied by a team's ships has been shot."""
+    return occupancy_mask & ~hit_mask == 0
+
+
+def make_placement(x, y, length, direction, width=GAME_SIZE):
+    """Returns the placement of a ship which is known to lie on the board."""
+    if direction == Ship.CARDINAL_DIRECTIONS['NORTH']:
+        first, step = tile_bit(x, y - length + 1, width), width
+    elif direction == Ship.CARDINAL_DIRECTIONS['SOUTH']:
+        first, step = tile_bit(x, y, width), width
+    elif direction == Ship.CARDINAL_DIRECTIONS['EAST']:
+        first, step = tile_bit(x, y, width), 1
+    else:
+        first, step = tile_bit(x - length + 1, y, width), 1
+
+    mask = 0
+    for i in range(length):
+        mask |= first << (i * step)
+    return Placement(mask, x, y, direction)
+
+
+def placement_ranges(length, direction, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns the ranges of x and y from which a ship facing direction lies
+    entirely on the board."""
+    if direction == Ship.CARDINAL_DIRECTIONS['NORTH']:
+        return range(width), range(length - 1, height)
+    elif direction == Ship.CARDINAL_DIRECTIONS['SOUTH']:
+        return range(width), range(height - length + 1)
+    elif direction == Ship.CARDINAL_DIRECTIONS['EAST']:
+        return range(width - length + 1), range(height)
+    return range(length - 1, width), range(height)
+
+
+@lru_cache(maxsize=PLACEMENT_CACHE_SIZE)
+def ship_placements(length, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns every placement of a ship of the given length which lies
+    entirely on the board. The most recently used lengths and board sizes
+    are cached."""
+    placements = []
+    directions = sorted(Ship.CARDINAL_DIRECTIONS.values())
+    for direction in directions:
+        x_range, y_range = placement_ranges(length, direction, width, height)
+        for y in y_range:
+            for x in x_range:
+                placements.append(
+                    make_placement(x, y, length, direction, width)
+                )
+    return tuple(placements)
+
+
+def sample_placement(length, occupied, rng, width, height):
+    """Returns a random placement of a ship which lies on the board without
+    overlapping occupied, or None if none can be found."""
+    if width * height <= PLACEMENT_TABLE_TILES:
+        candidates = [
+            placement
+            for placement in ship_placements(length, width, height)
+            if not placement.mask & occupied
+        ]
+        return rng.choice(candidates) if candidates else None
+
+    # Large boards are mostly empty, so a random placement rarely overlaps
+    directions = sorted(Ship.CARDINAL_DIRECTIONS.values())
+    for i in range(MAX_PLACEMENT_ATTEMPTS):
+        direction = rng.choice(directions)
+        x_range, y_range = placement_ranges(length, direction, width, height)
+        if not x_range or not y_range:
+            continue
+        placement = make_placement(
+            rng.choice(x_range),
+            rng.choice(y_range),
+            length,
+            direction,
+            width
+        )
+        if not placement.mask & occupied:
+            return placement
+    return None
+
+
+def sample_placements(lengths, rng=random, width=GAME_SIZE, height=GAME_SIZE):
+    """Returns a random placement for each of the given ship lengths, none of
+    which overlap. On boards small enough to tabulate, each placement is
+    drawn only from those which fit around the ships already placed, so the
+    cost doesn't depend on how crowded the board is. Raises ValueError if a
+    ship doesn't fit."""
+    placements = []
+    occupied = 0
+    for length in lengths:
+        placement = sample_placement(length, occupied, rng, width, height)
+        if placement is None:
+            raise ValueError(
+                'No room on the board for a ship of length {}.'.format(length)
+            )
+        occupied |= placement.mask
+        placements.append(placement)
+    return placements
@@ -0,0 +1,67 @@
+from collections import namedtuple
+
+from games.bitboard import has_tile
+from games.bitboard import mask_tiles
+from games.models import GAME_SIZE
+from games.util import get_next_team_id
+
+
+class Board(namedtuple(
+    'Board',
+    ['team', 'occupancy_mask', 'hit_mask', 'width']
+)):
+    """In-memory occupancy and hit bitmasks for a single Team."""
+
+    @classmethod
+    def from_team(cls, team, width=GAME_SIZE):
+        return cls(
+            team=team,
+            occupancy_mask=team.occupancy_mask,
+            hit_mask=team.hit_mask,
+            width=width
+        )
+
+    def is_empty(self, x, y):
+        return not has_tile(self.occupancy_mask, x, y, self.width)
+
+    def is_hit(self, x, y):
+        return has_tile(self.hit_mask, x, y, self.width)
+
+    def marked_tiles(self):
+        """Returns the (x, y) tiles which hold a ship or have been shot, so
+        large boards can be shown without visiting every tile."""
+        return mask_tiles(self.occupancy_mask | self.hit_mask, self.width)
+
+
+class GameBoards(namedtuple(
+    'GameBoards',
+    ['game', 'teams', 'boards', 'next_team_id']
+)):
+    """Boards of every Team in a Game, read from the teams' packed board state
+    in a single query regardless of the number of teams, ships or shots."""
+
+    @classmethod
+    def load(cls, game):
+        teams = list(
+            game.teams.select_related(
+                'player__user',
+                'player__stats'
+            ).order_by('id')
+        )
+        boards = {
+            team.id: Board.from_team(team, game.width)
+            for team in teams
+        }
+
+        return cls(
+            game=game,
+            teams=teams,
+            boards=boards,
+            next_team_id=get_next_team_id(game, teams)
+        )
+
+    def board_for(self, team):
+        return self.boards[team.id]
+
+    def is_next(self, team):
+        return team.id == self.next_team_id
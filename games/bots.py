@@ -0,0 +1,80 @@
+import copy
+import time
+
+from games.ai import choose_shot
+from games.models import Shot
+from players.util import record_loss
+from players.util import record_win
+
+# Seconds bots may play on for in a single request once no human is left in
+# a game, while the request holds the game's lock. Games on the usual boards
+# are finished well within it. Any left unfinished are played out by the
+# play_bot_games command.
+BOT_PLAYOUT_TIME = 0.05
+
+
+def has_humans_alive(stored_game):
+    """Checks if any human player's team is still alive in a game."""
+    return any(
+        stored_game.engine.is_alive(team.id) and not team.player.is_bot
+        for team in stored_game.teams
+    )
+
+
+def play_bots(stored_game, budget=BOT_PLAYOUT_TIME):
+    """Fires a shot for each bot due to move next, until it is a human
+    player's turn or the game is over. Once no human is left, the bots play
+    on for up to budget seconds, or until the game is won if budget is None,
+    so games between bots alone still finish. The shots are saved in a
+    single insert. Returns the arguments to publish_attack for each shot."""
+    engine = stored_game.engine
+    deadline = None if budget is None else time.time() + budget
+    humans_alive = has_humans_alive(stored_game)
+    shots = []
+    attacks = []
+    while engine.winner() is None:
+        bot_team = stored_game.team(engine.next_team())
+        if bot_team is None or not bot_team.player.is_bot:
+            break
+        if not humans_alive and deadline is not None and \
+                time.time() >= deadline:
+            break
+        move = choose_shot(engine, bot_team.id)
+        if move is None:
+            break
+        target_id, x, y = move
+
+        defending_team = stored_game.team(target_id)
+        shot = Shot(
+            game=stored_game.game,
+            attacking_team=bot_team,
+            defending_team=defending_team,
+            x=x,
+            y=y,
+            turn=engine.turn
+        )
+        shot.result = engine.fire(target_id, x, y)
+        shots.append(shot)
+
+        # The teams are only saved once every shot is fired, so each attack
+        # keeps a copy of its target as the shot left it
+        target = copy.copy(defending_team)
+        target.alive = engine.is_alive(target_id)
+        if not target.alive:
+            record_loss(target)
+            humans_alive = humans_alive and has_humans_alive(stored_game)
+        winner = stored_game.team(engine.winner())
+        if winner is not None:
+            record_win(winner)
+
+        attacks.append({
+            'game': stored_game.game,
+            'shot': shot,
+            'defending_team': target,
+            'next_team': stored_game.team(engine.next_team()),
+            'winner': winner,
+        })
+
+    Shot.objects.bulk_create(shots)
+    stored_game.save()
+    return attacks
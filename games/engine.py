@@ -0,0 +1,182 @@
+from collections import deque
+from collections import namedtuple
+
+# Shot results, matching Shot.RESULTS
+MISS = 0
+HIT = 1
+SUNK = 2
+DEFEATED = 3
+
+
+class IllegalShot(ValueError):
+    """Raised when a shot breaks the rules of the game."""
+
+
+class DuplicateShot(IllegalShot):
+    """Raised when a tile of a team's board is shot more than once."""
+
+
+TeamState = namedtuple(
+    'TeamState',
+    ['hit_mask', 'hits_remaining', 'alive', 'last_turn']
+)
+
+
+class GameEngine(object):
+    """The rules of a single game, held entirely in memory with no database
+    access.
+
+    Boards are bitmasks laid out as in games.bitboard, teams are referred to
+    by id and held in parallel lists, and the turn order is a deque rotated
+    after every shot, so each move costs O(1) however long the game runs.
+    """
+
+    def __init__(self, width, height, turn=0):
+        self.width = width
+        self.height = height
+        self.turn = turn
+        self.indexes = {}
+        self.team_ids = []
+        self.ship_masks = []
+        self.occupancy_masks = []
+        self.hit_masks = []
+        # Ships not yet sunk, the hits on them, and the indexes of teams with
+        # any such hits
+        self.afloat_masks = []
+        self.unresolved_masks = []
+        self.damaged = set()
+        self.hits_remaining = []
+        self.alive = []
+        self.last_turns = []
+        self.alive_count = 0
+        self.order = None
+        self.winner_index = None
+
+    def add_team(self, team_id, ship_masks, last_turn=0, hit_mask=0,
+                 alive=True):
+        """Adds a team with ships occupying the given masks."""
+        occupancy_mask = 0
+        for mask in ship_masks:
+            occupancy_mask |= mask
+
+        self.indexes[team_id] = len(self.team_ids)
+        self.team_ids.append(team_id)
+        self.ship_masks.append(list(ship_masks))
+        self.occupancy_masks.append(occupancy_mask)
+        self.hit_masks.append(hit_mask)
+        afloat = []
+        unresolved = 0
+        for mask in ship_masks:
+            hits = hit_mask & mask
+            if hits != mask:
+                afloat.append(mask)
+                unresolved |= hits
+        self.afloat_masks.append(afloat)
+        self.unresolved_masks.append(unresolved)
+        if unresolved:
+            self.damaged.add(self.indexes[team_id])
+        self.hits_remaining.append(
+            bin(occupancy_mask & ~hit_mask).count('1')
+        )
+        self.alive.append(alive)
+        self.last_turns.append(last_turn)
+        if alive:
+            self.alive_count += 1
+
+        # Turn order is rebuilt on demand once all teams are added
+        self.order = None
+        self.winner_index = None
+
+    def tile_bit(self, x, y):
+        return 1 << (y * self.width + x)
+
+    def next_index(self):
+        if self.order is None:
+            self.order = deque(sorted(
+                (index for index in range(len(self.team_ids))
+                 if self.alive[index]),
+                key=self.last_turns.__getitem__
+            ))
+
+        # Defeated teams are dropped when they reach the front of the queue
+        order = self.order
+        while order and not self.alive[order[0]]:
+            order.popleft()
+        return order[0] if order else None
+
+    def next_team(self):
+        """Returns the id of the alive team which is due to move next, or None
+        if no team is alive."""
+        index = self.next_index()
+        return None if index is None else self.team_ids[index]
+
+    def winner(self):
+        """Returns the id of the last team standing, or None if the game is
+        still in progress."""
+        if self.alive_count != 1 or len(self.team_ids) < 2:
+            return None
+        if self.winner_index is None:
+            self.winner_index = self.alive.index(True)
+        return self.team_ids[self.winner_index]
+
+    def is_alive(self, team_id):
+        return self.alive[self.indexes[team_id]]
+
+    def team_state(self, team_id):
+        index = self.indexes[team_id]
+        return TeamState(
+            hit_mask=self.hit_masks[index],
+            hits_remaining=self.hits_remaining[index],
+            alive=self.alive[index],
+            last_turn=self.last_turns[index]
+        )
+
+    def fire(self, team_id, x, y):
+        """Fires the next team's shot at tile (x, y) of another team and
+        returns the result."""
+        if self.alive_count < 2:
+            raise IllegalShot('The game is over.')
+        attacker = self.next_index()
+        target = self.indexes.get(team_id)
+        if target is None or target == attacker or not self.alive[target]:
+            raise IllegalShot('That team can\'t be targeted.')
+        if not (0 <= x < self.width and 0 <= y < self.height):
+            raise IllegalShot('That tile is not on the board.')
+
+        bit = self.tile_bit(x, y)
+        hit_mask = self.hit_masks[target]
+        if hit_mask & bit:
+            raise DuplicateShot('That tile has already been shot.')
+        hit_mask |= bit
+        self.hit_masks[target] = hit_mask
+
+        result = MISS
+        if self.occupancy_masks[target] & bit:
+            result = HIT
+            self.hits_remaining[target] -= 1
+            unresolved = self.unresolved_masks[target] | bit
+            for ship_mask in self.ship_masks[target]:
+                if ship_mask & bit:
+                    if ship_mask & ~hit_mask == 0:
+                        result = SUNK
+                        unresolved ^= ship_mask
+                        self.afloat_masks[target].remove(ship_mask)
+                    break
+            self.unresolved_masks[target] = unresolved
+            if unresolved:
+                self.damaged.add(target)
+            else:
+                self.damaged.discard(target)
+
+        if self.hits_remaining[target] == 0:
+            self.alive[target] = False
+            self.alive_count -= 1
+            if result != MISS:
+                result = DEFEATED
+            if self.alive_count == 1:
+                self.winner_index = attacker
+
+        self.last_turns[attacker] = self.turn
+        self.turn += 1
+        self.order.rotate(-1)
+        return result
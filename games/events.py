@@ -0,0 +1,196 @@
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.module_loading import import_string
+
+from games.presentation import ShotPresenter
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Returns the event hub configured by settings.GAMES_EVENT_HUB, creating
+    it on first use."""
+    global _hub
+    with _hub_lock:
+        if _hub is None:
+            hub_class = import_string(getattr(
+                settings,
+                'GAMES_EVENT_HUB',
+                'games.events.LocalEventHub'
+            ))
+            _hub = hub_class()
+        return _hub
+
+
+def reset_hub():
+    """Discards the current event hub, e.g. after changing settings."""
+    global _hub
+    with _hub_lock:
+        _hub = None
+
+
+class LocalSubscription(object):
+
+    def __init__(self, hub, game_id):
+        self.hub = hub
+        self.game_id = game_id
+        self.queue = queue.Queue()
+
+    def get(self, timeout):
+        """Returns the next event, or None if none arrives within timeout
+        seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class LocalEventHub(object):
+    """Publish/subscribe hub which delivers events to subscribers in the same
+    process only. Suitable for a single worker process."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = defaultdict(set)
+
+    def publish(self, game_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(game_id, ()))
+        for subscription in subscriptions:
+            subscription.queue.put(event)
+
+    def subscribe(self, game_id):
+        subscription = LocalSubscription(self, game_id)
+        with self.lock:
+            self.subscriptions[game_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions[subscription.game_id]
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                del self.subscriptions[subscription.game_id]
+
+
+class CacheSubscription(object):
+
+    def __init__(self, hub, game_id):
+        self.hub = hub
+        self.game_id = game_id
+        self.last_seen = hub.last_sequence(game_id)
+        # The last sequence published, and when, as of the first missing
+        # event this subscriber is waiting for
+        self.waiting_since = None
+
+    def get(self, timeout):
+        """Returns the next event, or None if none arrives within timeout
+        seconds."""
+        deadline = time.time() + timeout
+        while True:
+            last_sequence = self.hub.last_sequence(self.game_id)
+            if last_sequence > self.last_seen:
+                sequence = self.last_seen + 1
+                event = self.hub.cache.get(
+                    self.hub.event_key(self.game_id, sequence)
+                )
+                if event is not None:
+                    self.last_seen = sequence
+                    return event
+
+                # Publishers take a sequence before writing its event, so a
+                # missing event may still be on its way. Skip it only once it
+                # has been missing for a while, e.g. because it expired while
+                # this subscriber fell far behind.
+                if self.waiting_since is None or \
+                        sequence > self.waiting_since[0]:
+                    self.waiting_since = (last_sequence, time.time())
+                if time.time() - self.waiting_since[1] >= \
+                        self.hub.missing_event_grace:
+                    self.last_seen = sequence
+                    continue
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(self.hub.poll_interval, remaining))
+
+    def close(self):
+        pass
+
+
+class CacheEventHub(object):
+    """Publish/subscribe hub which passes events through a Django cache. With
+    a cache shared between processes, such as memcached, it delivers events
+    across worker processes without touching the database."""
+
+    poll_interval = 0.25
+    event_timeout = 300
+    # Seconds a subscriber waits for an event whose sequence has been taken
+    # before giving up on it
+    missing_event_grace = 2.0
+
+    def __init__(self):
+        self.cache = caches[getattr(
+            settings,
+            'GAMES_EVENT_HUB_CACHE',
+            'default'
+        )]
+
+    def sequence_key(self, game_id):
+        return 'games:events:{}:last'.format(game_id)
+
+    def event_key(self, game_id, sequence):
+        return 'games:events:{}:{}'.format(game_id, sequence)
+
+    def last_sequence(self, game_id):
+        return self.cache.get(self.sequence_key(game_id), 0)
+
+    def publish(self, game_id, event):
+        sequence_key = self.sequence_key(game_id)
+        self.cache.add(sequence_key, 0, None)
+        sequence = self.cache.incr(sequence_key)
+        self.cache.set(
+            self.event_key(game_id, sequence),
+            event,
+            self.event_timeout
+        )
+
+    def subscribe(self, game_id):
+        return CacheSubscription(self, game_id)
+
+
+def publish_attack(game, shot, defending_team, next_team, winner):
+    """Publishes the events resulting from a single attack. Must be called
+    after the attack has been committed."""
+    hub = get_hub()
+    hub.publish(game.id, {
+        'type': 'shot',
+        'data': ShotPresenter.from_shot(shot)._asdict(),
+    })
+    if not defending_team.alive:
+        hub.publish(game.id, {
+            'type': 'defeated',
+            'data': {'team_id': defending_team.id},
+        })
+    if winner is not None:
+        hub.publish(game.id, {
+            'type': 'winner',
+            'data': {'team_id': winner.id},
+        })
+    hub.publish(game.id, {
+        'type': 'turn',
+        'data': {
+            'turn': game.turn,
+            'next_team_id': next_team.id if next_team else None,
+        },
+    })
@@ -0,0 +1,55 @@
+from django.db import models
+
+
+def set_bits(value):
+    """Returns the indexes of the bits set in a non-negative int, lowest
+    first. Runs in time proportional to the size of the int plus the number
+    of bits set, so suits large, sparse masks."""
+    binary = bin(value)[:1:-1]
+    indexes = []
+    index = binary.find('1')
+    while index != -1:
+        indexes.append(index)
+        index = binary.find('1', index + 1)
+    return indexes
+
+
+def pack_mask(value):
+    """Returns a non-negative int as hexadecimal text, or as 's' followed by
+    the comma separated indexes of its set bits where that is shorter, so
+    large boards with few ships or shots stay small."""
+    dense = format(value, 'x')
+    bit_count = bin(value).count('1')
+    if bit_count * (len(str(value.bit_length())) + 1) < len(dense):
+        return 's' + ','.join(str(index) for index in set_bits(value))
+    return dense
+
+
+def unpack_mask(value):
+    """Returns the int packed by pack_mask."""
+    if value.startswith('s'):
+        mask = 0
+        for index in value[1:].split(','):
+            if index:
+                mask |= 1 << int(index)
+        return mask
+    return int(value, 16)
+
+
+class BitmaskField(models.TextField):
+    """An arbitrarily large non-negative int, stored as text by pack_mask."""
+
+    description = 'Bitmask of arbitrary size'
+
+    def from_db_value(self, value, expression, connection, context):
+        return self.to_python(value)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, int):
+            return value
+        return unpack_mask(value)
+
+    def get_prep_value(self, value):
+        if value is None:
+            return None
+        return pack_mask(self.to_python(value))
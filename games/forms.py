@@ -1,12 +1,19 @@
 from django import forms
 
+from games.models import GAME_SIZE
+from games.models import MAX_GAME_SIZE
+from games.models import MAX_TEAMS
+from games.models import SPARSE_BOARD_TILES
+from games.models import default_fleet
+from games.util import column_name
+
 
 class CreateGameForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
-        max_players = kwargs.pop('max_players')
+        self.max_players = kwargs.pop('max_players')
         super(CreateGameForm, self).__init__(*args, **kwargs)
-        for i in range(0, max_players):
+        for i in range(0, self.max_players):
             field_name = 'opponent_username_{}'.format(i)
             self.fields[field_name] = forms.CharField(
                 label='Opponent {}'.format(i+1),
@@ -18,29 +25,121 @@ class CreateGameForm(forms.Form):
             # Minimum of one player required
             self.fields[field_name].required = (i == 0)
 
+        # Any number of further opponents, up to MAX_TEAMS players in all
+        self.fields['more_opponents'] = forms.CharField(
+            label='More opponents',
+            required=False,
+            widget=forms.Textarea
+        )
+        self.fields['more_opponents'].widget.attrs.update({
+            'class': 'form-control',
+            'rows': 3,
+            'placeholder': 'Usernames separated by commas or spaces'
+        })
 
-class AttackForm(forms.Form):
+        # Board settings are optional and default to the classic game
+        for field_name in ['width', 'height']:
+            self.fields[field_name] = forms.IntegerField(
+                label=field_name.capitalize(),
+                min_value=1,
+                max_value=MAX_GAME_SIZE,
+                required=False
+            )
+            self.fields[field_name].widget.attrs.update({
+                'class': 'form-control',
+                'placeholder': GAME_SIZE
+            })
+        self.fields['fleet'] = forms.CharField(
+            label='Ship lengths',
+            max_length=255,
+            required=False
+        )
+        self.fields['fleet'].widget.attrs.update({
+            'class': 'form-control',
+            'placeholder': default_fleet()
+        })
+
+    def clean_more_opponents(self):
+        return self.cleaned_data['more_opponents'].replace(',', ' ').split()
+
+    def clean(self):
+        cleaned_data = super(CreateGameForm, self).clean()
+        if len(self.get_opponent_usernames()) + 1 > MAX_TEAMS:
+            raise forms.ValidationError(
+                'A game can have at most {} players.'.format(MAX_TEAMS)
+            )
+        return cleaned_data
+
+    def get_opponent_usernames(self):
+        """Returns the usernames of every opponent entered, in order."""
+        usernames = []
+        for i in range(0, self.max_players):
+            field_name = 'opponent_username_{}'.format(i)
+            if self.cleaned_data.get(field_name):
+                usernames.append(self.cleaned_data[field_name])
+        return usernames + self.cleaned_data.get('more_opponents', [])
+
+    def clean_width(self):
+        return self.cleaned_data['width'] or GAME_SIZE
+
+    def clean_height(self):
+        return self.cleaned_data['height'] or GAME_SIZE
+
+    def clean_fleet(self):
+        fleet = self.cleaned_data['fleet'].replace(' ', '')
+        if not fleet:
+            return default_fleet()
+        try:
+            lengths = [int(length) for length in fleet.split(',')]
+        except ValueError:
+            raise forms.ValidationError(
+                'Enter ship lengths separated by commas.'
+            )
+        if any(length < 1 for length in lengths):
+            raise forms.ValidationError(
+                'Ships must have a length of 1 or more.'
+            )
+        return ','.join(str(length) for length in lengths)
 
-    X_CHOICES = (
-        (x, chr(x + ord('A')))
-        for x in range(0, 10)
-    )
-    Y_CHOICES = (
-        (y, str(y))
-        for y in range(0, 10)
-    )
-    target_x = forms.ChoiceField(choices=X_CHOICES)
-    target_y = forms.ChoiceField(choices=Y_CHOICES)
+
+class AttackForm(forms.Form):
 
     def __init__(self, *args, **kwargs):
         other_teams = kwargs.pop('other_teams')
+        width = kwargs.pop('width', GAME_SIZE)
+        height = kwargs.pop('height', GAME_SIZE)
         super(AttackForm, self).__init__(*args, **kwargs)
-        self.fields['target_x'].widget.attrs = {
+
+        # Large boards would need thousands of choices, so take numbers
+        if width * height > SPARSE_BOARD_TILES:
+            self.fields['target_x'] = forms.IntegerField(
+                min_value=0,
+                max_value=width - 1
+            )
+            self.fields['target_y'] = forms.IntegerField(
+                min_value=0,
+                max_value=height - 1
+            )
+        else:
+            self.fields['target_x'] = forms.ChoiceField(
+                choices=(
+                    (x, column_name(x))
+                    for x in range(0, width)
+                )
+            )
+            self.fields['target_y'] = forms.ChoiceField(
+                choices=(
+                    (y, str(y))
+                    for y in range(0, height)
+                )
+            )
+        # Keep the min and max attributes of numeric fields
+        self.fields['target_x'].widget.attrs.update({
             'class': 'form-control col-md-1'
-        }
-        self.fields['target_y'].widget.attrs = {
+        })
+        self.fields['target_y'].widget.attrs.update({
             'class': 'form-control col-md-1'
-        }
+        })
         self.fields['target_team'] = forms.ChoiceField(
             choices=(
                 (team.id, team.player.user.username)
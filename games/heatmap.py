@@ -0,0 +1,88 @@
+from collections import defaultdict
+
+import numpy
+from django.conf import settings
+from django.core.cache import caches
+
+from games.ai import placement_density
+from games.ai import window_tiles
+from games.bitboard import tile_bit
+from games.models import Shot
+
+# Tiles are shaded from 1, least likely to hold a ship, to HEAT_LEVELS, most
+# likely. Tiles which can't hold a ship are 0.
+HEAT_LEVELS = 5
+# Seconds a heatmap is cached. Each one is for a single turn, so this only
+# bounds how long the heatmaps of finished turns linger.
+HEATMAP_TIMEOUT = 600
+
+
+def heat_levels(shot_mask, hit_mask, sunk_mask, fleet, width, height):
+    """Returns how likely each tile of a board is to hold a ship, as bytes
+    of heat levels laid out row by row. Only what opponents can see is used:
+    the tiles shot, the shots which hit, the shots which sank a ship and the
+    lengths of the ships in the fleet. Which ship was sunk isn't shown, so
+    every length in the fleet is weighed until they all are."""
+    if bin(sunk_mask).count('1') >= len(fleet):
+        return bytes(width * height)
+
+    # A tile whose shot sank a ship can't be part of another one
+    unresolved = hit_mask & ~sunk_mask
+    density = placement_density(
+        fleet,
+        window_tiles(shot_mask, width, 0, 0, width, height),
+        window_tiles(unresolved, width, 0, 0, width, height),
+        width,
+        height
+    )
+    best = density.max()
+    if best == 0:
+        return bytes(width * height)
+    levels = numpy.ceil(density * (HEAT_LEVELS / best))
+    return levels.astype(numpy.uint8).tobytes()
+
+
+def heatmap_key(team, turn):
+    return 'games:heatmap:{}:{}'.format(team.id, turn)
+
+
+def get_heatmaps(game, teams):
+    """Returns the heat levels of each team's board by team id. Boards only
+    change when the turn does, so heatmaps are cached per team and turn, and
+    the shots which hit any teams not cached are read in a single query."""
+    cache = caches[getattr(settings, 'GAMES_HEATMAP_CACHE', 'default')]
+    keys = {heatmap_key(team, game.turn): team for team in teams}
+    heatmaps = {
+        keys[key].id: levels
+        for key, levels in cache.get_many(list(keys)).items()
+    }
+
+    missing = [team for team in teams if team.id not in heatmaps]
+    if missing:
+        hit_masks = defaultdict(int)
+        sunk_masks = defaultdict(int)
+        shots = Shot.objects.filter(
+            defending_team__in=missing
+        ).exclude(
+            result=Shot.RESULTS['MISS']
+        ).values_list('defending_team_id', 'x', 'y', 'result')
+        for team_id, x, y, result in shots:
+            bit = tile_bit(x, y, game.width)
+            hit_masks[team_id] |= bit
+            if result != Shot.RESULTS['HIT']:
+                sunk_masks[team_id] |= bit
+
+        fleet = game.get_fleet()
+        computed = {}
+        for team in missing:
+            heatmaps[team.id] = heat_levels(
+                team.hit_mask,
+                hit_masks[team.id],
+                sunk_masks[team.id],
+                fleet,
+                game.width,
+                game.height
+            )
+            computed[heatmap_key(team, game.turn)] = heatmaps[team.id]
+        cache.set_many(computed, HEATMAP_TIMEOUT)
+    return heatmaps
@@ -0,0 +1,193 @@
+import copy
+import json
+
+from games.archive import GameArchive
+from games.bitboard import ship_mask
+from games.boards import Board
+from games.boards import GameBoards
+from games.engine import GameEngine
+from games.fields import pack_mask
+from games.fields import unpack_mask
+from games.models import GameEvent
+from games.models import GameSnapshot
+from games.models import Ship
+from games.models import Shot
+
+# Boards are snapshotted at least once every this many turns, so replaying
+# any turn applies little more than this many shots
+SNAPSHOT_INTERVAL = 20
+
+
+def creation_events(game, teams, fleets):
+    """Returns the unsaved events logging a game's creation, given its
+    teams and their ships in the same order."""
+    events = [GameEvent(
+        game=game,
+        kind=GameEvent.KINDS['CREATED'],
+        data=json.dumps({
+            'width': game.width,
+            'height': game.height,
+            'fleet': game.fleet,
+        })
+    )]
+    for team, ships in zip(teams, fleets):
+        events.append(GameEvent(
+            game=game,
+            kind=GameEvent.KINDS['SHIPS_PLACED'],
+            team=team,
+            data=json.dumps({
+                'last_turn': team.last_turn,
+                'ships': [
+                    [ship.x, ship.y, ship.length, ship.direction]
+                    for ship in ships
+                ],
+            })
+        ))
+    return events
+
+
+def attack_events(attacks):
+    """Returns the unsaved events logging the shots of attacks, given as the
+    arguments to games.events.publish_attack."""
+    events = []
+    for attack in attacks:
+        shot = attack['shot']
+        events.append(GameEvent(
+            game=attack['game'],
+            turn=shot.turn,
+            kind=GameEvent.KINDS['SHOT'],
+            team=shot.attacking_team,
+            data=json.dumps({
+                'target': shot.defending_team_id,
+                'x': shot.x,
+                'y': shot.y,
+                'result': shot.result,
+            })
+        ))
+        if shot.result == Shot.RESULTS['DEFEATED']:
+            events.append(GameEvent(
+                game=attack['game'],
+                turn=shot.turn,
+                kind=GameEvent.KINDS['DEFEATED'],
+                team=attack['defending_team']
+            ))
+    return events
+
+
+def take_snapshot(game, engine):
+    """Returns an unsaved snapshot of the boards held by an engine."""
+    return GameSnapshot(
+        game=game,
+        turn=engine.turn,
+        state=json.dumps([
+            [
+                team_id,
+                engine.last_turns[index],
+                engine.alive[index],
+                pack_mask(engine.hit_masks[index]),
+            ]
+            for index, team_id in enumerate(engine.team_ids)
+        ])
+    )
+
+
+def record_attacks(stored_game, attacks, first_turn):
+    """Logs attacks made on a stored game from first_turn onwards in a single
+    insert, and snapshots its boards if they passed a multiple of
+    SNAPSHOT_INTERVAL turns."""
+    GameEvent.objects.bulk_create(attack_events(attacks))
+
+    turn = stored_game.engine.turn
+    if turn // SNAPSHOT_INTERVAL > first_turn // SNAPSHOT_INTERVAL:
+        take_snapshot(stored_game.game, stored_game.engine).save()
+
+
+def replay(game, turn):
+    """Returns a GameEngine holding a game's boards at the start of a turn,
+    loaded from the nearest snapshot before it and the shots logged since.
+    Returns None if the game predates its log. Archived games are replayed
+    from their archive instead."""
+    if game.archived:
+        return GameArchive.unpack(game.archive.data).replay(turn)
+
+    placements = list(game.events.filter(
+        kind=GameEvent.KINDS['SHIPS_PLACED']
+    ).order_by('id'))
+    if not placements:
+        return None
+
+    snapshot = game.snapshots.filter(turn__lte=turn).order_by('-turn').first()
+    if snapshot is None:
+        engine = GameEngine(game.width, game.height)
+        state = [
+            [event.team_id, json.loads(event.data)['last_turn'], True, '0']
+            for event in placements
+        ]
+    else:
+        engine = GameEngine(game.width, game.height, turn=snapshot.turn)
+        state = json.loads(snapshot.state)
+
+    ship_masks = {}
+    for event in placements:
+        ship_masks[event.team_id] = [
+            ship_mask(
+                Ship(x=x, y=y, length=length, direction=direction),
+                game.width,
+                game.height
+            )
+            for x, y, length, direction in json.loads(event.data)['ships']
+        ]
+    for team_id, last_turn, alive, hit_mask in state:
+        engine.add_team(
+            team_id,
+            ship_masks[team_id],
+            last_turn=last_turn,
+            hit_mask=unpack_mask(hit_mask),
+            alive=alive
+        )
+
+    shots = game.events.filter(
+        kind=GameEvent.KINDS['SHOT'],
+        turn__gte=engine.turn,
+        turn__lt=turn
+    ).order_by('turn', 'id')
+    for event in shots:
+        data = json.loads(event.data)
+        engine.fire(data['target'], data['x'], data['y'])
+    return engine
+
+
+def replay_boards(game, turn):
+    """Returns the GameBoards of a game at the start of a turn, with unsaved
+    copies of its game and teams as they were then. Returns None if the
+    game predates its log."""
+    engine = replay(game, turn)
+    if engine is None:
+        return None
+
+    past_game = copy.copy(game)
+    past_game.turn = turn
+    winner_id = engine.winner()
+
+    teams = []
+    boards = {}
+    for team in game.teams.select_related('player__user').order_by('id'):
+        state = engine.team_state(team.id)
+        past_team = copy.copy(team)
+        past_team.occupancy_mask = engine.occupancy_masks[
+            engine.indexes[team.id]
+        ]
+        past_team.hit_mask = state.hit_mask
+        past_team.hits_remaining = state.hits_remaining
+        past_team.alive = state.alive
+        past_team.last_turn = state.last_turn
+        past_team.winner = (team.id == winner_id)
+        teams.append(past_team)
+        boards[team.id] = Board.from_team(past_team, game.width)
+
+    return GameBoards(
+        game=past_game,
+        teams=teams,
+        boards=boards,
+        next_team_id=engine.next_team()
+    )
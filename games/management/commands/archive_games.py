@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+
+from games.archive import DELETE_BATCH_SIZE
+from games.archive import archive_game
+from games.archive import delete_archived_rows
+from games.models import Game
+
+
+class Command(BaseCommand):
+    help = 'Packs the ships and shots of every finished game into a single '\
+        'archive record, then deletes their rows in batches. Archived '\
+        'games are still shown by GameView from their teams\' boards.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Archive at most this many games.'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DELETE_BATCH_SIZE,
+            help='Number of rows deleted by each query.'
+        )
+
+    def handle(self, *args, **options):
+        games = Game.objects.filter(
+            archived=False,
+            alive_count__lte=1
+        ).order_by('id')
+        if options['limit'] is not None:
+            games = games[:options['limit']]
+
+        archived_count = 0
+        for game in games:
+            if archive_game(game):
+                archived_count += 1
+
+        # Rows left by earlier runs which stopped part way are deleted too
+        deleted_count = delete_archived_rows(options['batch_size'])
+
+        self.stdout.write(
+            'Archived {} games and deleted {} rows.'.format(
+                archived_count,
+                deleted_count
+            )
+        )
@@ -0,0 +1,219 @@
+import random
+import threading
+import time
+import uuid
+
+from django.contrib import messages
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from games.models import GAME_SIZE
+from games.models import Game
+from games.models import Shot
+from games.models import Team
+from games.views import AttackView
+from games.views import CreateGameView
+from games.views import GAME_BUSY_MESSAGE
+from players.models import Player
+
+
+class Command(BaseCommand):
+    help = 'Plays games through AttackView from several threads at once and '\
+        'reports the database queries and time taken by each attack.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--games',
+            type=int,
+            default=10,
+            help='Number of two player games to play.'
+        )
+        parser.add_argument(
+            '--threads',
+            type=int,
+            default=4,
+            help='Number of threads submitting attacks.'
+        )
+        parser.add_argument(
+            '--turns',
+            type=int,
+            default=20,
+            help='Number of turns to play in each game.'
+        )
+
+    def handle(self, *args, **options):
+        self.factory = RequestFactory()
+        self.lock = threading.Lock()
+        self.turns = options['turns']
+        self.turns_played = {}
+        self.timings = []
+        self.query_counts = []
+        self.rejected = 0
+        self.busy = 0
+        self.errors = 0
+
+        prefix = 'benchmark-{}'.format(uuid.uuid4().hex[:8])
+        users = []
+        try:
+            # Each player is a worker item: its user, team and target
+            players = []
+            for i in range(options['games']):
+                user = User.objects.create_user('{}-{}'.format(prefix, i * 2))
+                opponent = User.objects.create_user(
+                    '{}-{}'.format(prefix, i * 2 + 1)
+                )
+                users.extend([user, opponent])
+                Player(user=user).save()
+                Player(user=opponent).save()
+                players.extend(self.create_game(user, opponent))
+
+            start = time.time()
+            if options['threads'] == 1:
+                self.play(players)
+            else:
+                workers = [
+                    threading.Thread(
+                        target=self.play_in_thread,
+                        args=(players[i::options['threads']],)
+                    )
+                    for i in range(options['threads'])
+                ]
+                for worker in workers:
+                    worker.start()
+                for worker in workers:
+                    worker.join()
+            elapsed = time.time() - start
+
+            self.report(elapsed, [player['game_id'] for player in players])
+        finally:
+            Game.objects.filter(teams__player__user__in=users).delete()
+            User.objects.filter(id__in=[user.id for user in users]).delete()
+
+    def create_game(self, user, opponent):
+        request = self.factory.post('/games/create_game/', {
+            'opponent_username_0': opponent.username,
+        })
+        request.user = user
+        request._messages = CookieStorage(request)
+        CreateGameView.as_view()(request)
+
+        team = Team.objects.get(player__user=user)
+        opponent_team = Team.objects.get(player__user=opponent)
+        self.turns_played[team.game_id] = 0
+        return [
+            {
+                'user': user,
+                'game_id': team.game_id,
+                'target_team_id': opponent_team.id,
+            },
+            {
+                'user': opponent,
+                'game_id': team.game_id,
+                'target_team_id': team.id,
+            },
+        ]
+
+    def play(self, players):
+        """Keeps attacking for each of players until their games have been
+        played for enough turns."""
+        tiles = [(x, y) for x in range(GAME_SIZE) for y in range(GAME_SIZE)]
+        for player in players:
+            player['tiles'] = random.sample(tiles, len(tiles))
+
+        while True:
+            waiting = [
+                player
+                for player in players
+                if self.turns_played[player['game_id']] < self.turns
+            ]
+            if not waiting:
+                break
+            for player in waiting:
+                self.attack(player)
+
+    def play_in_thread(self, players):
+        try:
+            self.play(players)
+        finally:
+            connection.close()
+
+    def attack(self, player):
+        x, y = player['tiles'][-1]
+        request = self.factory.post('/', {
+            'target_x': x,
+            'target_y': y,
+            'target_team': player['target_team_id'],
+        })
+        request.user = player['user']
+        request._messages = CookieStorage(request)
+
+        start = time.time()
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                AttackView.as_view()(request, game_id=player['game_id'])
+        except OperationalError:
+            # AttackView turns lock timeouts into GAME_BUSY_MESSAGE, so these
+            # are any other database errors
+            with self.lock:
+                self.errors += 1
+            return
+        elapsed = time.time() - start
+
+        errors = [
+            message.message
+            for message in request._messages
+            if message.level == messages.ERROR
+        ]
+        with self.lock:
+            if GAME_BUSY_MESSAGE in errors:
+                self.busy += 1
+            elif errors:
+                self.rejected += 1
+                if 'This game is over!' in errors:
+                    self.turns_played[player['game_id']] = self.turns
+                if 'You\'ve already shot there!' in errors:
+                    player['tiles'].pop()
+            else:
+                player['tiles'].pop()
+                self.turns_played[player['game_id']] += 1
+                self.timings.append(elapsed)
+                self.query_counts.append(len(queries))
+
+    def report(self, elapsed, game_ids):
+        attacks = len(self.timings)
+        self.stdout.write('Attacks: {}'.format(attacks))
+        self.stdout.write('Rejected: {}'.format(self.rejected))
+        self.stdout.write('Busy: {}'.format(self.busy))
+        self.stdout.write('Errors: {}'.format(self.errors))
+        self.stdout.write('Elapsed: {:.2f}s ({:.1f} attacks/s)'.format(
+            elapsed,
+            attacks / elapsed if elapsed else 0
+        ))
+        if attacks:
+            self.stdout.write(
+                'Queries per attack: min {} mean {:.1f} max {}'.format(
+                    min(self.query_counts),
+                    sum(self.query_counts) / attacks,
+                    max(self.query_counts)
+                )
+            )
+            timings = sorted(self.timings)
+            self.stdout.write(
+                'Latency: median {:.1f}ms p95 {:.1f}ms'.format(
+                    timings[attacks // 2] * 1000,
+                    timings[min(attacks - 1, int(attacks * 0.95))] * 1000
+                )
+            )
+
+        # Every accepted attack must have produced exactly one shot and
+        # advanced its game by exactly one turn
+        games = Game.objects.filter(id__in=game_ids)
+        lost = sum(game.turn for game in games) - attacks
+        shots = Shot.objects.filter(game__in=game_ids).count()
+        self.stdout.write('Shots recorded: {}'.format(shots))
+        self.stdout.write('Lost or duplicated turns: {}'.format(abs(lost)))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from games.bots import play_bots
+from games.events import publish_attack
+from games.history import record_attacks
+from games.models import Game
+from games.models import Team
+from games.persistence import StoredGame
+from games.persistence import lock_game
+
+
+class Command(BaseCommand):
+    help = 'Plays out every game in progress in which only bots are left. '\
+        'AttackView plays these on after the last human is defeated, but '\
+        'only for a moment, so games on large boards may be left unfinished.'
+
+    def handle(self, *args, **options):
+        human_games = Team.objects.filter(
+            alive=True,
+            player__is_bot=False
+        ).values('game_id')
+        games = Game.objects.filter(
+            alive_count__gt=1
+        ).exclude(id__in=human_games).order_by('id')
+
+        finished_count = 0
+        for game in games:
+            with transaction.atomic():
+                game = lock_game(game.pk)
+                stored_game = StoredGame.load(game)
+                first_turn = game.turn
+                attacks = play_bots(stored_game, budget=None)
+                record_attacks(stored_game, attacks, first_turn)
+
+            for attack in attacks:
+                publish_attack(**attack)
+            if stored_game.engine.winner() is not None:
+                finished_count += 1
+
+        self.stdout.write('Finished {} games.'.format(finished_count))
@@ -0,0 +1,63 @@
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.util import get_next_team
+from games.util import rebuild_board
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the packed board state of every team from the Ship '\
+        'and Shot tables, and the turn pointer of every game. Archived '\
+        'games, whose ships and shots are gone, are skipped.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'game_ids',
+            nargs='*',
+            type=int,
+            help='Only rebuild these games.'
+        )
+
+    def handle(self, *args, **options):
+        games = Game.objects.filter(archived=False).order_by('id')
+        if options['game_ids']:
+            games = games.filter(id__in=options['game_ids'])
+
+        team_count = 0
+        for game in games:
+            ships_by_team = defaultdict(list)
+            for ship in Ship.objects.filter(team__game=game):
+                ships_by_team[ship.team_id].append(ship)
+
+            shots_by_team = defaultdict(list)
+            for shot in Shot.objects.filter(game=game):
+                shots_by_team[shot.defending_team_id].append(shot)
+
+            with transaction.atomic():
+                teams = list(game.teams.select_for_update().order_by('id'))
+                for team in teams:
+                    rebuild_board(
+                        team,
+                        ships=ships_by_team[team.id],
+                        shots=shots_by_team[team.id],
+                        width=game.width,
+                        height=game.height
+                    )
+                    team.save(update_fields=[
+                        'occupancy_mask',
+                        'hit_mask',
+                        'hits_remaining'
+                    ])
+                    team_count += 1
+
+                next_team = get_next_team(teams)
+                game.next_team_id = next_team.id if next_team else None
+                game.alive_count = len([team for team in teams if team.alive])
+                game.save(update_fields=['next_team', 'alive_count'])
+
+        self.stdout.write('Rebuilt boards for {} teams.'.format(team_count))
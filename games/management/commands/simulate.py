@@ -0,0 +1,137 @@
+import csv
+import multiprocessing
+import time
+from functools import partial
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from games.models import GAME_SIZE
+from games.models import default_fleet
+from games.simulation import simulate_game
+
+
+class Command(BaseCommand):
+    help = 'Plays games between bots in memory across a pool of processes, '\
+        'without HTTP or the database, and writes the result of each game '\
+        'to a CSV file.'
+    # Games are played without the database, so models needn't be checked
+    requires_system_checks = False
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--games',
+            type=int,
+            default=1000,
+            help='Number of games to play.'
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=multiprocessing.cpu_count(),
+            help='Number of processes playing games.'
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+            help='Seed of the first game. Each game is seeded with the next '
+                 'number, so runs with the same seed play the same games.'
+        )
+        parser.add_argument(
+            '--teams',
+            type=int,
+            default=2,
+            help='Number of teams in each game.'
+        )
+        parser.add_argument('--width', type=int, default=GAME_SIZE)
+        parser.add_argument('--height', type=int, default=GAME_SIZE)
+        parser.add_argument(
+            '--fleet',
+            default=default_fleet(),
+            help='Comma separated lengths of the ships in each fleet.'
+        )
+        parser.add_argument(
+            '--output',
+            default='simulation.csv',
+            help='File to write the result of each game to.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            fleet = [int(length) for length in options['fleet'].split(',')]
+        except ValueError:
+            raise CommandError('Invalid fleet: {}'.format(options['fleet']))
+        play = partial(
+            simulate_game,
+            width=options['width'],
+            height=options['height'],
+            fleet=fleet,
+            team_count=options['teams']
+        )
+        seeds = range(options['seed'], options['seed'] + options['games'])
+        processes = options['processes']
+
+        pool = None
+        if processes > 1:
+            pool = multiprocessing.Pool(processes)
+        try:
+            start = time.time()
+            # Results are written as they arrive, in seed order
+            if pool is None:
+                results = map(play, seeds)
+            else:
+                results = pool.imap(play, seeds, chunksize=16)
+            summary = self.write_results(options['output'], results)
+            elapsed = time.time() - start
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+        self.report(summary, elapsed, processes)
+
+    def write_results(self, path, results):
+        """Writes each result to a CSV file at path and returns the number
+        of games played and won, and the total turns to win, shots and
+        hits."""
+        games = wins = winner_shots = shots = hits = 0
+        with open(path, 'w', newline='') as output:
+            writer = csv.writer(output)
+            writer.writerow([
+                'seed',
+                'turns',
+                'winner',
+                'winner_shots',
+                'hit_rate',
+            ])
+            for result in results:
+                writer.writerow([
+                    result.seed,
+                    result.turns,
+                    '' if result.winner is None else result.winner,
+                    '' if result.winner is None else result.winner_shots,
+                    '{:.3f}'.format(result.hit_rate),
+                ])
+                games += 1
+                shots += result.shots
+                hits += result.hits
+                if result.winner is not None:
+                    wins += 1
+                    winner_shots += result.winner_shots
+        return games, wins, winner_shots, shots, hits
+
+    def report(self, summary, elapsed, processes):
+        games, wins, winner_shots, shots, hits = summary
+        self.stdout.write('Games: {}'.format(games))
+        self.stdout.write('Elapsed: {:.2f}s ({:.1f} games/s, {:.1f} games/s '
+                          'per process)'.format(
+                              elapsed,
+                              games / elapsed if elapsed else 0,
+                              games / elapsed / processes if elapsed else 0
+                          ))
+        if wins:
+            self.stdout.write(
+                'Mean shots to win: {:.1f}'.format(winner_shots / wins)
+            )
+        if shots:
+            self.stdout.write('Hit rate: {:.3f}'.format(hits / shots))
@@ -0,0 +1,125 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Game',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('turn', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Ship',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('x', models.IntegerField()),
+                ('y', models.IntegerField()),
+                ('length', models.IntegerField()),
+                (
+                    'direction',
+                    models.IntegerField(
+                        choices=[
+                            (0, 'North'),
+                            (1, 'South'),
+                            (2, 'East'),
+                            (3, 'West'),
+                        ]
+                    )
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Shot',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('x', models.IntegerField()),
+                ('y', models.IntegerField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Team',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('last_turn', models.IntegerField(default=0)),
+                ('winner', models.BooleanField(default=False)),
+                ('alive', models.BooleanField(default=True)),
+                (
+                    'game',
+                    models.ForeignKey(related_name='teams', to='games.Game')
+                ),
+                (
+                    'player',
+                    models.ForeignKey(
+                        related_name='teams',
+                        to='players.Player'
+                    )
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='attacking_team',
+            field=models.ForeignKey(
+                related_name='shots_fired',
+                to='games.Team'
+            ),
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='defending_team',
+            field=models.ForeignKey(
+                related_name='shots_taken',
+                to='games.Team'
+            ),
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='game',
+            field=models.ForeignKey(related_name='shots', to='games.Game'),
+        ),
+        migrations.AddField(
+            model_name='ship',
+            name='team',
+            field=models.ForeignKey(related_name='ships', to='games.Team'),
+        ),
+    ]
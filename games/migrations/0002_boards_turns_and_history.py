@@ -0,0 +1,219 @@
+from django.db import migrations
+from django.db import models
+from django.db.models import Count
+from django.db.models import Min
+from django.db.models.deletion import SET_NULL
+
+from games.fields import BitmaskField
+from games.models import default_fleet
+
+
+def delete_duplicate_shots(apps, schema_editor):
+    """Deletes all but the first shot at each tile of each board. Different
+    attackers could shoot the same tile before shots were unique per
+    board."""
+    Shot = apps.get_model('games', 'Shot')
+    duplicates = Shot.objects.values(
+        'game_id',
+        'defending_team_id',
+        'x',
+        'y'
+    ).annotate(
+        first_id=Min('id'),
+        shot_count=Count('id')
+    ).filter(shot_count__gt=1)
+    for duplicate in duplicates:
+        Shot.objects.filter(
+            game_id=duplicate['game_id'],
+            defending_team_id=duplicate['defending_team_id'],
+            x=duplicate['x'],
+            y=duplicate['y']
+        ).exclude(id=duplicate['first_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedGame',
+            fields=[
+                (
+                    'game',
+                    models.OneToOneField(
+                        primary_key=True,
+                        serialize=False,
+                        related_name='archive',
+                        to='games.Game'
+                    )
+                ),
+                ('data', models.BinaryField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GameEvent',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('turn', models.IntegerField(default=0)),
+                (
+                    'kind',
+                    models.IntegerField(
+                        choices=[
+                            (0, 'Created'),
+                            (1, 'Ships placed'),
+                            (2, 'Shot'),
+                            (3, 'Defeated'),
+                        ]
+                    )
+                ),
+                ('data', models.TextField(default='{}')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='GameSnapshot',
+            fields=[
+                (
+                    'id',
+                    models.AutoField(
+                        verbose_name='ID',
+                        primary_key=True,
+                        serialize=False,
+                        auto_created=True
+                    )
+                ),
+                ('turn', models.IntegerField()),
+                ('state', models.TextField()),
+            ],
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='alive_count',
+            field=models.IntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='fleet',
+            field=models.CharField(
+                max_length=255,
+                default=default_fleet
+            ),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='height',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='next_team',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                related_name='+',
+                on_delete=SET_NULL,
+                to='games.Team'
+            ),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='width',
+            field=models.IntegerField(default=10),
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='result',
+            field=models.IntegerField(
+                default=0,
+                choices=[
+                    (0, 'Miss'),
+                    (1, 'Hit'),
+                    (2, 'Sunk'),
+                    (3, 'Defeated'),
+                ]
+            ),
+        ),
+        migrations.AddField(
+            model_name='shot',
+            name='turn',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='hit_mask',
+            field=BitmaskField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='hits_remaining',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='team',
+            name='occupancy_mask',
+            field=BitmaskField(default=0),
+        ),
+        migrations.RunPython(
+            delete_duplicate_shots,
+            migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name='shot',
+            unique_together=set([('game', 'defending_team', 'x', 'y')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='game',
+            index_together=set([('archived', 'alive_count')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='shot',
+            index_together=set([('game', 'turn')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='team',
+            index_together=set([('player', 'alive', 'winner')]),
+        ),
+        migrations.AddField(
+            model_name='gamesnapshot',
+            name='game',
+            field=models.ForeignKey(related_name='snapshots', to='games.Game'),
+        ),
+        migrations.AddField(
+            model_name='gameevent',
+            name='game',
+            field=models.ForeignKey(related_name='events', to='games.Game'),
+        ),
+        migrations.AddField(
+            model_name='gameevent',
+            name='team',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                related_name='+',
+                to='games.Team'
+            ),
+        ),
+        migrations.AlterUniqueTogether(
+            name='gamesnapshot',
+            unique_together=set([('game', 'turn')]),
+        ),
+        migrations.AlterIndexTogether(
+            name='gameevent',
+            index_together=set([('game', 'kind', 'turn')]),
+        ),
+    ]
@@ -1,15 +1,63 @@
 from django.db import models
 
+from games.fields import BitmaskField
 from players.models import Player
 
 GAME_SIZE = 10
+MAX_GAME_SIZE = 1000
 MAX_PLAYERS = 4
+# Games may hold more teams than MAX_PLAYERS when extra opponents are listed
+# together. These large games only show full boards for the viewing team and
+# the team it is targeting, and list every other team in summary.
+MAX_TEAMS = 128
+
+# Boards with more tiles than this are shown as a list of the tiles which
+# have been shot or hold a ship, rather than as a full grid.
+SPARSE_BOARD_TILES = 2500
+
+
+def default_fleet():
+    return ','.join(str(length) for length in Ship.LENGTHS)
 
 
 class Game(models.Model):
     """Model containing information on a single game of Battleships."""
     turn = models.IntegerField(default=0)
 
+    width = models.IntegerField(default=GAME_SIZE)
+    height = models.IntegerField(default=GAME_SIZE)
+    # Comma separated lengths of the ships in every team's fleet
+    fleet = models.CharField(max_length=255, default=default_fleet)
+
+    # Turn pointer and alive team counter, advanced with every attack so
+    # whose turn it is and whether the game is over can be read from this
+    # row alone. Null for games which predate them, which are computed from
+    # their teams instead.
+    next_team = models.ForeignKey(
+        'Team',
+        null=True,
+        blank=True,
+        related_name='+',
+        on_delete=models.SET_NULL
+    )
+    alive_count = models.IntegerField(null=True, blank=True)
+
+    # Set once a finished game's ships, shots and log have been packed into
+    # an ArchivedGame. Its teams are kept, boards and all.
+    archived = models.BooleanField(default=False)
+
+    class Meta:
+        # Finding finished games to archive, and the rows of archived games
+        index_together = [('archived', 'alive_count')]
+
+    def get_fleet(self):
+        """Returns the lengths of the ships in each team's fleet."""
+        return [int(length) for length in self.fleet.split(',')]
+
+    def is_sparse(self):
+        """Checks if the game's boards are too large to show as grids."""
+        return self.width * self.height > SPARSE_BOARD_TILES
+
     def __str__(self):
         result = '{} -'.format(self.id)
         for team in self.teams.all():
@@ -28,6 +76,17 @@ class Team(models.Model):
     winner = models.BooleanField(default=False)
     alive = models.BooleanField(default=True)
 
+    # Packed board state, maintained by games.util.place_ships and
+    # games.util.record_shot so a board can be read from this row alone.
+    occupancy_mask = BitmaskField(default=0)
+    hit_mask = BitmaskField(default=0)
+    hits_remaining = models.IntegerField(default=0)
+
+    class Meta:
+        # Counting a player's wins, losses and games in progress, and
+        # listing the games they are still alive in
+        index_together = [('player', 'alive', 'winner')]
+
     def __str__(self):
         return 'Game {} - {} (last_turn={})'.format(
             self.game.id,
@@ -39,12 +98,40 @@ class Team(models.Model):
 class Shot(models.Model):
     """Model containing information of an attack."""
     game = models.ForeignKey(Game, related_name='shots')
-    attacking_team = models.ForeignKey(Team, related_name='shots')
-    defending_team = models.ForeignKey(Team, related_name='shots')
+    attacking_team = models.ForeignKey(Team, related_name='shots_fired')
+    defending_team = models.ForeignKey(Team, related_name='shots_taken')
 
     x = models.IntegerField()
     y = models.IntegerField()
 
+    # Game.turn on which the shot was fired
+    turn = models.IntegerField(default=0)
+
+    RESULTS = {
+        'MISS': 0,
+        'HIT': 1,
+        'SUNK': 2,
+        'DEFEATED': 3
+    }
+
+    RESULT_CHOICES = (
+        (RESULTS['MISS'], 'Miss'),
+        (RESULTS['HIT'], 'Hit'),
+        (RESULTS['SUNK'], 'Sunk'),
+        (RESULTS['DEFEATED'], 'Defeated'),
+    )
+
+    result = models.IntegerField(
+        choices=RESULT_CHOICES,
+        default=RESULTS['MISS']
+    )
+
+    class Meta:
+        # Each tile of a board can only be shot once, whoever shoots it
+        unique_together = ('game', 'defending_team', 'x', 'y')
+        # Reading a game's shots in the order they were fired
+        index_together = [('game', 'turn')]
+
     def __str__(self):
         return 'Game {game_id} - '\
             '{attacking_team} attacked {defending_team} ({x}, {y})'.format(
@@ -107,3 +194,84 @@ class Ship(models.Model):
             elif self.direction == Ship.CARDINAL_DIRECTIONS['WEST']:
                 tiles.append((self.x - i, self.y))
         return tiles
+
+
+class GameEvent(models.Model):
+    """Model containing an entry in a game's log: its creation, a team's ship
+    placements, a shot or a team's defeat. A game's events are ordered by
+    turn, then by id, and are written by games.history."""
+    game = models.ForeignKey(Game, related_name='events')
+    # Game.turn on which the event happened
+    turn = models.IntegerField(default=0)
+
+    KINDS = {
+        'CREATED': 0,
+        'SHIPS_PLACED': 1,
+        'SHOT': 2,
+        'DEFEATED': 3
+    }
+
+    KIND_CHOICES = (
+        (KINDS['CREATED'], 'Created'),
+        (KINDS['SHIPS_PLACED'], 'Ships placed'),
+        (KINDS['SHOT'], 'Shot'),
+        (KINDS['DEFEATED'], 'Defeated'),
+    )
+
+    kind = models.IntegerField(choices=KIND_CHOICES)
+    # The team placing ships, shooting or defeated
+    team = models.ForeignKey(
+        Team,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    # JSON encoded details of the event:
+    #   CREATED: {"width": ..., "height": ..., "fleet": ...}
+    #   SHIPS_PLACED: {"last_turn": ..., "ships": [[x, y, length, direction]]}
+    #   SHOT: {"target": team id, "x": ..., "y": ..., "result": ...}
+    #   DEFEATED: {}
+    data = models.TextField(default='{}')
+
+    class Meta:
+        # Reading a game's events of one kind in order
+        index_together = [('game', 'kind', 'turn')]
+
+    def __str__(self):
+        return 'Game {} - turn {} {}'.format(
+            self.game_id,
+            self.turn,
+            self.get_kind_display()
+        )
+
+
+class GameSnapshot(models.Model):
+    """Model containing the state of every team's board at the start of a
+    turn, so a game can be replayed from the nearest snapshot rather than
+    from its first turn."""
+    game = models.ForeignKey(Game, related_name='snapshots')
+    turn = models.IntegerField()
+    # JSON encoded list of [team id, last turn, alive, packed hit mask] for
+    # each team, with hit masks packed by games.fields.pack_mask
+    state = models.TextField()
+
+    class Meta:
+        unique_together = ('game', 'turn')
+
+    def __str__(self):
+        return 'Game {} - turn {} snapshot'.format(self.game_id, self.turn)
+
+
+class ArchivedGame(models.Model):
+    """Model containing a finished game's ships and ordered shots, packed
+    into a single compressed record by games.archive so their rows can be
+    deleted."""
+    game = models.OneToOneField(
+        Game,
+        primary_key=True,
+        related_name='archive'
+    )
+    data = models.BinaryField()
+
+    def __str__(self):
+        return 'Game {} archive'.format(self.game_id)
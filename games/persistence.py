@@ -0,0 +1,108 @@
+from collections import defaultdict
+from collections import namedtuple
+
+from django.db.models import F
+
+from games.bitboard import ship_mask
+from games.engine import GameEngine
+from games.models import Game
+from games.models import Ship
+
+
+def lock_game(game_id):
+    """Takes the write lock on a game for the rest of the transaction, then
+    returns the game. Raises Game.DoesNotExist if there is no such game."""
+    # SQLite ignores SELECT ... FOR UPDATE and locks the whole database on a
+    # transaction's first write, so two transactions which both read the game
+    # before writing fail with "database is locked" rather than waiting for
+    # each other. Writing first queues them up instead. Other databases lock
+    # just the game's row, as SELECT ... FOR UPDATE would.
+    if not Game.objects.filter(pk=game_id).update(turn=F('turn')):
+        raise Game.DoesNotExist('Game matching query does not exist.')
+    return Game.objects.get(pk=game_id)
+
+
+def is_lock_error(error):
+    """Checks if a database error was caused by waiting on another
+    connection's lock, e.g. SQLite's "database is locked" or a deadlock."""
+    message = str(error).lower()
+    return 'lock' in message or 'busy' in message
+
+
+class StoredGame(namedtuple('StoredGame', ['game', 'teams', 'engine'])):
+    """A GameEngine paired with the Game and Team rows it was loaded from, so
+    moves made in memory can be written back."""
+
+    @classmethod
+    def load(cls, game):
+        """Loads a game's teams and ships into a GameEngine in two queries.
+        Lock the game with lock_game first if the engine's state is to be
+        saved."""
+        teams = list(
+            game.teams.select_related('player__user').order_by('id')
+        )
+
+        ship_masks = defaultdict(list)
+        for ship in Ship.objects.filter(team__game=game):
+            ship_masks[ship.team_id].append(
+                ship_mask(ship, game.width, game.height)
+            )
+
+        engine = GameEngine(game.width, game.height, turn=game.turn)
+        for team in teams:
+            engine.add_team(
+                team.id,
+                ship_masks[team.id],
+                last_turn=team.last_turn,
+                hit_mask=team.hit_mask,
+                alive=team.alive
+            )
+
+        return cls(game=game, teams=teams, engine=engine)
+
+    def team(self, team_id):
+        """Returns the loaded Team with the given id, or None."""
+        for team in self.teams:
+            if team.id == team_id:
+                return team
+        return None
+
+    def save(self):
+        """Copies the engine's state onto the game and its teams, saving only
+        the rows which changed."""
+        winner_id = self.engine.winner()
+        for team in self.teams:
+            state = self.engine.team_state(team.id)
+            update_fields = [
+                field
+                for field, value in [
+                    ('hit_mask', state.hit_mask),
+                    ('hits_remaining', state.hits_remaining),
+                    ('alive', state.alive),
+                    ('last_turn', state.last_turn),
+                    ('winner', team.id == winner_id),
+                ]
+                if getattr(team, field) != value
+            ]
+            if update_fields:
+                team.hit_mask = state.hit_mask
+                team.hits_remaining = state.hits_remaining
+                team.alive = state.alive
+                team.last_turn = state.last_turn
+                team.winner = (team.id == winner_id)
+                team.save(update_fields=update_fields)
+
+        update_fields = [
+            field
+            for field, value in [
+                ('turn', self.engine.turn),
+                ('next_team_id', self.engine.next_team()),
+                ('alive_count', self.engine.alive_count),
+            ]
+            if getattr(self.game, field) != value
+        ]
+        if update_fields:
+            self.game.turn = self.engine.turn
+            self.game.next_team_id = self.engine.next_team()
+            self.game.alive_count = self.engine.alive_count
+            self.game.save(update_fields=update_fields)
@@ -1,8 +1,12 @@
+from collections import OrderedDict
 from collections import namedtuple
 
-from games.models import GAME_SIZE
+from games.bitboard import mask_tiles
+from games.boards import Board
+from games.boards import GameBoards
 from games.models import Shot
-from games.util import is_team_next
+from games.models import Team
+from games.util import column_name
 from players.presentation import PlayerPresenter
 
 
@@ -12,71 +16,227 @@ class GamePresenter(namedtuple(
 )):
 
     @classmethod
-    def from_game(cls, game):
+    def from_game(cls, game, boards=None):
+        if boards is None:
+            boards = GameBoards.load(game)
         return cls(
             id=game.id,
             teams=[
-                TeamPresenter.from_team(team, game)
-                for team in game.teams.all()
+                TeamPresenter.from_team(team, game, boards)
+                for team in boards.teams
             ]
         )
 
 
+class GameSummaryPresenter(namedtuple(
+    'GameSummaryPresenter',
+    ['id', 'opponents']
+)):
+    """Lightweight view of a game for list pages, without any boards."""
+
+    @classmethod
+    def for_player(cls, player):
+        """Returns summaries of every game the player is still alive in, using
+        a single query regardless of the number of games."""
+        teams = Team.objects.filter(
+            game__teams__player=player,
+            game__teams__alive=True
+        ).select_related('player__user').order_by('game_id', 'id').distinct()
+
+        opponents = OrderedDict()
+        for team in teams:
+            game_opponents = opponents.setdefault(team.game_id, [])
+            if team.player_id != player.id:
+                game_opponents.append(team.player.user.username)
+
+        return [
+            cls(id=game_id, opponents=game_opponents)
+            for game_id, game_opponents in opponents.items()
+        ]
+
+
 class TeamPresenter(namedtuple(
     'TeamPresenter',
-    ['player', 'is_next', 'winner', 'alive', 'tiles']
+    ['id', 'player', 'is_next', 'winner', 'alive', 'tiles', 'marks']
 )):
+    """A team and its board. Boards are presented as a grid of tiles, or for
+    sparse games as marks: only the tiles which hold a ship or have been
+    shot, so the cost doesn't depend on the size of the board."""
 
     @staticmethod
-    def make_tiles(team, game):
+    def make_tiles(team, game, boards=None, heatmap=None):
+        if boards is None:
+            boards = GameBoards.load(game)
+        board = boards.board_for(team)
+
         tiles = []
-        for y in range(0, GAME_SIZE):
+        for y in range(0, game.height):
             row = []
-            for x in range(0, GAME_SIZE):
-                row.append(
-                    TilePresenter.from_team(
-                        x=x,
-                        y=y,
-                        team=team,
-                        game=game
-                    )
-                )
+            for x in range(0, game.width):
+                row.append(TilePresenter.from_board(
+                    x=x,
+                    y=y,
+                    board=board,
+                    heat=heatmap[y * game.width + x] if heatmap else 0
+                ))
             tiles.append(row)
         return tiles
 
+    @staticmethod
+    def make_marks(team, game, boards=None):
+        if boards is None:
+            boards = GameBoards.load(game)
+        board = boards.board_for(team)
+
+        return [
+            TilePresenter.from_board(x=x, y=y, board=board)
+            for x, y in board.marked_tiles()
+        ]
+
     @classmethod
-    def from_team(cls, team, game):
+    def from_team(cls, team, game, boards=None, heatmap=None):
+        """heatmap is optionally the heat levels of each tile, as returned by
+        games.heatmap.heat_levels. Sparse boards are never shaded."""
+        if boards is None:
+            boards = GameBoards.load(game)
+        tiles = None
+        marks = None
+        if game.is_sparse():
+            marks = cls.make_marks(team, game, boards)
+        else:
+            tiles = cls.make_tiles(team, game, boards, heatmap)
         return cls(
+            id=team.id,
             player=PlayerPresenter.from_player(team.player),
-            is_next=is_team_next(team, game),
+            is_next=boards.is_next(team),
             winner=team.winner,
             alive=team.alive,
-            tiles=cls.make_tiles(team, game)
+            tiles=tiles,
+            marks=marks
         )
 
 
-class TilePresenter(namedtuple(
-    'TilePresenter',
-    ['x', 'y', 'name', 'is_empty', 'is_hit']
+class TeamSummaryPresenter(namedtuple(
+    'TeamSummaryPresenter',
+    ['id', 'username', 'is_next', 'winner', 'alive', 'hits_remaining']
 )):
+    """A team without its board, for listing the many teams of large
+    games."""
 
     @classmethod
-    def from_team(cls, x, y, team, game):
-        is_empty = True
-        for ship in team.ships.all():
-            if (x, y) in ship.get_tiles():
-                is_empty = False
+    def from_team(cls, team, boards):
+        return cls(
+            id=team.id,
+            username=team.player.user.username,
+            is_next=boards.is_next(team),
+            winner=team.winner,
+            alive=team.alive,
+            hits_remaining=team.hits_remaining
+        )
+
 
-        shots = Shot.objects.filter(game=game, defending_team=team)
-        is_hit = (x, y) in [(shot.x, shot.y) for shot in shots]
+class TilePresenter(namedtuple(
+    'TilePresenter',
+    ['x', 'y', 'name', 'is_empty', 'is_hit', 'heat']
+)):
 
-        x_letter = chr(x + ord('A'))
-        name = '{}{}'.format(x_letter, y)
+    @classmethod
+    def from_board(cls, x, y, board, heat=0):
+        name = '{}{}'.format(column_name(x), y)
 
         return cls(
             x=x,
             y=y,
             name=name,
-            is_empty=is_empty,
-            is_hit=is_hit
+            is_empty=board.is_empty(x, y),
+            is_hit=board.is_hit(x, y),
+            heat=heat
+        )
+
+    @classmethod
+    def from_team(cls, x, y, team, game):
+        return cls.from_board(x, y, Board.from_team(team, game.width))
+
+
+class GameStatePresenter(namedtuple(
+    'GameStatePresenter',
+    ['id', 'turn', 'width', 'height', 'viewer_team_id', 'teams']
+)):
+    """Machine-readable state of a game as seen by one of its teams."""
+
+    @classmethod
+    def from_boards(cls, boards, viewer_team):
+        return cls(
+            id=boards.game.id,
+            turn=boards.game.turn,
+            width=boards.game.width,
+            height=boards.game.height,
+            viewer_team_id=viewer_team.id,
+            teams=[
+                TeamStatePresenter.from_board(
+                    boards.board_for(team),
+                    is_next=boards.is_next(team),
+                    is_viewer=(team.id == viewer_team.id)
+                )
+                for team in boards.teams
+            ]
+        )
+
+    def to_dict(self):
+        state = self._asdict()
+        state['teams'] = [team._asdict() for team in self.teams]
+        return state
+
+
+class TeamStatePresenter(namedtuple(
+    'TeamStatePresenter',
+    ['id', 'username', 'is_next', 'winner', 'alive', 'ships', 'shots']
+)):
+    """State of a single team's board. Ship positions are only included for
+    the viewer's own team; opponents' boards only reveal shots and whether
+    they hit."""
+
+    @classmethod
+    def from_board(cls, board, is_next, is_viewer):
+        team = board.team
+        ships = None
+        if is_viewer:
+            ships = [
+                [x, y]
+                for x, y in mask_tiles(board.occupancy_mask, board.width)
+            ]
+        shots = [
+            {'x': x, 'y': y, 'hit': not board.is_empty(x, y)}
+            for x, y in mask_tiles(board.hit_mask, board.width)
+        ]
+        return cls(
+            id=team.id,
+            username=team.player.user.username,
+            is_next=is_next,
+            winner=team.winner,
+            alive=team.alive,
+            ships=ships,
+            shots=shots
+        )
+
+
+class ShotPresenter(namedtuple(
+    'ShotPresenter',
+    ['turn', 'attacking_team_id', 'defending_team_id', 'x', 'y', 'result']
+)):
+
+    RESULT_NAMES = {
+        value: name.lower()
+        for name, value in Shot.RESULTS.items()
+    }
+
+    @classmethod
+    def from_shot(cls, shot):
+        return cls(
+            turn=shot.turn,
+            attacking_team_id=shot.attacking_team_id,
+            defending_team_id=shot.defending_team_id,
+            x=shot.x,
+            y=shot.y,
+            result=cls.RESULT_NAMES[shot.result]
         )
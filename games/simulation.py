@@ -0,0 +1,64 @@
+import random
+from collections import namedtuple
+
+from games.ai import choose_shot
+from games.bitboard import sample_placements
+from games.engine import GameEngine
+from games.engine import MISS
+from games.models import GAME_SIZE
+from games.models import Ship
+
+
+class GameResult(namedtuple(
+    'GameResult',
+    ['seed', 'turns', 'winner', 'winner_shots', 'shots', 'hits']
+)):
+    """Outcome of a single simulated game. winner is the index of the winning
+    team and winner_shots the number of shots it took to win."""
+
+    @property
+    def hit_rate(self):
+        return self.hits / self.shots if self.shots else 0.0
+
+
+def simulate_game(seed, width=GAME_SIZE, height=GAME_SIZE, fleet=None,
+                  team_count=2):
+    """Plays a game between bots entirely in memory and returns its result.
+    Every random choice is drawn from a generator seeded with seed, so the
+    same seed always plays out the same game."""
+    rng = random.Random(seed)
+    if fleet is None:
+        fleet = Ship.LENGTHS
+
+    engine = GameEngine(width, height)
+    for team_id in range(team_count):
+        placements = sample_placements(fleet, rng, width, height)
+        engine.add_team(
+            team_id,
+            [placement.mask for placement in placements],
+            last_turn=team_id - team_count
+        )
+
+    shots = [0] * team_count
+    hits = [0] * team_count
+    # Bots shoot a new tile every turn, so no game can last longer
+    max_turns = width * height * team_count
+    while engine.winner() is None and engine.turn < max_turns:
+        team_id = engine.next_team()
+        # No time budget, since a bot out of time shoots at random
+        move = choose_shot(engine, team_id, rng, budget=float('inf'))
+        if move is None:
+            break
+        if engine.fire(*move) != MISS:
+            hits[team_id] += 1
+        shots[team_id] += 1
+
+    winner = engine.winner()
+    return GameResult(
+        seed=seed,
+        turns=engine.turn,
+        winner=winner,
+        winner_shots=shots[winner] if winner is not None else None,
+        shots=sum(shots),
+        hits=sum(hits)
+    )
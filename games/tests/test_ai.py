@@ -0,0 +1,144 @@
+import random
+import unittest
+
+from games.ai import choose_shot
+from games.ai import placement_tiles
+from games.ai import ship_length
+from games.ai import window_tiles
+from games.bitboard import sample_placements
+from games.bitboard import ship_placements
+from games.bitboard import tile_bit
+from games.bitboard import tiles_mask
+from games.engine import GameEngine
+from games.models import GAME_SIZE
+from games.models import Ship
+
+
+class PlacementTilesTestCase(unittest.TestCase):
+
+    def test_matches_ship_placements(self):
+        for length in [1, 2, 5]:
+            tiles = placement_tiles(length, GAME_SIZE, GAME_SIZE)
+
+            self.assertEqual(
+                sorted(sum(1 << int(tile) for tile in row) for row in tiles),
+                sorted(
+                    placement.mask
+                    for placement in ship_placements(length)
+                )
+            )
+
+    def test_ship_too_long(self):
+        self.assertEqual(placement_tiles(4, 3, 3).shape, (0, 4))
+
+
+class WindowTilesTestCase(unittest.TestCase):
+
+    def test_window_tiles(self):
+        mask = tiles_mask([(3, 4), (4, 4), (9, 9)])
+
+        tiles = window_tiles(mask, GAME_SIZE, 2, 3, 3, 2)
+        self.assertEqual(
+            list(tiles),
+            [False, False, False, False, True, True]
+        )
+        self.assertEqual(
+            list(window_tiles(mask, GAME_SIZE, 0, 0, 10, 10).nonzero()[0]),
+            [43, 44, 99]
+        )
+
+
+class ShipLengthTestCase(unittest.TestCase):
+
+    def test_ship_length(self):
+        rng = random.Random(0)
+        for width, height in [(10, 10), (1000, 1000), (1, 5)]:
+            for length in [1, 2, 5]:
+                placement, = sample_placements([length], rng, width, height)
+                self.assertEqual(ship_length(placement.mask, width), length)
+
+
+class ChooseShotTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ship = Ship(
+            x=4,
+            y=4,
+            length=3,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        )
+        self.engine = GameEngine(GAME_SIZE, GAME_SIZE)
+        self.engine.add_team(1, [tile_bit(0, 0)], last_turn=-2)
+        self.engine.add_team(2, [tiles_mask(self.ship.get_tiles())],
+                             last_turn=-1)
+
+    def test_hunts_unshot_tiles(self):
+        rng = random.Random(0)
+        for i in range(10):
+            target_id, x, y = choose_shot(self.engine, 1, rng)
+            self.assertEqual(target_id, 2)
+            self.engine.fire(target_id, x, y)
+            self.engine.fire(1, i, 9)
+
+    def test_targets_hits(self):
+        self.engine.fire(2, 5, 4)
+        self.engine.fire(1, 9, 9)
+
+        # Every tile around the hit may hold the rest of the ship
+        target_id, x, y = choose_shot(self.engine, 1, random.Random(0))
+        self.assertIn((x, y), [(4, 4), (6, 4), (5, 3), (5, 5)])
+
+        self.engine.fire(2, 6, 4)
+        self.engine.fire(1, 9, 8)
+        target_id, x, y = choose_shot(self.engine, 1, random.Random(0))
+        self.assertIn((x, y), [(4, 4), (7, 4)])
+
+    def test_plays_to_the_end(self):
+        rng = random.Random(0)
+        while self.engine.winner() is None:
+            team_id = self.engine.next_team()
+            self.engine.fire(*choose_shot(self.engine, team_id, rng))
+
+        self.assertEqual(self.engine.winner(), 1)
+        self.assertLess(self.engine.turn, GAME_SIZE * GAME_SIZE)
+
+    def test_large_board(self):
+        rng = random.Random(0)
+        engine = GameEngine(1000, 1000)
+        engine.add_team(1, [tile_bit(0, 0, 1000)], last_turn=-2)
+        engine.add_team(2, [tile_bit(500, 500, 1000)], last_turn=-1)
+        engine.fire(2, 10, 10)
+
+        target_id, x, y = choose_shot(engine, 2, rng)
+        self.assertEqual(target_id, 1)
+        self.assertTrue(0 <= x < 1000 and 0 <= y < 1000)
+
+    def test_large_board_long_ship(self):
+        rng = random.Random(0)
+        engine = GameEngine(1000, 1000)
+        engine.add_team(1, [tile_bit(0, 0, 1000)], last_turn=-2)
+        ship = Ship(
+            x=100,
+            y=500,
+            length=300,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        )
+        engine.add_team(2, [tiles_mask(ship.get_tiles(), 1000, 1000)],
+                        last_turn=-1)
+        engine.fire(2, 200, 500)
+        engine.fire(1, 10, 10)
+
+        # The window around the hit doesn't grow with the ship, so the bot
+        # still finds the tiles next to it within the time budget
+        target_id, x, y = choose_shot(engine, 1, rng)
+        self.assertEqual(target_id, 2)
+        self.assertIn((x, y), [(199, 500), (201, 500), (200, 499), (200, 501)])
+
+    def test_no_targets(self):
+        self.engine.fire(2, 4, 4)
+        self.engine.fire(1, 9, 9)
+        self.engine.fire(2, 5, 4)
+        self.engine.fire(1, 9, 8)
+        self.engine.fire(2, 6, 4)
+
+        self.assertIsNone(choose_shot(self.engine, 1))
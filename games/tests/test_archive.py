@@ -0,0 +1,137 @@
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import Client
+from django.test import TestCase
+from pyquery import PyQuery
+
+from games.archive import GameArchive
+from games.archive import archive_game
+from games.archive import delete_archived_rows
+from games.history import replay
+from games.models import ArchivedGame
+from games.models import Game
+from games.models import GameEvent
+from games.models import Ship
+from games.models import Shot
+from players.models import Player
+
+
+class ArchiveTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        Player(user=self.user1).save()
+        Player(user=self.user2).save()
+
+        self.client.login(username='user1', password='password')
+        self.client.post(reverse('create_game'), {
+            'opponent_username_0': 'user2',
+            'width': 3,
+            'height': 3,
+            'fleet': '1,2',
+        })
+        self.game = Game.objects.get()
+        self.team1, self.team2 = self.game.teams.order_by('id')
+
+    def play_to_the_end(self):
+        """Has both players shoot each other's boards tile by tile until
+        one of them wins."""
+        client2 = Client()
+        client2.login(username='user2', password='password')
+        url = reverse('attack', args=[self.game.id])
+        for i in range(9):
+            for client, target_team in [
+                (self.client, self.team2),
+                (client2, self.team1),
+            ]:
+                client.post(url, {
+                    'target_x': i % 3,
+                    'target_y': i // 3,
+                    'target_team': target_team.id,
+                })
+                self.game.refresh_from_db()
+                if self.game.alive_count == 1:
+                    return
+
+    def test_pack(self):
+        self.play_to_the_end()
+
+        archive = GameArchive.from_game(self.game)
+
+        self.assertEqual(GameArchive.unpack(archive.pack()), archive)
+        self.assertEqual(archive.fleet, [1, 2])
+        self.assertEqual(len(archive.shots), self.game.turn)
+        self.assertEqual(
+            [len(team.ships) for team in archive.teams],
+            [2, 2]
+        )
+        self.assertEqual(
+            [team.winner for team in archive.teams],
+            [
+                self.game.teams.get(pk=self.team1.id).winner,
+                self.game.teams.get(pk=self.team2.id).winner,
+            ]
+        )
+
+    def test_archive_game(self):
+        # Games still being played aren't archived
+        self.assertFalse(archive_game(self.game))
+
+        self.play_to_the_end()
+        self.assertTrue(archive_game(self.game))
+        self.assertFalse(archive_game(self.game))
+
+        self.assertTrue(Game.objects.get(pk=self.game.id).archived)
+        self.assertEqual(ArchivedGame.objects.count(), 1)
+        # Rows are only deleted once the archive is saved
+        self.assertEqual(Ship.objects.count(), 4)
+
+        row_count = 4 + self.game.turn + GameEvent.objects.count()
+        self.assertEqual(delete_archived_rows(batch_size=2), row_count)
+        self.assertEqual(Ship.objects.count(), 0)
+        self.assertEqual(Shot.objects.count(), 0)
+        self.assertEqual(GameEvent.objects.count(), 0)
+        self.assertEqual(self.game.teams.count(), 2)
+
+    def test_replay(self):
+        self.play_to_the_end()
+        engines = [
+            replay(self.game, turn)
+            for turn in range(self.game.turn + 1)
+        ]
+
+        archive_game(self.game)
+        delete_archived_rows()
+        self.game.refresh_from_db()
+
+        for turn, engine in enumerate(engines):
+            archived_engine = replay(self.game, turn)
+            self.assertEqual(archived_engine.hit_masks, engine.hit_masks)
+            self.assertEqual(
+                archived_engine.next_team(),
+                engine.next_team()
+            )
+        self.assertEqual(archived_engine.winner(), engine.winner())
+
+    def test_game_view(self):
+        self.play_to_the_end()
+        url = reverse('game', args=[self.game.id])
+        boards = [
+            PyQuery(board).outer_html()
+            for board in PyQuery(self.client.get(url).content)('.board')
+        ]
+
+        archive_game(self.game)
+        delete_archived_rows()
+
+        # Assert archived games are shown just as before
+        resp = self.client.get(url)
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(
+            [
+                PyQuery(board).outer_html()
+                for board in PyQuery(resp.content)('.board')
+            ],
+            boards
+        )
@@ -0,0 +1,182 @@
+import random
+import unittest
+
+from games.bitboard import PLACEMENT_CACHE_SIZE
+from games.bitboard import has_tile
+from games.bitboard import is_eliminated
+from games.bitboard import is_sunk
+from games.bitboard import mask_tiles
+from games.bitboard import occupancy_mask
+from games.bitboard import sample_placements
+from games.bitboard import ship_mask
+from games.bitboard import ship_placements
+from games.bitboard import shots_mask
+from games.bitboard import tile_bit
+from games.bitboard import tiles_mask
+from games.models import GAME_SIZE
+from games.models import Ship
+from games.models import Shot
+
+
+class TileBitTestCase(unittest.TestCase):
+
+    def test_tile_bit(self):
+        self.assertEqual(tile_bit(0, 0), 1)
+        self.assertEqual(tile_bit(1, 0), 2)
+        self.assertEqual(tile_bit(0, 1), 1 << GAME_SIZE)
+        self.assertEqual(
+            tile_bit(GAME_SIZE - 1, GAME_SIZE - 1),
+            1 << (GAME_SIZE * GAME_SIZE - 1)
+        )
+
+    def test_tiles_mask_ignores_off_board_tiles(self):
+        self.assertEqual(
+            tiles_mask([(0, 0), (-1, 0), (GAME_SIZE, 0), (0, GAME_SIZE)]),
+            tile_bit(0, 0)
+        )
+
+
+class ShipMaskTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.ship1 = Ship(
+            x=2,
+            y=4,
+            length=3,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        )
+        self.ship2 = Ship(
+            x=6,
+            y=6,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['NORTH']
+        )
+
+    def test_ship_mask(self):
+        self.assertEqual(
+            ship_mask(self.ship1),
+            tile_bit(2, 4) | tile_bit(3, 4) | tile_bit(4, 4)
+        )
+
+    def test_occupancy_mask(self):
+        mask = occupancy_mask([self.ship1, self.ship2])
+
+        self.assertTrue(has_tile(mask, 3, 4))
+        self.assertTrue(has_tile(mask, 6, 5))
+        self.assertFalse(has_tile(mask, 6, 4))
+
+    def test_shots_mask(self):
+        shots = [Shot(x=1, y=2), Shot(x=3, y=4)]
+
+        self.assertEqual(shots_mask(shots), tile_bit(1, 2) | tile_bit(3, 4))
+
+    def test_is_sunk(self):
+        mask = ship_mask(self.ship2)
+
+        self.assertFalse(is_sunk(mask, tile_bit(6, 6)))
+        self.assertTrue(is_sunk(mask, tile_bit(6, 6) | tile_bit(6, 5)))
+
+    def test_is_eliminated(self):
+        mask = occupancy_mask([self.ship1, self.ship2])
+
+        self.assertFalse(is_eliminated(mask, ship_mask(self.ship1)))
+        self.assertTrue(is_eliminated(mask, mask | tile_bit(0, 0)))
+
+
+class MaskTilesTestCase(unittest.TestCase):
+
+    def test_mask_tiles(self):
+        tiles = [(0, 0), (9, 0), (3, 4), (9, 9)]
+
+        self.assertEqual(mask_tiles(tiles_mask(tiles)), tiles)
+        self.assertEqual(mask_tiles(0), [])
+
+    def test_mask_tiles_large_board(self):
+        tiles = [(999, 0), (0, 1), (500, 999)]
+
+        mask = tiles_mask(tiles, 1000, 1000)
+        self.assertEqual(mask_tiles(mask, 1000), tiles)
+
+
+class PlacementTestCase(unittest.TestCase):
+
+    def test_ship_placements(self):
+        placements = ship_placements(2)
+
+        # Every tile in each of four directions, less those running off the
+        # edge of the board
+        self.assertEqual(len(placements), 4 * GAME_SIZE * (GAME_SIZE - 1))
+        for placement in placements:
+            ship = Ship(
+                x=placement.x,
+                y=placement.y,
+                length=2,
+                direction=placement.direction
+            )
+            self.assertEqual(placement.mask, ship_mask(ship))
+            self.assertEqual(bin(placement.mask).count('1'), 2)
+
+    def test_sample_placements(self):
+        rng = random.Random(0)
+        for i in range(20):
+            placements = sample_placements(Ship.LENGTHS, rng)
+
+            occupied = 0
+            for length, placement in zip(Ship.LENGTHS, placements):
+                self.assertEqual(bin(placement.mask).count('1'), length)
+                self.assertFalse(placement.mask & occupied)
+                occupied |= placement.mask
+
+    def test_ship_placements_rectangular_board(self):
+        placements = ship_placements(3, 8, 2)
+
+        # Only ships running east or west fit across a board two tiles high
+        self.assertEqual(len(placements), 2 * 6 * 2)
+        for placement in placements:
+            ship = Ship(
+                x=placement.x,
+                y=placement.y,
+                length=3,
+                direction=placement.direction
+            )
+            self.assertEqual(placement.mask, ship_mask(ship, 8, 2))
+            self.assertEqual(bin(placement.mask).count('1'), 3)
+
+    def test_ship_placements_cache_bounded(self):
+        for width in range(2, PLACEMENT_CACHE_SIZE + 10):
+            ship_placements(2, width, 2)
+
+        self.assertLessEqual(
+            ship_placements.cache_info().currsize,
+            PLACEMENT_CACHE_SIZE
+        )
+
+    def test_sample_placements_large_board(self):
+        rng = random.Random(0)
+        placements = sample_placements(Ship.LENGTHS * 20, rng, 1000, 1000)
+
+        occupied = 0
+        for length, placement in zip(Ship.LENGTHS * 20, placements):
+            ship = Ship(
+                x=placement.x,
+                y=placement.y,
+                length=length,
+                direction=placement.direction
+            )
+            self.assertEqual(placement.mask, ship_mask(ship, 1000, 1000))
+            self.assertFalse(placement.mask & occupied)
+            occupied |= placement.mask
+
+    def test_sample_placements_full_board(self):
+        # A fleet which exactly fills the board is always placed
+        placements = sample_placements([1] * GAME_SIZE * GAME_SIZE)
+        self.assertEqual(
+            sum(placement.mask for placement in placements),
+            (1 << GAME_SIZE * GAME_SIZE) - 1
+        )
+
+    def test_sample_placements_no_room(self):
+        with self.assertRaises(ValueError):
+            sample_placements([GAME_SIZE] * (GAME_SIZE + 1))
+        with self.assertRaises(ValueError):
+            sample_placements([101], width=100, height=100)
@@ -0,0 +1,78 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.boards import Board
+from games.boards import GameBoards
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.util import rebuild_board
+from players.models import Player
+
+
+class GameBoardsTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=1)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=0)
+        self.team1.save()
+        self.team2.save()
+
+        self.ship = Ship(
+            team=self.team2,
+            x=3,
+            y=3,
+            length=3,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        )
+        self.ship.save()
+
+        for x, y in [(2, 3), (3, 5)]:
+            Shot(
+                game=self.game,
+                attacking_team=self.team1,
+                defending_team=self.team2,
+                x=x,
+                y=y
+            ).save()
+
+        rebuild_board(self.team2)
+        self.team2.save()
+
+    def test_load(self):
+        with self.assertNumQueries(1):
+            boards = GameBoards.load(self.game)
+            usernames = [team.player.user.username for team in boards.teams]
+
+        self.assertEqual(usernames, ['user1', 'user2'])
+        self.assertTrue(boards.is_next(self.team2))
+        self.assertFalse(boards.is_next(self.team1))
+
+        board = boards.board_for(self.team2)
+        self.assertFalse(board.is_empty(3, 4))
+        self.assertTrue(board.is_empty(2, 3))
+        self.assertTrue(board.is_hit(2, 3))
+        self.assertTrue(board.is_hit(3, 5))
+        self.assertFalse(board.is_hit(3, 4))
+
+        board = boards.board_for(self.team1)
+        self.assertTrue(board.is_empty(3, 4))
+        self.assertFalse(board.is_hit(2, 3))
+
+    def test_from_team(self):
+        board = Board.from_team(self.team2)
+
+        self.assertFalse(board.is_empty(3, 3))
+        self.assertTrue(board.is_hit(3, 5))
@@ -0,0 +1,69 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.bots import play_bots
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.persistence import StoredGame
+from games.util import rebuild_board
+from players.models import Player
+from players.models import PlayerStats
+
+
+class PlayBotsTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game(alive_count=2)
+        self.game.save()
+
+        self.teams = []
+        for i, is_bot in enumerate([False, True, True]):
+            user = User.objects.create_user('user{}'.format(i), '', 'password')
+            player = Player(user=user, is_bot=is_bot)
+            player.save()
+            PlayerStats(player=player, in_progress_count=1).save()
+            team = Team(player=player, game=self.game, last_turn=i - 3)
+            team.save()
+            Ship(
+                team=team,
+                x=0,
+                y=0,
+                length=2,
+                direction=Ship.CARDINAL_DIRECTIONS['EAST']
+            ).save()
+            rebuild_board(team)
+            self.teams.append(team)
+
+        # The human player has already been defeated
+        human_team = self.teams[0]
+        human_team.hits_remaining = 0
+        human_team.alive = False
+        human_team.save()
+        self.game.next_team = self.teams[1]
+        self.game.save()
+
+    def test_play_bots_until_won(self):
+        attacks = play_bots(StoredGame.load(self.game), budget=None)
+
+        game = Game.objects.get(pk=self.game.id)
+        self.assertEqual(game.alive_count, 1)
+        self.assertEqual(Shot.objects.filter(game=game).count(), len(attacks))
+        self.assertIsNotNone(attacks[-1]['winner'])
+
+        winner = Team.objects.get(game=game, winner=True)
+        stats = PlayerStats.objects.get(player=winner.player)
+        self.assertEqual(
+            (stats.win_count, stats.loss_count, stats.in_progress_count),
+            (1, 0, 0)
+        )
+
+    def test_play_bots_budget(self):
+        attacks = play_bots(StoredGame.load(self.game), budget=0)
+
+        # No human is left, so the bots don't play on once out of time
+        self.assertEqual(attacks, [])
+        game = Game.objects.get(pk=self.game.id)
+        self.assertEqual(game.turn, 0)
+        self.assertEqual(game.alive_count, 2)
@@ -0,0 +1,252 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from games.models import Game
+from games.models import MAX_PLAYERS
+from games.models import MAX_TEAMS
+from games.models import Shot
+from games.persistence import StoredGame
+from players.models import Player
+from players.models import PlayerStats
+
+# Numbers of teams in the games each view is measured with
+TEAM_COUNTS = [2, MAX_PLAYERS, MAX_TEAMS]
+# Shots fired in each game before it is measured
+SHOT_COUNT = 150
+# Times each view is measured. Its fastest run is held to its time budget.
+RUNS = 3
+
+# Most queries and seconds each view may take, whatever the size of the game.
+# A query made per team costs MAX_TEAMS queries in the largest game, so blows
+# the query budget. Time budgets are loose enough for slow CI machines, and
+# catch work done per tile or per shot rather than small slowdowns.
+BUDGETS = {
+    'home': (4, 0.5),
+    # One more than the board's reads when a heatmap isn't cached
+    'game': (6, 1.0),
+    # Locks the game with an update, then updates both the attacking and the
+    # target team
+    'attack': (15, 1.0),
+    # Inserts of MAX_TEAMS teams and their ships are split into batches to
+    # fit SQLite's limit on query parameters
+    'create_game': (16, 2.0),
+    'player_profile': (1, 0.5),
+}
+
+
+class ViewBudgetTestCase(TestCase):
+    """Checks each view stays within a budget of queries and time in games of
+    two players, MAX_PLAYERS players and MAX_TEAMS teams, each with many
+    shots fired, so that presenters which query per team or per tile fail
+    the build."""
+
+    def setUp(self):
+        # Hashed once, as hashing a password for every player is slow
+        self.password = make_password('password')
+        self.create_players(['user'])
+        self.client.login(username='user', password='password')
+
+    def create_players(self, usernames):
+        """Creates a player, with stats as at signup, for each username in
+        bulk."""
+        User.objects.bulk_create([
+            User(username=username, password=self.password)
+            for username in usernames
+        ])
+        Player.objects.bulk_create([
+            Player(user=user)
+            for user in User.objects.filter(username__in=usernames)
+        ])
+        PlayerStats.objects.bulk_create([
+            PlayerStats(player=player)
+            for player in Player.objects.filter(user__username__in=usernames)
+        ])
+
+    def create_game_data(self, prefix, team_count):
+        """Returns the form data creating a game between the user and
+        team_count - 1 new players."""
+        usernames = [
+            '{}-{}'.format(prefix, i)
+            for i in range(team_count - 1)
+        ]
+        self.create_players(usernames)
+        return {
+            'opponent_username_0': usernames[0],
+            'more_opponents': ' '.join(usernames[1:]),
+        }
+
+    def random_shot(self, engine, rng, attacker_id):
+        """Returns a target team and tile which haven't been shot, and which
+        wouldn't defeat the target."""
+        while True:
+            target_id = rng.choice([
+                team_id
+                for team_id in engine.team_ids
+                if team_id != attacker_id
+            ])
+            index = engine.indexes[target_id]
+            x = rng.randrange(engine.width)
+            y = rng.randrange(engine.height)
+            bit = engine.tile_bit(x, y)
+            if engine.hit_masks[index] & bit:
+                continue
+            if engine.occupancy_masks[index] & bit and \
+                    engine.hits_remaining[index] == 1:
+                continue
+            return target_id, x, y
+
+    def seed_game(self, team_count):
+        """Creates a game of team_count teams and fires SHOT_COUNT shots in
+        it, saved in bulk rather than through AttackView."""
+        self.client.post(
+            reverse('create_game'),
+            self.create_game_data('seed{}'.format(team_count), team_count)
+        )
+        game = Game.objects.latest('id')
+
+        stored_game = StoredGame.load(game)
+        engine = stored_game.engine
+        rng = random.Random(team_count)
+        shots = []
+        for i in range(SHOT_COUNT):
+            attacker_id = engine.next_team()
+            target_id, x, y = self.random_shot(engine, rng, attacker_id)
+            turn = engine.turn
+            shots.append(Shot(
+                game=game,
+                attacking_team_id=attacker_id,
+                defending_team_id=target_id,
+                x=x,
+                y=y,
+                turn=turn,
+                result=engine.fire(target_id, x, y)
+            ))
+        Shot.objects.bulk_create(shots)
+        stored_game.save()
+        return game
+
+    def measure(self, func, *args, **kwargs):
+        """Calls func, returning its response, the number of queries it made
+        and the seconds it took."""
+        with CaptureQueriesContext(connection) as queries:
+            start = time.time()
+            response = func(*args, **kwargs)
+            elapsed = time.time() - start
+        return response, len(queries), elapsed
+
+    def assertWithinBudget(self, view, team_count, measurements):
+        max_queries, max_seconds = BUDGETS[view]
+        queries = max(queries for queries, elapsed in measurements)
+        elapsed = min(elapsed for queries, elapsed in measurements)
+        self.assertLessEqual(queries, max_queries, (
+            '{} made {} queries with {} teams, over its budget of {}'.format(
+                view,
+                queries,
+                team_count,
+                max_queries
+            )
+        ))
+        self.assertLessEqual(elapsed, max_seconds, (
+            '{} took {:.3f}s with {} teams, over its budget of {}s'.format(
+                view,
+                elapsed,
+                team_count,
+                max_seconds
+            )
+        ))
+
+    def assertGetWithinBudget(self, view, team_count, url, data=None):
+        measurements = []
+        for i in range(RUNS):
+            response, queries, elapsed = self.measure(
+                self.client.get,
+                url,
+                data
+            )
+            self.assertEqual(response.status_code, 200)
+            measurements.append((queries, elapsed))
+        self.assertWithinBudget(view, team_count, measurements)
+
+    def test_home(self):
+        for team_count in TEAM_COUNTS:
+            self.seed_game(team_count)
+            self.assertGetWithinBudget('home', team_count, reverse('home'))
+
+    def test_game(self):
+        for team_count in TEAM_COUNTS:
+            game = self.seed_game(team_count)
+            url = reverse('game', args=[game.id])
+            self.assertGetWithinBudget('game', team_count, url)
+            self.assertGetWithinBudget(
+                'game',
+                team_count,
+                url,
+                {'heatmap': 1}
+            )
+
+    def test_attack(self):
+        for team_count in TEAM_COUNTS:
+            game = self.seed_game(team_count)
+            url = reverse('attack', args=[game.id])
+            rng = random.Random(team_count)
+            measurements = []
+            for i in range(RUNS):
+                # Each shot is fired by whichever player is next
+                stored_game = StoredGame.load(Game.objects.get(pk=game.pk))
+                attacker_id = stored_game.engine.next_team()
+                target_id, x, y = self.random_shot(
+                    stored_game.engine,
+                    rng,
+                    attacker_id
+                )
+                attacker = stored_game.team(attacker_id)
+                self.client.login(
+                    username=attacker.player.user.username,
+                    password='password'
+                )
+
+                response, queries, elapsed = self.measure(
+                    self.client.post,
+                    url,
+                    {'target_x': x, 'target_y': y, 'target_team': target_id}
+                )
+                self.assertEqual(
+                    Shot.objects.filter(game=game).count(),
+                    SHOT_COUNT + i + 1
+                )
+                measurements.append((queries, elapsed))
+            self.assertWithinBudget('attack', team_count, measurements)
+
+    def test_create_game(self):
+        for team_count in TEAM_COUNTS:
+            measurements = []
+            for i in range(RUNS):
+                data = self.create_game_data(
+                    'create{}-{}'.format(team_count, i),
+                    team_count
+                )
+                response, queries, elapsed = self.measure(
+                    self.client.post,
+                    reverse('create_game'),
+                    data
+                )
+                game = Game.objects.latest('id')
+                self.assertEqual(game.teams.count(), team_count)
+                measurements.append((queries, elapsed))
+            self.assertWithinBudget('create_game', team_count, measurements)
+
+    def test_player_profile(self):
+        for team_count in TEAM_COUNTS:
+            self.seed_game(team_count)
+            self.assertGetWithinBudget(
+                'player_profile',
+                team_count,
+                reverse('player_profile', args=['user'])
+            )
@@ -0,0 +1,291 @@
+import csv
+import tempfile
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import OperationalError
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from games.bitboard import tile_bit
+from games.models import GAME_SIZE
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.persistence import lock_game
+from games.util import rebuild_board
+from players.models import Player
+from players.models import PlayerStats
+
+
+class RebuildBoardsTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game)
+        self.team2 = Team(player=self.player2, game=self.game)
+        self.team1.save()
+        self.team2.save()
+
+        Ship(
+            team=self.team2,
+            x=1,
+            y=1,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team2,
+            x=1,
+            y=2
+        ).save()
+
+    def test_rebuild_boards(self):
+        out = StringIO()
+        call_command('rebuild_boards', stdout=out)
+
+        team1 = Team.objects.get(pk=self.team1.id)
+        team2 = Team.objects.get(pk=self.team2.id)
+
+        self.assertIn('Rebuilt boards for 2 teams', out.getvalue())
+        self.assertEqual(team1.occupancy_mask, 0)
+        self.assertEqual(team1.hit_mask, 0)
+        self.assertEqual(
+            team2.occupancy_mask,
+            tile_bit(1, 1) | tile_bit(1, 2)
+        )
+        self.assertEqual(team2.hit_mask, tile_bit(1, 2))
+        self.assertEqual(team2.hits_remaining, 1)
+
+        game = Game.objects.get(pk=self.game.id)
+        self.assertEqual(game.next_team_id, self.team1.id)
+        self.assertEqual(game.alive_count, 2)
+
+    def test_rebuild_boards_for_game(self):
+        other_game = Game()
+        other_game.save()
+
+        out = StringIO()
+        call_command('rebuild_boards', str(other_game.id), stdout=out)
+
+        self.assertIn('Rebuilt boards for 0 teams', out.getvalue())
+        self.assertEqual(Team.objects.get(pk=self.team2.id).hit_mask, 0)
+
+    def test_rebuild_boards_skips_archived_games(self):
+        self.game.archived = True
+        self.game.save()
+
+        out = StringIO()
+        call_command('rebuild_boards', stdout=out)
+
+        self.assertIn('Rebuilt boards for 0 teams', out.getvalue())
+
+
+class BenchmarkAttacksTestCase(TestCase):
+
+    def test_benchmark_attacks(self):
+        out = StringIO()
+        call_command(
+            'benchmark_attacks',
+            games=2,
+            threads=1,
+            turns=4,
+            stdout=out
+        )
+
+        self.assertIn('Attacks: 8', out.getvalue())
+        self.assertIn('Queries per attack', out.getvalue())
+        self.assertIn('Lost or duplicated turns: 0', out.getvalue())
+
+        # Everything created for the benchmark is cleaned up afterwards
+        self.assertEqual(User.objects.count(), 0)
+        self.assertEqual(Game.objects.count(), 0)
+
+    def test_benchmark_attacks_busy(self):
+        """Test that attacks which time out waiting for a game's lock are
+        counted as busy, and retried, rather than rejected."""
+        calls = []
+
+        def lock_game_once_busy(game_id):
+            calls.append(game_id)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+            return lock_game(game_id)
+
+        out = StringIO()
+        with mock.patch(
+            'games.views.lock_game',
+            side_effect=lock_game_once_busy
+        ):
+            call_command(
+                'benchmark_attacks',
+                games=1,
+                threads=1,
+                turns=4,
+                stdout=out
+            )
+
+        self.assertIn('Attacks: 4', out.getvalue())
+        self.assertIn('Busy: 1', out.getvalue())
+        self.assertIn('Errors: 0', out.getvalue())
+        self.assertIn('Lost or duplicated turns: 0', out.getvalue())
+
+
+class SimulateTestCase(TestCase):
+
+    def setUp(self):
+        self.output = tempfile.NamedTemporaryFile(suffix='.csv')
+        self.addCleanup(self.output.close)
+
+    def read_rows(self):
+        with open(self.output.name, newline='') as output:
+            return list(csv.DictReader(output))
+
+    def test_simulate(self):
+        out = StringIO()
+        call_command(
+            'simulate',
+            games=3,
+            processes=1,
+            seed=5,
+            output=self.output.name,
+            stdout=out
+        )
+
+        rows = self.read_rows()
+        self.assertEqual([row['seed'] for row in rows], ['5', '6', '7'])
+        for row in rows:
+            self.assertIn(row['winner'], ['0', '1'])
+            self.assertLessEqual(int(row['winner_shots']), GAME_SIZE ** 2)
+        self.assertIn('Games: 3', out.getvalue())
+        self.assertIn('games/s per process', out.getvalue())
+
+        # Games are the same however many processes play them
+        call_command(
+            'simulate',
+            games=3,
+            processes=2,
+            seed=5,
+            output=self.output.name,
+            stdout=StringIO()
+        )
+        self.assertEqual(self.read_rows(), rows)
+
+    def test_invalid_fleet(self):
+        with self.assertRaises(CommandError):
+            call_command(
+                'simulate',
+                fleet='2,x',
+                output=self.output.name,
+                stdout=StringIO()
+            )
+
+
+class ArchiveGamesTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.games = []
+        for alive_count in [1, 2]:
+            game = Game(alive_count=alive_count)
+            game.save()
+            team1 = Team(player=self.player1, game=game)
+            team2 = Team(player=self.player2, game=game)
+            team1.save()
+            team2.save()
+            Ship(
+                team=team2,
+                x=1,
+                y=1,
+                length=1,
+                direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+            ).save()
+            Shot(
+                game=game,
+                attacking_team=team1,
+                defending_team=team2,
+                x=1,
+                y=1
+            ).save()
+            self.games.append(game)
+
+    def test_archive_games(self):
+        out = StringIO()
+        call_command('archive_games', stdout=out)
+
+        self.assertIn('Archived 1 games and deleted 2 rows', out.getvalue())
+        finished, in_progress = self.games
+        self.assertTrue(Game.objects.get(pk=finished.id).archived)
+        self.assertFalse(Game.objects.get(pk=in_progress.id).archived)
+        self.assertEqual(Shot.objects.get().game_id, in_progress.id)
+        self.assertEqual(Ship.objects.get().team.game_id, in_progress.id)
+
+        # Archived games are left alone by later runs
+        out = StringIO()
+        call_command('archive_games', stdout=out)
+        self.assertIn('Archived 0 games and deleted 0 rows', out.getvalue())
+
+
+class PlayBotGamesTestCase(TestCase):
+
+    def setUp(self):
+        self.games = []
+        for game_index, bot_flags in enumerate([[True, True], [False, True]]):
+            game = Game(alive_count=2)
+            game.save()
+            teams = []
+            for i, is_bot in enumerate(bot_flags):
+                user = User.objects.create_user(
+                    'user{}-{}'.format(game_index, i),
+                    '',
+                    'password'
+                )
+                player = Player(user=user, is_bot=is_bot)
+                player.save()
+                PlayerStats(player=player, in_progress_count=1).save()
+                team = Team(player=player, game=game, last_turn=i - 2)
+                team.save()
+                Ship(
+                    team=team,
+                    x=0,
+                    y=0,
+                    length=2,
+                    direction=Ship.CARDINAL_DIRECTIONS['EAST']
+                ).save()
+                rebuild_board(team)
+                team.save()
+                teams.append(team)
+            game.next_team = teams[0]
+            game.save()
+            self.games.append(game)
+
+    def test_play_bot_games(self):
+        out = StringIO()
+        call_command('play_bot_games', stdout=out)
+
+        self.assertIn('Finished 1 games.', out.getvalue())
+        bots_only, with_human = self.games
+        self.assertEqual(Game.objects.get(pk=bots_only.id).alive_count, 1)
+        self.assertEqual(Game.objects.get(pk=with_human.id).alive_count, 2)
+        self.assertFalse(Shot.objects.filter(game=with_human).exists())
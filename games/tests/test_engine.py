@@ -0,0 +1,145 @@
+import unittest
+
+from games.engine import DEFEATED
+from games.engine import DuplicateShot
+from games.engine import GameEngine
+from games.engine import HIT
+from games.engine import IllegalShot
+from games.engine import MISS
+from games.engine import SUNK
+from games.models import Shot
+
+
+def row_mask(x, y, length, size=10):
+    """Returns the mask of a ship running east from (x, y)."""
+    mask = 0
+    for i in range(length):
+        mask |= 1 << (y * size + x + i)
+    return mask
+
+
+class GameEngineTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = GameEngine(10, 10)
+        self.engine.add_team(1, [row_mask(0, 0, 2)], last_turn=-2)
+        self.engine.add_team(2, [row_mask(0, 0, 1), row_mask(5, 5, 2)],
+                             last_turn=-1)
+
+    def test_results_match_shot_results(self):
+        self.assertEqual(
+            (MISS, HIT, SUNK, DEFEATED),
+            (
+                Shot.RESULTS['MISS'],
+                Shot.RESULTS['HIT'],
+                Shot.RESULTS['SUNK'],
+                Shot.RESULTS['DEFEATED'],
+            )
+        )
+
+    def test_turn_order(self):
+        self.assertEqual(self.engine.next_team(), 1)
+        self.engine.fire(2, 9, 9)
+        self.assertEqual(self.engine.next_team(), 2)
+        self.engine.fire(1, 9, 9)
+        self.assertEqual(self.engine.next_team(), 1)
+
+        self.assertEqual(self.engine.turn, 2)
+        self.assertEqual(self.engine.team_state(1).last_turn, 0)
+        self.assertEqual(self.engine.team_state(2).last_turn, 1)
+
+    def test_fire(self):
+        self.assertEqual(self.engine.fire(2, 9, 9), MISS)
+        self.engine.fire(1, 9, 9)
+        self.assertEqual(self.engine.fire(2, 5, 5), HIT)
+        self.engine.fire(1, 8, 8)
+        self.assertEqual(self.engine.fire(2, 0, 0), SUNK)
+        self.engine.fire(1, 7, 7)
+        self.assertEqual(self.engine.fire(2, 6, 5), DEFEATED)
+
+        self.assertFalse(self.engine.is_alive(2))
+        self.assertEqual(self.engine.winner(), 1)
+        self.assertEqual(self.engine.team_state(2).hits_remaining, 0)
+        with self.assertRaises(IllegalShot):
+            self.engine.fire(2, 1, 1)
+
+    def test_unresolved_hits(self):
+        self.engine.fire(2, 5, 5)
+        self.assertEqual(self.engine.unresolved_masks[1], row_mask(5, 5, 1))
+        self.assertEqual(self.engine.damaged, {1})
+
+        # Sinking a ship resolves its hits, but not those on other ships
+        self.engine.fire(1, 9, 9)
+        self.engine.fire(2, 0, 0)
+        self.assertEqual(self.engine.unresolved_masks[1], row_mask(5, 5, 1))
+        self.assertEqual(self.engine.afloat_masks[1], [row_mask(5, 5, 2)])
+
+        self.engine.fire(1, 8, 8)
+        self.engine.fire(2, 6, 5)
+        self.assertEqual(self.engine.unresolved_masks[1], 0)
+        self.assertEqual(self.engine.afloat_masks[1], [])
+        self.assertEqual(self.engine.damaged, set())
+
+    def test_winner_in_progress(self):
+        self.assertIsNone(self.engine.winner())
+
+    def test_duplicate_shot(self):
+        self.engine.add_team(3, [row_mask(9, 9, 1)], last_turn=0)
+        self.engine.fire(3, 0, 0)
+
+        # No team may shoot a tile of a board which has already been shot
+        with self.assertRaises(DuplicateShot):
+            self.engine.fire(3, 0, 0)
+        self.engine.fire(1, 9, 9)
+        with self.assertRaises(DuplicateShot):
+            self.engine.fire(1, 9, 9)
+
+        # The failed shot doesn't use up the turn
+        self.assertEqual(self.engine.next_team(), 3)
+
+    def test_illegal_shots(self):
+        with self.assertRaises(IllegalShot):
+            self.engine.fire(1, 0, 0)
+        with self.assertRaises(IllegalShot):
+            self.engine.fire(3, 0, 0)
+        with self.assertRaises(IllegalShot):
+            self.engine.fire(2, 10, 0)
+
+    def test_defeated_teams_lose_their_turn(self):
+        self.engine.add_team(3, [row_mask(9, 9, 1)], last_turn=0)
+        self.engine.fire(2, 9, 9)
+        self.engine.fire(3, 9, 9)
+        self.assertFalse(self.engine.is_alive(3))
+        self.assertIsNone(self.engine.winner())
+
+        self.assertEqual(self.engine.next_team(), 1)
+        self.engine.fire(2, 8, 8)
+        self.assertEqual(self.engine.next_team(), 2)
+
+    def test_load_hit_mask(self):
+        engine = GameEngine(10, 10)
+        engine.add_team(1, [row_mask(0, 0, 1)], last_turn=-2)
+        engine.add_team(2, [row_mask(0, 0, 2)], last_turn=-1,
+                        hit_mask=row_mask(0, 0, 1))
+
+        self.assertEqual(engine.team_state(2).hits_remaining, 1)
+        self.assertEqual(engine.unresolved_masks[1], row_mask(0, 0, 1))
+        self.assertEqual(engine.damaged, {1})
+        self.assertEqual(engine.fire(2, 1, 0), DEFEATED)
+
+    def test_many_teams(self):
+        engine = GameEngine(10, 10)
+        for team_id in range(64):
+            engine.add_team(team_id, [row_mask(0, 0, 1)],
+                            last_turn=team_id - 64)
+
+        # Every other team is defeated in turn and then skipped
+        for team_id in range(0, 64, 2):
+            self.assertEqual(engine.next_team(), team_id)
+            self.assertEqual(engine.fire(team_id + 1, 0, 0), DEFEATED)
+            self.assertEqual(engine.next_team(), (team_id + 2) % 64)
+        self.assertEqual(engine.alive_count, 32)
+        self.assertIsNone(engine.winner())
+        for team_id in range(0, 64, 2):
+            self.assertEqual(engine.next_team(), team_id)
+            engine.fire((team_id + 2) % 64, 9, 9)
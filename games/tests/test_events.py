@@ -0,0 +1,213 @@
+import json
+
+from django.contrib.auth.models import User
+from django.core.urlresolvers import reverse
+from django.test import TestCase
+from django.test import override_settings
+
+from games.events import CacheEventHub
+from games.events import LocalEventHub
+from games.events import get_hub
+from games.events import reset_hub
+from games.models import Game
+from games.models import Ship
+from games.models import Team
+from games.util import rebuild_board
+from players.models import Player
+
+
+class LocalEventHubTestCase(TestCase):
+
+    def test_publish(self):
+        hub = LocalEventHub()
+        subscription = hub.subscribe(1)
+        other_subscription = hub.subscribe(2)
+
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 1}})
+
+        self.assertEqual(
+            subscription.get(timeout=0),
+            {'type': 'turn', 'data': {'turn': 1}}
+        )
+        self.assertIsNone(subscription.get(timeout=0))
+        self.assertIsNone(other_subscription.get(timeout=0))
+
+    def test_unsubscribe(self):
+        hub = LocalEventHub()
+        subscription = hub.subscribe(1)
+        subscription.close()
+
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 1}})
+
+        self.assertIsNone(subscription.get(timeout=0))
+        self.assertNotIn(1, hub.subscriptions)
+
+
+@override_settings(CACHES={
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'games-events-tests',
+    },
+})
+class CacheEventHubTestCase(TestCase):
+
+    def test_publish(self):
+        hub = CacheEventHub()
+        hub.cache.clear()
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 1}})
+
+        # Only events published after subscribing are delivered
+        subscription = hub.subscribe(1)
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 2}})
+        hub.publish(2, {'type': 'turn', 'data': {'turn': 3}})
+
+        self.assertEqual(
+            subscription.get(timeout=0),
+            {'type': 'turn', 'data': {'turn': 2}}
+        )
+        self.assertIsNone(subscription.get(timeout=0))
+
+    def test_event_written_after_sequence(self):
+        hub = CacheEventHub()
+        hub.cache.clear()
+        subscription = hub.subscribe(1)
+
+        # A publisher has taken the next sequence but not yet written its
+        # event, which is delivered once it is
+        hub.cache.add(hub.sequence_key(1), 0, None)
+        sequence = hub.cache.incr(hub.sequence_key(1))
+        self.assertIsNone(subscription.get(timeout=0))
+
+        hub.cache.set(
+            hub.event_key(1, sequence),
+            {'type': 'turn', 'data': {'turn': 1}}
+        )
+        self.assertEqual(
+            subscription.get(timeout=0),
+            {'type': 'turn', 'data': {'turn': 1}}
+        )
+
+    def test_missing_event_skipped(self):
+        hub = CacheEventHub()
+        hub.cache.clear()
+        hub.missing_event_grace = 0
+        subscription = hub.subscribe(1)
+
+        # The first event has expired
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 1}})
+        hub.publish(1, {'type': 'turn', 'data': {'turn': 2}})
+        hub.cache.delete(hub.event_key(1, 1))
+
+        self.assertEqual(
+            subscription.get(timeout=0),
+            {'type': 'turn', 'data': {'turn': 2}}
+        )
+
+
+@override_settings(
+    GAMES_EVENT_HUB='games.events.LocalEventHub',
+    GAMES_EVENT_STREAM_TIMEOUT=0.1
+)
+class GameEventsViewTestCase(TestCase):
+
+    def setUp(self):
+        reset_hub()
+
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.user3 = User.objects.create_user('user3', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player3 = Player(user=self.user3)
+        self.player1.save()
+        self.player2.save()
+        self.player3.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=-2)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=-1)
+        self.team1.save()
+        self.team2.save()
+
+        Ship(
+            team=self.team2,
+            x=5,
+            y=5,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        rebuild_board(self.team2)
+        self.team2.save()
+
+    def tearDown(self):
+        reset_hub()
+
+    def test_logged_in_not_playing(self):
+        self.client.login(
+            username=self.user3.username,
+            password='password'
+        )
+
+        url = reverse('game_events', args=[self.game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_stream(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_events', args=[self.game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp['Content-Type'], 'text/event-stream')
+        self.assertEqual(resp['Cache-Control'], 'no-cache')
+
+        get_hub().publish(self.game.id, {
+            'type': 'turn',
+            'data': {'turn': 1, 'next_team_id': self.team2.id},
+        })
+
+        content = b''.join(resp.streaming_content).decode('utf-8')
+        self.assertTrue(content.startswith('retry: '))
+        self.assertIn(
+            'event: turn\ndata: {}\n\n'.format(json.dumps(
+                {'turn': 1, 'next_team_id': self.team2.id}
+            )),
+            content
+        )
+
+        # The subscription is released once the stream ends
+        self.assertNotIn(self.game.id, get_hub().subscriptions)
+
+    def test_attack_publishes_events(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+        subscription = get_hub().subscribe(self.game.id)
+
+        url = reverse('attack', args=[self.game.id])
+        self.client.post(url, {
+            'target_x': 0,
+            'target_y': 0,
+            'target_team': self.team2.id,
+        })
+
+        event = subscription.get(timeout=0)
+        self.assertEqual(event['type'], 'shot')
+        self.assertEqual(event['data']['attacking_team_id'], self.team1.id)
+        self.assertEqual(event['data']['defending_team_id'], self.team2.id)
+        self.assertEqual(event['data']['result'], 'miss')
+
+        self.assertEqual(subscription.get(timeout=0), {
+            'type': 'turn',
+            'data': {'turn': 1, 'next_team_id': self.team2.id},
+        })
+        self.assertIsNone(subscription.get(timeout=0))
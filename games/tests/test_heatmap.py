@@ -0,0 +1,181 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+
+from games.bitboard import tile_bit
+from games.bitboard import tiles_mask
+from games.heatmap import HEAT_LEVELS
+from games.heatmap import get_heatmaps
+from games.heatmap import heat_levels
+from games.models import GAME_SIZE
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from players.models import Player
+
+
+class HeatLevelsTestCase(TestCase):
+
+    def test_heat_levels(self):
+        levels = heat_levels(
+            tiles_mask([(5, 4), (0, 0)]),
+            tile_bit(5, 4),
+            0,
+            Ship.LENGTHS,
+            GAME_SIZE,
+            GAME_SIZE
+        )
+
+        self.assertEqual(len(levels), GAME_SIZE * GAME_SIZE)
+        # Shot tiles can't hold an unknown ship
+        self.assertEqual(levels[5 + 4 * GAME_SIZE], 0)
+        self.assertEqual(levels[0], 0)
+        # The tiles around the hit are the most likely
+        self.assertEqual(
+            sorted(
+                (i % GAME_SIZE, i // GAME_SIZE)
+                for i, level in enumerate(levels)
+                if level == HEAT_LEVELS
+            ),
+            [(4, 4), (5, 3), (5, 5), (6, 4)]
+        )
+        self.assertTrue(all(0 <= level <= HEAT_LEVELS for level in levels))
+
+    def test_heat_levels_sinking_shot(self):
+        # The shot which sank a ship can't be part of another one, so only
+        # the other hit draws placements to it
+        hits = tiles_mask([(4, 4), (5, 4)])
+        levels = heat_levels(
+            hits,
+            hits,
+            tile_bit(5, 4),
+            [2, 3],
+            GAME_SIZE,
+            GAME_SIZE
+        )
+
+        self.assertGreater(
+            levels[3 + 4 * GAME_SIZE],
+            levels[6 + 4 * GAME_SIZE]
+        )
+
+    def test_heat_levels_every_ship_sunk(self):
+        hits = tiles_mask([(4, 4), (5, 4)])
+        levels = heat_levels(
+            hits,
+            hits,
+            tile_bit(5, 4),
+            [2],
+            GAME_SIZE,
+            GAME_SIZE
+        )
+
+        self.assertEqual(levels, bytes(GAME_SIZE * GAME_SIZE))
+
+
+class GetHeatmapsTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game)
+        self.team1.save()
+        self.team = Team(
+            player=self.player2,
+            game=self.game,
+            hit_mask=tile_bit(4, 4)
+        )
+        self.team.save()
+        Ship(
+            team=self.team,
+            x=4,
+            y=4,
+            length=3,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        ).save()
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team,
+            x=4,
+            y=4,
+            result=Shot.RESULTS['HIT']
+        ).save()
+
+    def test_get_heatmaps(self):
+        with self.assertNumQueries(1):
+            heatmaps = get_heatmaps(self.game, [self.team])
+        self.assertEqual(heatmaps[self.team.id][4 + 4 * GAME_SIZE], 0)
+        self.assertEqual(heatmaps[self.team.id][5 + 4 * GAME_SIZE], 5)
+
+        # Assert the heatmap is cached until the turn changes
+        with self.assertNumQueries(0):
+            self.assertEqual(get_heatmaps(self.game, [self.team]), heatmaps)
+
+        self.team.hit_mask |= tile_bit(5, 4)
+        self.game.turn += 1
+        with self.assertNumQueries(1):
+            self.assertNotEqual(
+                get_heatmaps(self.game, [self.team]),
+                heatmaps
+            )
+
+    def test_get_heatmaps_hides_sunk_ship(self):
+        """Test that boards whose shots look the same to opponents have the
+        same heatmap, however their ships lie."""
+        # Two touching ships, the 2-long one sunk by the shot at (5, 4). On
+        # the first board it covers (4, 4) and (5, 4), on the second (5, 4)
+        # and (6, 4).
+        layouts = [[(4, 4, 2), (6, 4, 3)], [(5, 4, 2), (2, 4, 3)]]
+        shots = [
+            (4, 4, Shot.RESULTS['HIT']),
+            (6, 4, Shot.RESULTS['HIT']),
+            (5, 4, Shot.RESULTS['SUNK']),
+        ]
+        self.game.fleet = '2,3'
+        self.game.save()
+
+        teams = []
+        for i, layout in enumerate(layouts):
+            user = User.objects.create_user('board{}'.format(i), '', '')
+            player = Player(user=user)
+            player.save()
+            team = Team(
+                player=player,
+                game=self.game,
+                hit_mask=tiles_mask([(x, y) for x, y, result in shots])
+            )
+            team.save()
+            for x, y, length in layout:
+                Ship(
+                    team=team,
+                    x=x,
+                    y=y,
+                    length=length,
+                    direction=Ship.CARDINAL_DIRECTIONS['EAST']
+                ).save()
+            for x, y, result in shots:
+                Shot(
+                    game=self.game,
+                    attacking_team=self.team1,
+                    defending_team=team,
+                    x=x,
+                    y=y,
+                    result=result
+                ).save()
+            teams.append(team)
+
+        heatmaps = get_heatmaps(self.game, teams)
+
+        self.assertEqual(heatmaps[teams[0].id], heatmaps[teams[1].id])
@@ -0,0 +1,183 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.bitboard import tile_bit
+from games.history import SNAPSHOT_INTERVAL
+from games.history import creation_events
+from games.history import record_attacks
+from games.history import replay
+from games.history import replay_boards
+from games.models import Game
+from games.models import GameEvent
+from games.models import GameSnapshot
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.persistence import StoredGame
+from games.util import place_ships
+from players.models import Player
+
+
+class HistoryTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=-2)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=-1)
+        fleets = []
+        for team in [self.team1, self.team2]:
+            ships = [Ship(
+                x=0,
+                y=9,
+                length=2,
+                direction=Ship.CARDINAL_DIRECTIONS['EAST']
+            )]
+            place_ships(team, ships)
+            team.save()
+            for ship in ships:
+                ship.team = team
+                ship.save()
+            fleets.append(ships)
+
+        self.game.next_team = self.team1
+        self.game.alive_count = 2
+        self.game.save()
+        GameEvent.objects.bulk_create(
+            creation_events(self.game, [self.team1, self.team2], fleets)
+        )
+
+    def play(self, turns):
+        """Plays turns, each in the same way as AttackView, shooting each
+        board from its top left corner, and returns the hit masks of both
+        teams at the start of every turn played."""
+        hit_masks = []
+        for i in range(turns):
+            stored_game = StoredGame.load(self.game)
+            engine = stored_game.engine
+            hit_masks.append(list(engine.hit_masks))
+
+            attacking_team = stored_game.team(engine.next_team())
+            defending_team = [
+                team
+                for team in stored_game.teams
+                if team.id != attacking_team.id
+            ][0]
+            x, y = engine.turn // 2 % 10, engine.turn // 20
+            shot = Shot(
+                game=self.game,
+                attacking_team=attacking_team,
+                defending_team=defending_team,
+                x=x,
+                y=y,
+                turn=engine.turn
+            )
+            shot.result = engine.fire(defending_team.id, x, y)
+            shot.save()
+            stored_game.save()
+
+            record_attacks(stored_game, [{
+                'game': self.game,
+                'shot': shot,
+                'defending_team': defending_team,
+            }], shot.turn)
+        return hit_masks
+
+    def test_creation_events(self):
+        events = list(self.game.events.order_by('turn', 'id'))
+
+        self.assertEqual(
+            [event.kind for event in events],
+            [
+                GameEvent.KINDS['CREATED'],
+                GameEvent.KINDS['SHIPS_PLACED'],
+                GameEvent.KINDS['SHIPS_PLACED'],
+            ]
+        )
+        self.assertEqual(
+            json.loads(events[0].data),
+            {'width': 10, 'height': 10, 'fleet': self.game.fleet}
+        )
+        self.assertEqual(events[1].team_id, self.team1.id)
+        self.assertEqual(
+            json.loads(events[1].data),
+            {'last_turn': -2, 'ships': [[0, 9, 2, 2]]}
+        )
+
+    def test_record_attacks(self):
+        self.play(SNAPSHOT_INTERVAL + 1)
+
+        self.assertEqual(
+            self.game.events.filter(kind=GameEvent.KINDS['SHOT']).count(),
+            SNAPSHOT_INTERVAL + 1
+        )
+        self.assertEqual(
+            list(GameSnapshot.objects.values_list('turn', flat=True)),
+            [SNAPSHOT_INTERVAL]
+        )
+
+    def test_record_attacks_defeat(self):
+        # Both boards are shot from the top left, so team 1 reaches the
+        # ship in the bottom row first
+        self.play(183)
+
+        defeat = self.game.events.get(kind=GameEvent.KINDS['DEFEATED'])
+        self.assertEqual(defeat.turn, 182)
+        self.assertEqual(defeat.team_id, self.team2.id)
+
+    def test_replay(self):
+        hit_masks = self.play(SNAPSHOT_INTERVAL * 2 + 5)
+
+        for turn, masks in enumerate(hit_masks):
+            engine = replay(self.game, turn)
+            self.assertEqual(engine.turn, turn)
+            self.assertEqual(engine.hit_masks, masks)
+
+        self.assertEqual(
+            replay(self.game, 3).next_team(),
+            self.team2.id
+        )
+
+    def test_replay_from_snapshot(self):
+        self.play(SNAPSHOT_INTERVAL * 3)
+
+        # Turns are replayed from the nearest snapshot, so the shots read
+        # don't grow with the length of the game
+        with self.assertNumQueries(3):
+            engine = replay(self.game, SNAPSHOT_INTERVAL * 2 + 1)
+        self.assertEqual(
+            engine.hit_masks[1],
+            sum(tile_bit(x, y) for x in range(10) for y in range(2))
+            | tile_bit(0, 2)
+        )
+
+    def test_replay_without_log(self):
+        self.game.events.all().delete()
+
+        self.assertIsNone(replay(self.game, 0))
+        self.assertIsNone(replay_boards(self.game, 0))
+
+    def test_replay_boards(self):
+        self.play(4)
+
+        boards = replay_boards(self.game, 2)
+
+        self.assertEqual(boards.game.turn, 2)
+        self.assertEqual(Game.objects.get(pk=self.game.id).turn, 4)
+        self.assertEqual([team.id for team in boards.teams], [
+            self.team1.id,
+            self.team2.id,
+        ])
+        self.assertEqual(boards.board_for(self.team2).hit_mask, tile_bit(0, 0))
+        self.assertTrue(boards.is_next(self.team1))
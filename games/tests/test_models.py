@@ -1,6 +1,14 @@
+from django.apps import apps
 from django.contrib.auth.models import User
+from django.db import connection
+from django.db.migrations.autodetector import MigrationAutodetector
+from django.db.migrations.executor import MigrationExecutor
+from django.db.migrations.loader import MigrationLoader
+from django.db.migrations.state import ProjectState
 from django.test import TestCase
+from django.test import TransactionTestCase
 
+from games.models import GAME_SIZE
 from games.models import Game
 from games.models import Team
 from games.models import Shot
@@ -49,6 +57,63 @@ class GamesModelsTestCase(TestCase):
         self.assertTrue(isinstance(team, Team))
         self.assertEqual(str(team), 'Game 1 - user (last_turn=0)')
 
+    def test_team_board_state(self):
+        """Test that packed board state survives a round trip."""
+        game = Game()
+        game.save()
+
+        user = User.objects.create_user('user', '', 'password')
+
+        player = Player(user=user)
+        player.save()
+
+        team = Team(player=player, game=game)
+        team.save()
+        self.assertEqual(Team.objects.get(pk=team.id).occupancy_mask, 0)
+
+        team.occupancy_mask = (1 << 99) | 1
+        team.hit_mask = 1 << 64
+        team.save()
+
+        team = Team.objects.get(pk=team.id)
+        self.assertEqual(team.occupancy_mask, (1 << 99) | 1)
+        self.assertEqual(team.hit_mask, 1 << 64)
+
+    def test_team_sparse_board_state(self):
+        """Test that sparse masks of large boards are stored compactly."""
+        game = Game(width=1000, height=1000)
+        game.save()
+
+        user = User.objects.create_user('user', '', 'password')
+
+        player = Player(user=user)
+        player.save()
+
+        mask = (1 << 999999) | (1 << 500000) | 1
+        team = Team(player=player, game=game, occupancy_mask=mask)
+        team.save()
+
+        self.assertEqual(Team.objects.get(pk=team.id).occupancy_mask, mask)
+        self.assertEqual(
+            Team._meta.get_field('occupancy_mask').get_prep_value(mask),
+            's0,500000,999999'
+        )
+        self.assertEqual(
+            Team._meta.get_field('hit_mask').get_prep_value(255),
+            'ff'
+        )
+
+    def test_game_board_settings(self):
+        """Test that games default to the classic board and fleet."""
+        game = Game()
+        self.assertEqual((game.width, game.height), (GAME_SIZE, GAME_SIZE))
+        self.assertEqual(game.get_fleet(), Ship.LENGTHS)
+        self.assertFalse(game.is_sparse())
+
+        game = Game(width=1000, height=1000, fleet='5,5,1')
+        self.assertEqual(game.get_fleet(), [5, 5, 1])
+        self.assertTrue(game.is_sparse())
+
     def test_shot_creation(self):
         """Test that Shot instances are created correctly."""
         game = Game()
@@ -118,3 +183,77 @@ class GamesModelsTestCase(TestCase):
             str(ship),
             'Game 1 - user\'s 3L at (0, 0) facing West'
         )
+
+
+class MigrationsTestCase(TestCase):
+
+    def test_migrations_match_models(self):
+        """Test that every change to the models has a migration."""
+        loader = MigrationLoader(None, ignore_no_migrations=True)
+        changes = MigrationAutodetector(
+            loader.project_state(),
+            ProjectState.from_apps(apps)
+        ).changes(graph=loader.graph)
+
+        self.assertEqual(changes, {})
+
+
+class DuplicateShotsMigrationTestCase(TransactionTestCase):
+
+    before = [
+        ('games', '0001_initial'),
+        ('players', '0002_bots_and_stats'),
+    ]
+    after = [('games', '0002_boards_turns_and_history')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.before)
+        self.old_apps = executor.loader.project_state(self.before).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_duplicate_shots_deleted(self):
+        """Test that only the first shot at each tile of a board is kept."""
+        User = self.old_apps.get_model('auth', 'User')
+        OldPlayer = self.old_apps.get_model('players', 'Player')
+        OldGame = self.old_apps.get_model('games', 'Game')
+        OldTeam = self.old_apps.get_model('games', 'Team')
+        OldShot = self.old_apps.get_model('games', 'Shot')
+
+        game = OldGame.objects.create()
+        teams = []
+        for i in range(3):
+            user = User.objects.create(username='user{}'.format(i))
+            player = OldPlayer.objects.create(user=user)
+            teams.append(OldTeam.objects.create(player=player, game=game))
+        first = OldShot.objects.create(
+            game=game,
+            attacking_team=teams[0],
+            defending_team=teams[2],
+            x=0,
+            y=0
+        )
+        OldShot.objects.create(
+            game=game,
+            attacking_team=teams[1],
+            defending_team=teams[2],
+            x=0,
+            y=0
+        )
+        other = OldShot.objects.create(
+            game=game,
+            attacking_team=teams[1],
+            defending_team=teams[2],
+            x=1,
+            y=0
+        )
+
+        MigrationExecutor(connection).migrate(self.after)
+
+        self.assertEqual(
+            sorted(Shot.objects.values_list('id', flat=True)),
+            [first.id, other.id]
+        )
@@ -0,0 +1,118 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.bitboard import tile_bit
+from games.engine import DuplicateShot
+from games.models import Game
+from games.models import Ship
+from games.models import Shot
+from games.models import Team
+from games.persistence import StoredGame
+from games.persistence import lock_game
+from games.util import rebuild_board
+from players.models import Player
+
+
+class StoredGameTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=-2)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=-1)
+        self.team1.save()
+        self.team2.save()
+
+        for team in [self.team1, self.team2]:
+            Ship(
+                team=team,
+                x=1,
+                y=1,
+                length=2,
+                direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+            ).save()
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team2,
+            x=1,
+            y=1
+        ).save()
+        rebuild_board(self.team1)
+        rebuild_board(self.team2)
+        self.team1.save()
+        self.team2.save()
+
+        self.game.next_team = self.team1
+        self.game.alive_count = 2
+        self.game.save()
+
+    def test_load(self):
+        with self.assertNumQueries(2):
+            stored_game = StoredGame.load(self.game)
+
+        engine = stored_game.engine
+        self.assertEqual(engine.next_team(), self.team1.id)
+        self.assertEqual(engine.team_state(self.team2.id).hits_remaining, 1)
+        with self.assertRaises(DuplicateShot):
+            engine.fire(self.team2.id, 1, 1)
+
+    def test_save(self):
+        stored_game = StoredGame.load(self.game)
+        stored_game.engine.fire(self.team2.id, 1, 2)
+
+        with self.assertNumQueries(3):
+            stored_game.save()
+
+        game = Game.objects.get(pk=self.game.id)
+        team1 = Team.objects.get(pk=self.team1.id)
+        team2 = Team.objects.get(pk=self.team2.id)
+        self.assertEqual(game.turn, 1)
+        self.assertEqual(game.next_team_id, self.team1.id)
+        self.assertEqual(game.alive_count, 1)
+        self.assertEqual(team1.last_turn, 0)
+        self.assertTrue(team1.winner)
+        self.assertFalse(team2.alive)
+        self.assertEqual(team2.hits_remaining, 0)
+        self.assertEqual(team2.hit_mask, tile_bit(1, 1) | tile_bit(1, 2))
+
+    def test_save_unchanged(self):
+        stored_game = StoredGame.load(self.game)
+
+        with self.assertNumQueries(0):
+            stored_game.save()
+
+    def test_save_fills_in_turn_pointer(self):
+        Game.objects.filter(pk=self.game.id).update(
+            next_team=None,
+            alive_count=None
+        )
+        stored_game = StoredGame.load(Game.objects.get(pk=self.game.id))
+        stored_game.save()
+
+        game = Game.objects.get(pk=self.game.id)
+        self.assertEqual(game.next_team_id, self.team1.id)
+        self.assertEqual(game.alive_count, 2)
+
+
+class LockGameTestCase(TestCase):
+
+    def test_lock_game(self):
+        game = Game()
+        game.save()
+
+        with self.assertNumQueries(2):
+            self.assertEqual(lock_game(game.id), game)
+
+    def test_lock_game_non_existent(self):
+        with self.assertRaises(Game.DoesNotExist):
+            lock_game(1)
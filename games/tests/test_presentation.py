@@ -1,14 +1,17 @@
 from django.contrib.auth.models import User
 from django.test import TestCase
 
+from games.bitboard import tile_bit
 from games.models import Game
 from games.models import GAME_SIZE
 from games.models import Ship
 from games.models import Shot
 from games.models import Team
 from games.presentation import GamePresenter
+from games.presentation import GameSummaryPresenter
 from games.presentation import TeamPresenter
 from games.presentation import TilePresenter
+from games.util import rebuild_board
 from players.models import Player
 
 
@@ -38,6 +41,48 @@ class GamePresenterTestCase(TestCase):
         self.assertEqual(len(presenter.teams), 2)
 
 
+class GameSummaryPresenterTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.user3 = User.objects.create_user('user3', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player3 = Player(user=self.user3)
+        self.player1.save()
+        self.player2.save()
+        self.player3.save()
+
+        self.games = []
+        for alive in [True, True, False]:
+            game = Game()
+            game.save()
+            Team(player=self.player1, game=game, alive=alive).save()
+            Team(player=self.player2, game=game).save()
+            Team(player=self.player3, game=game).save()
+            self.games.append(game)
+
+    def test_for_player(self):
+        with self.assertNumQueries(1):
+            presenters = GameSummaryPresenter.for_player(self.player1)
+
+        self.assertEqual(
+            [presenter.id for presenter in presenters],
+            [self.games[0].id, self.games[1].id]
+        )
+        for presenter in presenters:
+            self.assertEqual(presenter.opponents, ['user2', 'user3'])
+
+    def test_for_player_without_games(self):
+        user = User.objects.create_user('user4', '', 'password')
+        player = Player(user=user)
+        player.save()
+
+        self.assertEqual(GameSummaryPresenter.for_player(player), [])
+
+
 class TeamPresenterTestCase(TestCase):
 
     def setUp(self):
@@ -69,6 +114,28 @@ class TeamPresenterTestCase(TestCase):
         for i in range(0, GAME_SIZE):
             self.assertEqual(len(tiles[i]), GAME_SIZE)
 
+    def test_from_team_sparse(self):
+        game = Game(width=1000, height=1000)
+        game.save()
+        team = Team(
+            player=self.player,
+            game=game,
+            occupancy_mask=tile_bit(998, 999, 1000) | tile_bit(999, 999, 1000),
+            hit_mask=tile_bit(0, 0, 1000) | tile_bit(999, 999, 1000)
+        )
+        team.save()
+
+        presenter = TeamPresenter.from_team(team=team, game=game)
+
+        # Only the tiles with a ship or a shot are presented
+        self.assertIsNone(presenter.tiles)
+        self.assertEqual(
+            [(tile.name, tile.is_empty, tile.is_hit)
+             for tile in presenter.marks],
+            [('A0', True, True), ('ALK999', False, False),
+             ('ALL999', False, True)]
+        )
+
 
 class TilePresenterTestCase(TestCase):
 
@@ -116,6 +183,9 @@ class TilePresenterTestCase(TestCase):
         )
         self.shot_hit.save()
 
+        rebuild_board(self.team2)
+        self.team2.save()
+
     def test_from_team(self):
         presenter = TilePresenter.from_team(
             x=0,
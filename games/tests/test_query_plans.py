@@ -0,0 +1,128 @@
+from unittest import mock
+from unittest import skipUnless
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.urlresolvers import reverse
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils.six import StringIO
+
+from games.history import replay
+from games.models import Game
+from games.models import Team
+from games.presentation import GameSummaryPresenter
+from players.models import Player
+from players.util import compute_stats
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Query plans are read from SQLite')
+class QueryPlanTestCase(TestCase):
+    """Runs EXPLAIN QUERY PLAN on every query made along the hot paths of a
+    game, and fails if any of them scans a whole table or index rather than
+    searching one."""
+
+    def setUp(self):
+        self.users = []
+        self.players = []
+        for username in ['user1', 'user2', 'user3']:
+            user = User.objects.create_user(username, '', 'password')
+            player = Player(user=user)
+            player.save()
+            self.users.append(user)
+            self.players.append(player)
+
+        self.client.login(username='user1', password='password')
+        self.client.post(reverse('create_game'), {
+            'opponent_username_0': 'user2',
+            'opponent_username_1': 'user3',
+        })
+        self.game = Game.objects.get()
+        self.teams = list(self.game.teams.order_by('id'))
+
+    def assertNoScans(self, func, *args, **kwargs):
+        """Calls func and checks the query plan of every query it makes."""
+        # Capture each query's SQL and parameters, rather than the SQL with
+        # parameters filled in for display
+        with mock.patch.object(
+            connection.ops,
+            'last_executed_query',
+            lambda cursor, sql, params: (sql, params)
+        ):
+            with CaptureQueriesContext(connection) as queries:
+                func(*args, **kwargs)
+
+        scans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql, params = query['sql']
+                if not sql.lstrip().upper().startswith(
+                    ('SELECT', 'UPDATE', 'DELETE')
+                ):
+                    continue
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                for row in cursor.fetchall():
+                    detail = row[-1]
+                    if detail.startswith('SCAN'):
+                        scans.append('{}\n    {}'.format(sql, detail))
+        self.assertEqual(scans, [], '\n'.join(scans))
+
+    def attack(self):
+        return self.client.post(reverse('attack', args=[self.game.id]), {
+            'target_x': 0,
+            'target_y': 0,
+            'target_team': self.teams[1].id,
+        })
+
+    def test_create_game(self):
+        self.assertNoScans(
+            self.client.post,
+            reverse('create_game'),
+            {'opponent_username_0': 'user2'}
+        )
+
+    def test_game_view(self):
+        url = reverse('game', args=[self.game.id])
+        self.assertNoScans(self.client.get, url)
+        self.assertNoScans(self.client.get, url, {'heatmap': 1})
+
+    def test_attack(self):
+        self.assertNoScans(self.attack)
+        # Repeated shots are caught by the unique index on shots
+        self.assertNoScans(self.attack)
+
+    def test_polling(self):
+        self.attack()
+
+        self.assertNoScans(
+            self.client.get,
+            reverse('game_shots', args=[self.game.id]),
+            {'since': 0}
+        )
+        self.assertNoScans(
+            self.client.get,
+            reverse('game_state', args=[self.game.id])
+        )
+
+    def test_replay(self):
+        self.attack()
+
+        self.assertNoScans(replay, self.game, 1)
+        self.assertNoScans(
+            self.client.get,
+            reverse('game_replay', args=[self.game.id]),
+            {'turn': 1}
+        )
+
+    def test_game_summaries(self):
+        self.assertNoScans(GameSummaryPresenter.for_player, self.players[0])
+
+    def test_compute_stats(self):
+        self.assertNoScans(compute_stats, self.players[:2])
+
+    def test_archive_games(self):
+        Team.objects.filter(pk=self.teams[2].id).update(alive=False)
+        Game.objects.filter(pk=self.game.id).update(alive_count=1)
+
+        self.assertNoScans(call_command, 'archive_games', stdout=StringIO())
@@ -0,0 +1,26 @@
+import unittest
+
+from games.models import GAME_SIZE
+from games.models import Ship
+from games.simulation import simulate_game
+
+
+class SimulateGameTestCase(unittest.TestCase):
+
+    def test_simulate_game(self):
+        result = simulate_game(1)
+
+        self.assertIn(result.winner, [0, 1])
+        # The winner sinks every ship of the loser
+        self.assertGreaterEqual(result.hits, sum(Ship.LENGTHS))
+        self.assertLessEqual(result.winner_shots, GAME_SIZE * GAME_SIZE)
+        self.assertEqual(result.shots, result.turns)
+        self.assertTrue(0 < result.hit_rate <= 1)
+        self.assertEqual(simulate_game(1), result)
+
+    def test_many_teams(self):
+        result = simulate_game(2, width=6, height=4, fleet=[2], team_count=5)
+
+        self.assertIn(result.winner, range(5))
+        # The winner sinks every other ship
+        self.assertGreaterEqual(result.hits, 4 * 2)
@@ -7,9 +7,29 @@ from games.models import Game
 from games.models import Team
 from games.models import Ship
 from players.models import Player
+from games.bitboard import tile_bit
+from games.models import Shot
 from games.util import are_ships_overlapping
+from games.util import column_name
+from games.util import is_game_over
 from games.util import is_team_next
 from games.util import is_valid_ship_position
+from games.util import make_ships
+from games.util import place_ships
+from games.util import rebuild_board
+from games.util import record_shot
+
+
+class ColumnNameTestCase(unittest.TestCase):
+
+    def test_column_name(self):
+        self.assertEqual(column_name(0), 'A')
+        self.assertEqual(column_name(9), 'J')
+        self.assertEqual(column_name(25), 'Z')
+        self.assertEqual(column_name(26), 'AA')
+        self.assertEqual(column_name(27), 'AB')
+        self.assertEqual(column_name(701), 'ZZ')
+        self.assertEqual(column_name(702), 'AAA')
 
 
 class AreShipsOverlappingTestCase(unittest.TestCase):
@@ -82,6 +102,30 @@ class IsTeamNextTestCase(TestCase):
 
         self.assertTrue(is_team_next(self.team2, self.game))
 
+    def test_stored_turn_pointer(self):
+        self.game.next_team = self.team3
+        self.game.save()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_team_next(self.team3, self.game))
+            self.assertFalse(is_team_next(self.team1, self.game))
+
+    def test_is_game_over(self):
+        self.assertFalse(is_game_over(self.game))
+
+        self.team1.alive = False
+        self.team1.save()
+        self.team2.alive = False
+        self.team2.save()
+        self.assertTrue(is_game_over(self.game))
+
+    def test_is_game_over_stored_count(self):
+        self.game.alive_count = 1
+        self.game.save()
+
+        with self.assertNumQueries(0):
+            self.assertTrue(is_game_over(self.game))
+
 
 class MakeShipsTestCase(unittest.TestCase):
 
@@ -165,3 +209,85 @@ class MakeShipsTestCase(unittest.TestCase):
             direction=Ship.CARDINAL_DIRECTIONS['EAST']
         )
         self.assertFalse(is_valid_ship_position(ship))
+
+
+class PackedBoardTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.team1 = Team(player=self.player1, game=self.game)
+        self.team2 = Team(player=self.player2, game=self.game)
+        self.team1.save()
+        self.team2.save()
+
+        self.ship = Ship(
+            team=self.team2,
+            x=3,
+            y=3,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        )
+        self.ship.save()
+
+    def test_make_ships(self):
+        ships = make_ships(self.team1, Ship.LENGTHS)
+
+        self.assertEqual([ship.length for ship in ships], Ship.LENGTHS)
+        for i, ship in enumerate(ships):
+            self.assertEqual(ship.team, self.team1)
+            self.assertTrue(is_valid_ship_position(ship))
+            for other_ship in ships[i + 1:]:
+                self.assertFalse(are_ships_overlapping(ship, other_ship))
+
+    def test_place_ships(self):
+        place_ships(self.team2, [self.ship])
+
+        self.assertEqual(
+            self.team2.occupancy_mask,
+            tile_bit(3, 3) | tile_bit(4, 3)
+        )
+        self.assertEqual(self.team2.hits_remaining, 2)
+
+    def test_record_shot(self):
+        place_ships(self.team2, [self.ship])
+
+        self.assertFalse(record_shot(self.team2, 0, 0))
+        self.assertEqual(self.team2.hits_remaining, 2)
+        self.assertTrue(record_shot(self.team2, 3, 3))
+        self.assertEqual(self.team2.hits_remaining, 1)
+        # Repeated hits on the same tile are only counted once
+        self.assertTrue(record_shot(self.team2, 3, 3))
+        self.assertEqual(self.team2.hits_remaining, 1)
+        self.assertTrue(record_shot(self.team2, 4, 3))
+        self.assertEqual(self.team2.hits_remaining, 0)
+        self.assertEqual(
+            self.team2.hit_mask,
+            tile_bit(0, 0) | tile_bit(3, 3) | tile_bit(4, 3)
+        )
+
+    def test_rebuild_board(self):
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team2,
+            x=4,
+            y=3
+        ).save()
+
+        rebuild_board(self.team2)
+        self.team2.save()
+        team = Team.objects.get(pk=self.team2.id)
+
+        self.assertEqual(team.occupancy_mask, tile_bit(3, 3) | tile_bit(4, 3))
+        self.assertEqual(team.hit_mask, tile_bit(4, 3))
+        self.assertEqual(team.hits_remaining, 1)
@@ -1,13 +1,23 @@
+import json
+from unittest import mock
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
+from django.db import OperationalError
 from django.test import TestCase
 from pyquery import PyQuery
 
+from games.bitboard import tile_bit
 from games.models import Game
+from games.models import MAX_TEAMS
 from games.models import Ship
 from games.models import Shot
 from games.models import Team
+from games.util import rebuild_board
 from players.models import Player
+from players.models import PlayerStats
+from players.util import get_stats
 
 
 class GameViewTestCase(TestCase):
@@ -62,6 +72,101 @@ class GameViewTestCase(TestCase):
         self.assertIn('user2\'s board', pq('.board h3').text())
         # Assert the player is given an attack form
         self.assertEqual(len(pq('#attack-form')), 1)
+        # Assert boards can be patched in place by app.js
+        self.assertEqual(
+            pq('#game').attr('data-shots-url'),
+            reverse('game_shots', args=[self.game.id])
+        )
+        self.assertEqual(pq('#game').attr('data-turn'), '0')
+        self.assertEqual(
+            len(pq('.board[data-team-id="{}"] td[data-x]'.format(
+                self.team2.id
+            ))),
+            100
+        )
+
+    def test_logged_in_playing_heatmap(self):
+        Ship(
+            team=self.team2,
+            x=0,
+            y=0,
+            length=5,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team2,
+            x=0,
+            y=1,
+            result=Shot.RESULTS['HIT']
+        ).save()
+        rebuild_board(self.team2)
+        self.team2.save()
+        cache.clear()
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game', args=[self.game.id])
+        pq = PyQuery(self.client.get(url).content)
+
+        # Assert the heatmap is only shown when asked for
+        self.assertEqual(len(pq('[class^="heat-"]')), 0)
+        self.assertEqual(
+            pq('.heatmap-toggle a').attr('href'),
+            '?heatmap=1'
+        )
+
+        pq = PyQuery(self.client.get(url, {'heatmap': 1}).content)
+        board = pq('.board[data-team-id="{}"]'.format(self.team2.id))
+        player_board = pq('.board[data-team-id="{}"]'.format(self.team1.id))
+        # Assert the tile most placements of the fleet through the hit cover
+        # is the most likely, and the hit itself isn't shaded
+        self.assertEqual(
+            sorted(
+                (tile.attrib['data-x'], tile.attrib['data-y'])
+                for tile in board('.heat-5')
+            ),
+            [('0', '2')]
+        )
+        self.assertEqual(len(board('.tile-hit[class*="heat-"]')), 0)
+        self.assertEqual(len(player_board('[class*="heat-"]')), 0)
+        self.assertEqual(pq('.heatmap-toggle a').attr('href'), '?')
+
+    def test_logged_in_playing_large_board(self):
+        game = Game(width=1000, height=1000)
+        game.save()
+        team1 = Team(player=self.player1, game=game, last_turn=-2)
+        team2 = Team(
+            player=self.player2,
+            game=game,
+            last_turn=-1,
+            occupancy_mask=tile_bit(500, 600, 1000) | tile_bit(501, 600, 1000),
+            hit_mask=tile_bit(500, 600, 1000) | tile_bit(3, 4, 1000)
+        )
+        team1.save()
+        team2.save()
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game', args=[game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        pq = PyQuery(resp.content)
+
+        # Assert only the opponent's shot tiles are listed, not the grid
+        board = pq('.board[data-team-id="{}"]'.format(team2.id))
+        self.assertEqual(len(board('td')), 0)
+        self.assertEqual(board('li[data-x]').text(), 'D4 SG600')
+        self.assertEqual(len(board('.tile-occupied')), 1)
+        # Assert co-ordinates are entered as numbers
+        self.assertEqual(pq('[name="target_x"]').attr('type'), 'number')
+        self.assertEqual(pq('[name="target_x"]').attr('max'), '999')
 
     def test_logged_in_playing_not_current_turn(self):
         self.client.login(
@@ -167,8 +272,19 @@ class CreateGameViewTestCase(TestCase):
         self.assertEqual(len(teams), 2)
         self.assertIn(self.user1.username, team_names)
         self.assertIn(self.user2.username, team_names)
+        self.assertEqual(game.next_team.player, self.player1)
+        self.assertEqual(game.alive_count, 2)
+        for team in teams:
+            self.assertEqual(team.ships.count(), len(Ship.LENGTHS))
+            self.assertEqual(team.hits_remaining, sum(Ship.LENGTHS))
+            self.assertEqual(
+                bin(team.occupancy_mask).count('1'),
+                sum(Ship.LENGTHS)
+            )
 
     def test_post_logged_in_multiple_username(self):
+        for player in [self.player1, self.player2, self.player3]:
+            PlayerStats(player=player).save()
         self.client.login(
             username=self.user1.username,
             password='password'
@@ -192,6 +308,230 @@ class CreateGameViewTestCase(TestCase):
         self.assertIn(self.user1.username, team_names)
         self.assertIn(self.user2.username, team_names)
         self.assertIn(self.user3.username, team_names)
+        for player in [self.player1, self.player2, self.player3]:
+            self.assertEqual(
+                PlayerStats.objects.get(player=player).in_progress_count,
+                1
+            )
+
+    def test_post_logged_in_board_settings(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('create_game')
+        resp = self.client.post(url, {
+            'opponent_username_0': self.user2.username,
+            'width': 1000,
+            'height': 500,
+            'fleet': '6, 6, 1',
+        })
+
+        game = Game.objects.get()
+        self.assertRedirects(resp, reverse('game', args=[game.id]))
+        self.assertEqual((game.width, game.height), (1000, 500))
+        self.assertEqual(game.get_fleet(), [6, 6, 1])
+        for team in game.teams.all():
+            self.assertEqual(
+                sorted(ship.length for ship in team.ships.all()),
+                [1, 6, 6]
+            )
+            self.assertEqual(team.hits_remaining, 13)
+
+    def test_post_logged_in_ships_do_not_fit(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('create_game')
+        resp = self.client.post(url, {
+            'opponent_username_0': self.user2.username,
+            'width': 5,
+            'height': 5,
+            'fleet': '6',
+        })
+
+        self.assertEqual(resp.status_code, 200)
+        pq = PyQuery(resp.content)
+        self.assertIn('don\'t fit', pq('.alert-danger').text())
+        self.assertFalse(Game.objects.exists())
+
+    def test_post_logged_in_invalid_board_settings(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('create_game')
+        for data in [{'width': 1001}, {'height': 0}, {'fleet': '2,x'}]:
+            data['opponent_username_0'] = self.user2.username
+            resp = self.client.post(url, data)
+
+            self.assertEqual(resp.status_code, 200)
+            pq = PyQuery(resp.content)
+            self.assertIn('Invalid form', pq('.alert-danger').text())
+        self.assertFalse(Game.objects.exists())
+
+    def test_post_logged_in_max_players_queries(self):
+        user4 = User.objects.create_user('user4', '', 'password')
+        Player(user=user4).save()
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        # Session and user, then one query each for the players, the game,
+        # the teams and their ids, the ships, the log, the turn pointer and
+        # the stats
+        url = reverse('create_game')
+        with self.assertNumQueries(12):
+            self.client.post(url, {
+                'opponent_username_0': self.user2.username,
+                'opponent_username_1': self.user3.username,
+                'opponent_username_2': user4.username,
+            })
+
+        game = Game.objects.get()
+        teams = list(game.teams.order_by('id'))
+        self.assertEqual(
+            [team.player.user.username for team in teams],
+            ['user1', 'user2', 'user3', 'user4']
+        )
+        self.assertEqual(game.next_team, teams[0])
+        self.assertEqual(
+            Ship.objects.filter(team__game=game).count(),
+            4 * len(Ship.LENGTHS)
+        )
+
+
+class LargeGameViewTestCase(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user('user', '', 'password')
+        Player(user=self.user).save()
+        User.objects.bulk_create([
+            User(username='opponent{}'.format(i))
+            for i in range(MAX_TEAMS)
+        ])
+        Player.objects.bulk_create([
+            Player(user=user)
+            for user in User.objects.filter(username__startswith='opponent')
+        ])
+        self.client.login(username=self.user.username, password='password')
+
+    def create_game(self, team_count):
+        game = Game(alive_count=team_count)
+        game.save()
+        players = [Player.objects.get(user=self.user)] + list(
+            Player.objects.exclude(user=self.user).order_by('id')
+        )
+        for i in range(team_count):
+            Team(
+                player=players[i],
+                game=game,
+                last_turn=-2 if i == 0 else -1
+            ).save()
+        teams = list(game.teams.order_by('id'))
+        Ship(
+            team=teams[1],
+            x=0,
+            y=0,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['EAST']
+        ).save()
+        rebuild_board(teams[1])
+        teams[1].save()
+        game.next_team = teams[0]
+        game.save()
+        return game, teams
+
+    def test_create_game(self):
+        usernames = ['opponent{}'.format(i) for i in range(69)]
+
+        # The same queries as a game of two, except that SQLite's limit on
+        # query parameters splits the ships into two inserts
+        url = reverse('create_game')
+        with self.assertNumQueries(13):
+            resp = self.client.post(url, {
+                'opponent_username_0': usernames[0],
+                'more_opponents': ', '.join(usernames[1:]),
+            })
+
+        game = Game.objects.get()
+        self.assertRedirects(resp, reverse('game', args=[game.id]))
+        self.assertEqual(
+            [team.player.user.username
+             for team in game.teams.order_by('id')],
+            ['user'] + usernames
+        )
+        self.assertEqual(game.alive_count, 70)
+
+    def test_create_game_too_many_players(self):
+        url = reverse('create_game')
+        resp = self.client.post(url, {
+            'opponent_username_0': 'opponent0',
+            'more_opponents': ' '.join(
+                'opponent{}'.format(i) for i in range(1, MAX_TEAMS)
+            ),
+        })
+
+        pq = PyQuery(resp.content)
+        self.assertIn('Invalid form', pq('.alert-danger').text())
+        self.assertFalse(Game.objects.exists())
+
+    def test_game_view(self):
+        game, teams = self.create_game(64)
+
+        url = reverse('game', args=[game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        pq = PyQuery(resp.content)
+
+        # Assert only the player's and the target's boards are shown, with
+        # the target chosen in the attack form
+        self.assertEqual(
+            [int(team_id) for team_id in pq('.board').map(
+                lambda i, board: PyQuery(board).attr('data-team-id')
+            )],
+            [teams[0].id, teams[1].id]
+        )
+        self.assertEqual(len(pq('.team-summaries tr[data-team-id]')), 62)
+        self.assertEqual(
+            pq('[name="target_team"] option[selected]').attr('value'),
+            str(teams[1].id)
+        )
+
+        resp = self.client.get(url, {'target': teams[5].id})
+
+        pq = PyQuery(resp.content)
+        self.assertEqual(
+            pq('.board:last').attr('data-team-id'),
+            str(teams[5].id)
+        )
+        self.assertEqual(len(pq('.team-summaries tr[data-team-id]')), 62)
+
+    def test_attack_keeps_target(self):
+        game, teams = self.create_game(64)
+
+        url = reverse('attack', args=[game.id])
+        resp = self.client.post(url, {
+            'target_x': 0,
+            'target_y': 0,
+            'target_team': teams[1].id,
+        })
+
+        self.assertRedirects(
+            resp,
+            '{}?target={}'.format(
+                reverse('game', args=[game.id]),
+                teams[1].id
+            )
+        )
+        game.refresh_from_db()
+        self.assertEqual(game.next_team_id, teams[1].id)
 
 
 class AttackViewTestCase(TestCase):
@@ -284,6 +624,28 @@ class AttackViewTestCase(TestCase):
         self.assertEqual(len(pq('.alert-danger')), 1)
         self.assertIn('It\'s not your turn', pq('.alert-danger').text())
 
+    def test_post_logged_in_playing_game_over(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+        self.game.alive_count = 1
+        self.game.save()
+
+        url = reverse('attack', args=[self.game.id])
+        resp = self.client.post(url, {
+            'target_x': 0,
+            'target_y': 0,
+            'target_team': self.team2.id,
+        }, follow=True)
+
+        pq = PyQuery(resp.content)
+
+        # Assert error is shown and no shot is taken
+        self.assertEqual(len(pq('.alert-danger')), 1)
+        self.assertIn('This game is over', pq('.alert-danger').text())
+        self.assertEqual(Shot.objects.filter(game=self.game).count(), 0)
+
     def test_post_logged_in_playing_miss(self):
         self.client.login(
             username=self.user1.username,
@@ -361,6 +723,8 @@ class AttackViewTestCase(TestCase):
             direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
         )
         ship.save()
+        rebuild_board(self.team2)
+        self.team2.save()
 
         url = reverse('attack', args=[self.game.id])
         resp = self.client.post(url, {
@@ -383,6 +747,92 @@ class AttackViewTestCase(TestCase):
         self.assertEqual(len(pq('.alert-success')), 1)
         self.assertIn('Hit', pq('.alert-success').text())
 
+        # Assert the shot is stored with its turn and result
+        shot = Shot.objects.get(game=self.game)
+        self.assertEqual(shot.turn, 0)
+        self.assertEqual(shot.result, Shot.RESULTS['HIT'])
+        self.assertEqual(Game.objects.get(pk=self.game.id).turn, 1)
+
+    def test_post_logged_in_playing_queries(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        Ship(
+            team=self.team2,
+            x=1,
+            y=1,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        rebuild_board(self.team2)
+        self.team2.save()
+        self.game.next_team = self.team1
+        self.game.alive_count = 2
+        self.game.save()
+
+        # Session and user, then locking and reading the game, teams and
+        # ships, the shot in its own savepoint, one update for each changed
+        # row and the log
+        url = reverse('attack', args=[self.game.id])
+        with self.assertNumQueries(14):
+            self.client.post(url, {
+                'target_x': 1,
+                'target_y': 1,
+                'target_team': self.team2.id,
+            })
+
+        self.assertEqual(
+            Shot.objects.get(game=self.game).result,
+            Shot.RESULTS['HIT']
+        )
+
+    def test_post_logged_in_playing_sunk(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        Ship(
+            team=self.team2,
+            x=1,
+            y=1,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        Ship(
+            team=self.team2,
+            x=5,
+            y=5,
+            length=2,
+            direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
+        ).save()
+        Shot(
+            game=self.game,
+            attacking_team=self.team1,
+            defending_team=self.team2,
+            x=1,
+            y=1
+        ).save()
+        rebuild_board(self.team2)
+        self.team2.save()
+
+        url = reverse('attack', args=[self.game.id])
+        resp = self.client.post(url, {
+            'target_x': 1,
+            'target_y': 2,
+            'target_team': self.team2.id,
+        }, follow=True)
+
+        pq = PyQuery(resp.content)
+
+        # Assert the sunk ship is reported without defeating the team
+        self.assertEqual(len(pq('.alert-success')), 2)
+        self.assertIn('Hit', pq('.alert-success').text())
+        self.assertIn('You sank a ship', pq('.alert-success').text())
+        self.assertNotIn('You defeated', pq('.alert-success').text())
+
     def test_post_logged_in_playing_defeat(self):
         self.client.login(
             username=self.user1.username,
@@ -397,6 +847,10 @@ class AttackViewTestCase(TestCase):
             direction=Ship.CARDINAL_DIRECTIONS['SOUTH']
         )
         ship.save()
+        rebuild_board(self.team2)
+        self.team2.save()
+        get_stats(self.player1)
+        get_stats(self.player2)
 
         url = reverse('attack', args=[self.game.id])
         resp = self.client.post(url, {
@@ -419,3 +873,427 @@ class AttackViewTestCase(TestCase):
         self.assertEqual(len(pq('.alert-success')), 2)
         self.assertIn('Hit', pq('.alert-success').text())
         self.assertIn('You defeated user2', pq('.alert-success').text())
+
+        # Assert both players' stats are updated
+        stats1 = PlayerStats.objects.get(player=self.player1)
+        stats2 = PlayerStats.objects.get(player=self.player2)
+        self.assertEqual(
+            (stats1.win_count, stats1.loss_count, stats1.in_progress_count),
+            (1, 0, 0)
+        )
+        self.assertEqual(
+            (stats2.win_count, stats2.loss_count, stats2.in_progress_count),
+            (0, 1, 0)
+        )
+
+    def test_post_logged_in_playing_database_locked(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('attack', args=[self.game.id])
+        with mock.patch(
+            'games.views.lock_game',
+            side_effect=OperationalError('database is locked')
+        ):
+            resp = self.client.post(url, {
+                'target_x': 0,
+                'target_y': 0,
+                'target_team': self.team2.id,
+            }, follow=True)
+
+        game_url = 'http://testserver{}'.format(
+            reverse('game', args=[self.game.id])
+        )
+        self.assertIn((game_url, 302), resp.redirect_chain)
+        pq = PyQuery(resp.content)
+        self.assertIn('try again', pq('.alert-danger').text())
+        self.assertFalse(Shot.objects.filter(game=self.game).exists())
+
+    def test_post_logged_in_playing_database_error(self):
+        """Test that database errors other than lock timeouts aren't passed
+        off as a busy game."""
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('attack', args=[self.game.id])
+        with mock.patch(
+            'games.views.lock_game',
+            side_effect=OperationalError('no such column: turn')
+        ):
+            with self.assertRaises(OperationalError):
+                self.client.post(url, {
+                    'target_x': 0,
+                    'target_y': 0,
+                    'target_team': self.team2.id,
+                })
+
+    def test_post_logged_in_playing_against_bots(self):
+        for player in [self.player2, self.player3]:
+            player.is_bot = True
+            player.save()
+        self.team1.last_turn = -3
+        self.team2.last_turn = -2
+        self.team3 = Team(player=self.player3, game=self.game, last_turn=-1)
+        self.team3.save()
+        for team in [self.team1, self.team2, self.team3]:
+            Ship(
+                team=team,
+                x=0,
+                y=0,
+                length=2,
+                direction=Ship.CARDINAL_DIRECTIONS['EAST']
+            ).save()
+            rebuild_board(team)
+            team.save()
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('attack', args=[self.game.id])
+        self.client.post(url, {
+            'target_x': 5,
+            'target_y': 5,
+            'target_team': self.team2.id,
+        })
+
+        # Assert both bots took their turn straight after the player
+        shots = list(Shot.objects.filter(game=self.game).order_by('turn'))
+        self.assertEqual(
+            [shot.attacking_team_id for shot in shots],
+            [self.team1.id, self.team2.id, self.team3.id]
+        )
+        self.assertEqual([shot.turn for shot in shots], [0, 1, 2])
+        game = Game.objects.get(pk=self.game.id)
+        self.assertEqual(game.turn, 3)
+        self.assertEqual(game.next_team_id, self.team1.id)
+
+
+class GameReplayViewTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        Player(user=self.user1).save()
+        Player(user=self.user2).save()
+
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+        self.client.post(reverse('create_game'), {
+            'opponent_username_0': self.user2.username,
+        })
+        self.game = Game.objects.get()
+        self.team1, self.team2 = self.game.teams.order_by('id')
+
+        self.client.post(reverse('attack', args=[self.game.id]), {
+            'target_x': 3,
+            'target_y': 4,
+            'target_team': self.team2.id,
+        })
+
+    def test_get(self):
+        url = reverse('game_replay', args=[self.game.id])
+
+        pq = PyQuery(self.client.get(url).content)
+        board = pq('.board[data-team-id="{}"]'.format(self.team2.id))
+        self.assertIn('Turn 1 of 1', pq('.replay-nav h3').text())
+        self.assertEqual(
+            [(tile.attrib['data-x'], tile.attrib['data-y'])
+             for tile in board('.tile-hit')],
+            [('3', '4')]
+        )
+
+        pq = PyQuery(self.client.get(url, {'turn': 0}).content)
+        board = pq('.board[data-team-id="{}"]'.format(self.team2.id))
+        self.assertIn('Turn 0 of 1', pq('.replay-nav h3').text())
+        self.assertEqual(len(board('.tile-hit')), 0)
+        # Assert opponents' ships stay hidden
+        self.assertEqual(len(board('.tile-occupied')), 0)
+
+    def test_get_invalid_turn(self):
+        url = reverse('game_replay', args=[self.game.id])
+
+        for turn in ['-1', '2', 'x']:
+            resp = self.client.get(url, {'turn': turn})
+            self.assertEqual(resp.status_code, 404)
+
+    def test_get_without_log(self):
+        self.game.events.all().delete()
+
+        url = reverse('game_replay', args=[self.game.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_get_not_playing(self):
+        self.client.logout()
+        User.objects.create_user('user3', '', 'password')
+        self.client.login(username='user3', password='password')
+
+        url = reverse('game_replay', args=[self.game.id])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_get_state(self):
+        url = reverse('game_replay_state', args=[self.game.id])
+
+        state = json.loads(
+            self.client.get(url, {'turn': 0}).content.decode('utf-8')
+        )
+        self.assertEqual(state['turn'], 0)
+        self.assertEqual(state['last_turn'], 1)
+        self.assertEqual(state['viewer_team_id'], self.team1.id)
+        self.assertEqual(state['teams'][1]['shots'], [])
+        self.assertIsNone(state['teams'][1]['ships'])
+        self.assertEqual(len(state['teams'][0]['ships']), 17)
+
+        state = json.loads(self.client.get(url).content.decode('utf-8'))
+        self.assertEqual(state['turn'], 1)
+        self.assertEqual(len(state['teams'][1]['shots']), 1)
+
+
+class GameStateViewTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game()
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.user3 = User.objects.create_user('user3', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player3 = Player(user=self.user3)
+        self.player1.save()
+        self.player2.save()
+        self.player3.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=-2)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=-1)
+        self.team1.save()
+        self.team2.save()
+
+        for team in [self.team1, self.team2]:
+            Ship(
+                team=team,
+                x=1,
+                y=1,
+                length=2,
+                direction=Ship.CARDINAL_DIRECTIONS['EAST']
+            ).save()
+        for x in [0, 1]:
+            Shot(
+                game=self.game,
+                attacking_team=self.team1,
+                defending_team=self.team2,
+                x=x,
+                y=1
+            ).save()
+        for team in [self.team1, self.team2]:
+            rebuild_board(team)
+            team.save()
+
+    def test_logged_out(self):
+        url = reverse('game_state', args=[self.game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_logged_in_not_playing(self):
+        self.client.login(
+            username=self.user3.username,
+            password='password'
+        )
+
+        url = reverse('game_state', args=[self.game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_logged_in_playing(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_state', args=[self.game.id])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.has_header('ETag'))
+        state = json.loads(resp.content.decode('utf-8'))
+
+        self.assertEqual(state['id'], self.game.id)
+        self.assertEqual(state['turn'], 0)
+        self.assertEqual(state['viewer_team_id'], self.team1.id)
+
+        team1_state, team2_state = state['teams']
+        self.assertEqual(team1_state['username'], 'user1')
+        self.assertTrue(team1_state['is_next'])
+        self.assertEqual(team1_state['ships'], [[1, 1], [2, 1]])
+        self.assertEqual(team1_state['shots'], [])
+
+        # Assert the opponent's ships are hidden but shots are shown
+        self.assertEqual(team2_state['username'], 'user2')
+        self.assertFalse(team2_state['is_next'])
+        self.assertIsNone(team2_state['ships'])
+        self.assertEqual(team2_state['shots'], [
+            {'x': 0, 'y': 1, 'hit': False},
+            {'x': 1, 'y': 1, 'hit': True},
+        ])
+
+    def test_conditional_get(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_state', args=[self.game.id])
+        etag = self.client.get(url)['ETag']
+
+        # Session, user and team lookups only
+        with self.assertNumQueries(3):
+            resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        self.game.turn = 1
+        self.game.save()
+
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 200)
+        self.assertNotEqual(resp['ETag'], etag)
+
+    def test_etag_differs_between_viewers(self):
+        url = reverse('game_state', args=[self.game.id])
+
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+        etag1 = self.client.get(url)['ETag']
+        self.client.login(
+            username=self.user2.username,
+            password='password'
+        )
+        resp = self.client.get(url, HTTP_IF_NONE_MATCH=etag1)
+
+        self.assertEqual(resp.status_code, 200)
+        state = json.loads(resp.content.decode('utf-8'))
+        self.assertIsNone(state['teams'][0]['ships'])
+
+
+class GameShotsViewTestCase(TestCase):
+
+    def setUp(self):
+        self.game = Game(turn=3)
+        self.game.save()
+
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.user3 = User.objects.create_user('user3', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player3 = Player(user=self.user3)
+        self.player1.save()
+        self.player2.save()
+        self.player3.save()
+
+        self.team1 = Team(player=self.player1, game=self.game, last_turn=2)
+        self.team2 = Team(player=self.player2, game=self.game, last_turn=1)
+        self.team1.save()
+        self.team2.save()
+
+        shots = [
+            (self.team1, self.team2, 0, Shot.RESULTS['MISS']),
+            (self.team2, self.team1, 1, Shot.RESULTS['HIT']),
+            (self.team1, self.team2, 2, Shot.RESULTS['SUNK']),
+        ]
+        for attacking_team, defending_team, turn, result in shots:
+            Shot(
+                game=self.game,
+                attacking_team=attacking_team,
+                defending_team=defending_team,
+                x=turn,
+                y=turn,
+                turn=turn,
+                result=result
+            ).save()
+
+    def test_logged_in_not_playing(self):
+        self.client.login(
+            username=self.user3.username,
+            password='password'
+        )
+
+        url = reverse('game_shots', args=[self.game.id])
+        resp = self.client.get(url, {'since': 0})
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_since_turn(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_shots', args=[self.game.id])
+        resp = self.client.get(url, {'since': 1})
+
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content.decode('utf-8'))
+
+        self.assertEqual(data['turn'], 3)
+        self.assertEqual(data['next_team_id'], self.team2.id)
+        self.assertEqual(data['shots'], [
+            {
+                'turn': 1,
+                'attacking_team_id': self.team2.id,
+                'defending_team_id': self.team1.id,
+                'x': 1,
+                'y': 1,
+                'result': 'hit',
+            },
+            {
+                'turn': 2,
+                'attacking_team_id': self.team1.id,
+                'defending_team_id': self.team2.id,
+                'x': 2,
+                'y': 2,
+                'result': 'sunk',
+            },
+        ])
+        self.assertEqual(
+            [team['id'] for team in data['teams']],
+            [self.team1.id, self.team2.id]
+        )
+
+    def test_up_to_date(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_shots', args=[self.game.id])
+        # Session, user and team lookups only
+        with self.assertNumQueries(3):
+            resp = self.client.get(url, {'since': 3})
+
+        data = json.loads(resp.content.decode('utf-8'))
+        self.assertEqual(data, {'turn': 3, 'shots': []})
+
+    def test_invalid_turn(self):
+        self.client.login(
+            username=self.user1.username,
+            password='password'
+        )
+
+        url = reverse('game_shots', args=[self.game.id])
+        resp = self.client.get(url, {'since': 'never'})
+
+        self.assertEqual(resp.status_code, 404)
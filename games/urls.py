@@ -2,10 +2,41 @@ from django.conf.urls import url
 
 from games.views import AttackView
 from games.views import CreateGameView
+from games.views import GameEventsView
+from games.views import GameReplayStateView
+from games.views import GameReplayView
+from games.views import GameShotsView
+from games.views import GameStateView
 from games.views import GameView
 
 urlpatterns = [
     url(r'^(?P<game_id>.+)/attack/$', AttackView.as_view(), name='attack'),
     url(r'^create_game/$', CreateGameView.as_view(), name='create_game'),
+    # Replay URLs come first, as game ids match any text
+    url(
+        r'^(?P<game_id>.+)/replay/state/$',
+        GameReplayStateView.as_view(),
+        name='game_replay_state'
+    ),
+    url(
+        r'^(?P<game_id>.+)/replay/$',
+        GameReplayView.as_view(),
+        name='game_replay'
+    ),
+    url(
+        r'^(?P<game_id>.+)/state/$',
+        GameStateView.as_view(),
+        name='game_state'
+    ),
+    url(
+        r'^(?P<game_id>.+)/shots/$',
+        GameShotsView.as_view(),
+        name='game_shots'
+    ),
+    url(
+        r'^(?P<game_id>.+)/events/$',
+        GameEventsView.as_view(),
+        name='game_events'
+    ),
     url(r'^(?P<game_id>.+)/$', GameView.as_view(), name='game'),
 ]
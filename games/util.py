@@ -1,25 +1,65 @@
 import random
 
+from games.bitboard import occupancy_mask
+from games.bitboard import sample_placements
+from games.bitboard import ship_mask
+from games.bitboard import shots_mask
+from games.bitboard import tile_bit
 from games.models import GAME_SIZE
 from games.models import Ship
+from games.models import Shot
 
 
 def are_ships_overlapping(ship1, ship2):
     """Checks if two ships share tiles on the board."""
-    for ship1_tile in ship1.get_tiles():
-        for ship2_tile in ship2.get_tiles():
-            if ship1_tile == ship2_tile:
-                return True
-    return False
+    return bool(ship_mask(ship1) & ship_mask(ship2))
+
+
+def column_name(x):
+    """Returns the letters naming column x of a board: A to Z, then AA, AB
+    and so on."""
+    name = ''
+    x += 1
+    while x > 0:
+        x, remainder = divmod(x - 1, 26)
+        name = chr(remainder + ord('A')) + name
+    return name
+
+
+def get_next_team(teams):
+    """Returns the alive team which is due to move next, or None if no team is
+    alive."""
+    alive_teams = [team for team in teams if team.alive]
+    if not alive_teams:
+        return None
+    return min(alive_teams, key=lambda team: team.last_turn)
+
+
+def get_next_team_id(game, teams=None):
+    """Returns the id of the team due to move next in a game, from its stored
+    turn pointer if it has one or else from teams, which defaults to the
+    game's alive teams."""
+    if game.next_team_id is not None:
+        return game.next_team_id
+    if teams is None:
+        teams = game.teams.filter(alive=True)
+    next_team = get_next_team(teams)
+    return next_team.id if next_team else None
+
+
+def is_game_over(game):
+    """Checks if no more than one team in a game is left alive."""
+    if game.alive_count is not None:
+        return game.alive_count <= 1
+    return game.teams.filter(alive=True).count() <= 1
 
 
 def is_team_next(team, game):
     """Checks if it is a team's turn to move next."""
-    alive_teams = game.teams.filter(alive=True)
-    return (team == min(alive_teams, key=lambda team: team.last_turn))
+    return team.id == get_next_team_id(game)
 
 
-def is_valid_ship_position(ship):
+def is_valid_ship_position(ship, width=GAME_SIZE, height=GAME_SIZE):
     """Checks if ship is entirely contained on the board."""
     y_inc = 0
     x_inc = 0
@@ -34,46 +74,59 @@ def is_valid_ship_position(ship):
         x_inc = -1
 
     for i in range(0, ship.length):
-        if ship.x + i * x_inc < 0 or ship.x + i * x_inc >= GAME_SIZE:
+        if ship.x + i * x_inc < 0 or ship.x + i * x_inc >= width:
             return False
-        if ship.y + i * y_inc < 0 or ship.y + i * y_inc >= GAME_SIZE:
+        if ship.y + i * y_inc < 0 or ship.y + i * y_inc >= height:
             return False
 
     return True
 
 
-def make_ships(team, lengths):
+def make_ships(team, lengths, rng=random, width=GAME_SIZE, height=GAME_SIZE):
     """Generates ships of predetermined lengths and randomly arranges them to fit
-    on the board."""
+    on the board. If team is None, e.g. because it isn't saved yet, the ships
+    are left for the caller to assign to a team. Raises ValueError if the
+    ships don't fit."""
+    placements = sample_placements(lengths, rng, width, height)
     ships = []
-    for length in lengths:
-        overlapping = False
-        valid_position = False
-        x = None
-        y = None
-        direction = None
-
-        while overlapping or not valid_position:
-            x = random.randrange(0, GAME_SIZE)
-            y = random.randrange(0, GAME_SIZE)
-            direction = Ship.CARDINAL_DIRECTIONS[
-                random.choice(list(Ship.CARDINAL_DIRECTIONS.keys()))
-            ]
-
-            ship = Ship(
-                team=team,
-                x=x,
-                y=y,
-                length=length,
-                direction=direction
-            )
-
-            valid_position = is_valid_ship_position(ship)
-            overlapping = False
-            for existing_ship in ships:
-                overlapping = \
-                    overlapping or are_ships_overlapping(ship, existing_ship)
-
+    for length, placement in zip(lengths, placements):
+        ship = Ship(
+            x=placement.x,
+            y=placement.y,
+            length=length,
+            direction=placement.direction
+        )
+        if team is not None:
+            ship.team = team
         ships.append(ship)
-
     return ships
+
+
+def place_ships(team, ships, width=GAME_SIZE, height=GAME_SIZE):
+    """Records the tiles occupied by a team's ships in its packed board
+    state. The team is not saved."""
+    team.occupancy_mask = occupancy_mask(ships, width, height)
+    team.hits_remaining = bin(team.occupancy_mask & ~team.hit_mask).count('1')
+
+
+def rebuild_board(team, ships=None, shots=None, width=GAME_SIZE,
+                  height=GAME_SIZE):
+    """Recomputes a team's packed board state from its Ship and Shot rows.
+    The team is not saved."""
+    if ships is None:
+        ships = team.ships.all()
+    if shots is None:
+        shots = Shot.objects.filter(defending_team=team)
+    team.hit_mask = shots_mask(shots, width, height)
+    place_ships(team, ships, width, height)
+
+
+def record_shot(team, x, y, width=GAME_SIZE):
+    """Records a shot at (x, y) in a team's packed board state and returns
+    whether it hit one of the team's ships. The team is not saved."""
+    bit = tile_bit(x, y, width)
+    is_hit = bool(team.occupancy_mask & bit)
+    if is_hit and not team.hit_mask & bit:
+        team.hits_remaining -= 1
+    team.hit_mask |= bit
+    return is_hit
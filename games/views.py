@@ -1,22 +1,64 @@
+import json
+import time
+
+from django.conf import settings
 from django.contrib import messages
-from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
+from django.db import IntegrityError
+from django.db import OperationalError
+from django.db import connection
+from django.db import transaction
 from django.http import Http404
+from django.http import HttpResponseNotModified
 from django.http import HttpResponseRedirect
+from django.http import JsonResponse
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
+from django.utils.http import parse_etags
+from django.utils.http import quote_etag
 from django.views.generic import View
 
+from games.boards import GameBoards
+from games.bots import play_bots
+from games.engine import DuplicateShot
+from games.events import get_hub
+from games.events import publish_attack
 from games.forms import AttackForm
 from games.forms import CreateGameForm
+from games.heatmap import get_heatmaps
+from games.history import creation_events
+from games.history import record_attacks
+from games.history import replay_boards
 from games.models import Game
+from games.models import GameEvent
 from games.models import MAX_PLAYERS
 from games.models import Ship
 from games.models import Shot
 from games.models import Team
+from games.persistence import StoredGame
+from games.persistence import is_lock_error
+from games.persistence import lock_game
+from games.presentation import GameStatePresenter
+from games.presentation import ShotPresenter
 from games.presentation import TeamPresenter
+from games.presentation import TeamSummaryPresenter
+from games.util import get_next_team_id
+from games.util import is_game_over
 from games.util import is_team_next
 from games.util import make_ships
+from games.util import place_ships
 from players.models import Player
+from players.util import record_games_started
+from players.util import record_loss
+from players.util import record_win
+
+# Seconds between heartbeats on an idle event stream, and milliseconds
+# clients wait before reconnecting once a stream ends.
+EVENT_STREAM_HEARTBEAT = 15
+EVENT_STREAM_RETRY = 1000
+# Shown when an attack gives up waiting for another request's lock on its
+# game
+GAME_BUSY_MESSAGE = 'The game is busy, please try again.'
 
 
 class GameView(View):
@@ -31,40 +73,296 @@ class GameView(View):
 
         if request.user.is_authenticated():
             player = Player.objects.get(user=request.user)
-            teams = game.teams.all()
+            boards = GameBoards.load(game)
+            teams = boards.teams
 
             player_team = None
             for team in teams:
-                if team.player == player:
+                if team.player_id == player.id:
                     player_team = team
             if player_team is None:
                 raise Http404("Player is not authorised.")
 
+            other_teams = []
+            for team in teams:
+                if team is not player_team and team.alive:
+                    other_teams.append(team)
+
+            # Large games only show the boards of the player and their
+            # target, so the page doesn't grow with the number of teams
+            board_teams = teams
+            summary_teams = []
+            target_team = None
+            if len(teams) > MAX_PLAYERS:
+                target_team = self.get_target_team(
+                    request,
+                    teams,
+                    player_team
+                )
+                board_teams = [
+                    team
+                    for team in teams
+                    if team is player_team or team is target_team
+                ]
+                summary_teams = [
+                    team
+                    for team in teams
+                    if team not in board_teams
+                ]
+
+            # Opponents' boards may be shaded by how likely each tile is to
+            # hold a ship. Sparse boards are listed rather than drawn, so
+            # can't be.
+            can_show_heatmap = not game.is_sparse()
+            show_heatmap = can_show_heatmap and \
+                request.GET.get('heatmap') == '1'
+            heatmaps = {}
+            if show_heatmap:
+                heatmaps = get_heatmaps(game, [
+                    team
+                    for team in board_teams
+                    if team is not player_team and team.alive
+                ])
+
             team_presenters = [
                 TeamPresenter.from_team(
                     team,
-                    game
+                    game,
+                    boards,
+                    heatmaps.get(team.id)
                 )
-                for team in teams
+                for team in board_teams
             ]
-            is_player_next = is_team_next(player_team, game)
-
-            other_teams = []
-            for team in teams:
-                if team is not player_team and team.alive:
-                    other_teams.append(team)
+            player_team_presenter = team_presenters[
+                board_teams.index(player_team)
+            ]
+            is_player_next = boards.is_next(player_team)
 
             context = {
                 'game_id': game_id,
-                'player_team': TeamPresenter.from_team(player_team, game),
+                'player_team': player_team_presenter,
                 'teams': team_presenters,
-                'attack_form': AttackForm(other_teams=other_teams),
-                'is_player_next': is_player_next
+                'team_summaries': [
+                    TeamSummaryPresenter.from_team(team, boards)
+                    for team in summary_teams
+                ],
+                'attack_form': AttackForm(
+                    other_teams=other_teams,
+                    width=game.width,
+                    height=game.height,
+                    initial={
+                        'target_team': target_team.id if target_team else None
+                    }
+                ),
+                'is_player_next': is_player_next,
+                'turn': game.turn,
+                'target_team_id': target_team.id if target_team else None,
+                'can_show_heatmap': can_show_heatmap,
+                'show_heatmap': show_heatmap,
             }
             return render(request, self.template_name, context)
         else:
             raise Http404("Player is not logged in.")
 
+    def get_target_team(self, request, teams, player_team):
+        """Returns the team chosen with the target query parameter, or else
+        the first alive team after the player's own."""
+        try:
+            target_id = int(request.GET.get('target', ''))
+        except ValueError:
+            target_id = None
+        for team in teams:
+            if team.id == target_id and team is not player_team:
+                return team
+
+        index = teams.index(player_team)
+        for team in teams[index + 1:] + teams[:index]:
+            if team.alive:
+                return team
+        return None
+
+
+def get_viewer_team(request, game_id):
+    """Returns the logged in player's team in a game, with the game itself
+    loaded in the same query. Raises Http404 if there is no such team."""
+    if not request.user.is_authenticated():
+        raise Http404("Player is not logged in.")
+
+    player_team = Team.objects.select_related('game').filter(
+        game_id=game_id,
+        player__user=request.user
+    ).first()
+    if player_team is None:
+        raise Http404("Game does not exist.")
+    return player_team
+
+
+class GameStateView(View):
+    """Read-only JSON state of a game for polling clients. Responses carry an
+    ETag derived from the game's turn, so a client whose state is current is
+    answered with a 304 without any boards being loaded."""
+
+    def get(self, request, game_id, *args, **kwargs):
+        player_team = get_viewer_team(request, game_id)
+        game = player_team.game
+
+        # Boards only change when a shot advances the turn. The viewer is
+        # part of the tag because each team sees a different view.
+        etag = '{}-{}-{}'.format(game.id, game.turn, request.user.id)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match and etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+        else:
+            boards = GameBoards.load(game)
+            state = GameStatePresenter.from_boards(boards, player_team)
+            response = JsonResponse(state.to_dict())
+
+        response['ETag'] = quote_etag(etag)
+        response['Cache-Control'] = 'private, no-cache'
+        return response
+
+
+def get_replay_turn(request, game):
+    """Returns the turn chosen with the turn query parameter, defaulting to
+    the game's current turn. Raises Http404 if it isn't a turn of the
+    game."""
+    try:
+        turn = int(request.GET.get('turn', game.turn))
+    except ValueError:
+        raise Http404("Invalid turn.")
+    if not 0 <= turn <= game.turn:
+        raise Http404("Invalid turn.")
+    return turn
+
+
+class GameReplayView(View):
+    """Every team's board at the start of any turn of a game, rebuilt from
+    the game's log."""
+
+    template_name = 'games/replay.html'
+
+    def get(self, request, game_id, *args, **kwargs):
+        player_team = get_viewer_team(request, game_id)
+        game = player_team.game
+        turn = get_replay_turn(request, game)
+
+        boards = replay_boards(game, turn)
+        if boards is None:
+            raise Http404("Game has no history.")
+
+        context = {
+            'game_id': game.id,
+            'teams': [
+                TeamPresenter.from_team(team, boards.game, boards)
+                for team in boards.teams
+            ],
+            'turn': turn,
+            'last_turn': game.turn,
+        }
+        return render(request, self.template_name, context)
+
+
+class GameReplayStateView(View):
+    """JSON state of a game at the start of any turn, as seen by one of its
+    teams, rebuilt from the game's log."""
+
+    def get(self, request, game_id, *args, **kwargs):
+        player_team = get_viewer_team(request, game_id)
+        game = player_team.game
+        turn = get_replay_turn(request, game)
+
+        boards = replay_boards(game, turn)
+        if boards is None:
+            raise Http404("Game has no history.")
+
+        state = GameStatePresenter.from_boards(boards, player_team).to_dict()
+        state['last_turn'] = game.turn
+        return JsonResponse(state)
+
+
+class GameShotsView(View):
+    """Shots fired since a given turn, so polling clients can patch their
+    boards in place. The work done is proportional to the number of new shots,
+    not to the size of the boards."""
+
+    def get(self, request, game_id, *args, **kwargs):
+        player_team = get_viewer_team(request, game_id)
+        game = player_team.game
+
+        try:
+            since = int(request.GET.get('since', 0))
+        except ValueError:
+            raise Http404("Invalid turn.")
+
+        data = {
+            'turn': game.turn,
+            'shots': [],
+        }
+        if since < game.turn:
+            shots = Shot.objects.filter(
+                game=game,
+                turn__gte=since
+            ).order_by('turn')
+            teams = list(game.teams.order_by('id'))
+
+            data['shots'] = [
+                ShotPresenter.from_shot(shot)._asdict()
+                for shot in shots
+            ]
+            data['teams'] = [
+                {'id': team.id, 'alive': team.alive, 'winner': team.winner}
+                for team in teams
+            ]
+            data['next_team_id'] = get_next_team_id(game, teams)
+
+        return JsonResponse(data)
+
+
+def stream_events(subscription):
+    """Yields events from a hub subscription as Server-Sent Events until the
+    stream times out, sending a comment line as a heartbeat while idle."""
+    timeout = getattr(settings, 'GAMES_EVENT_STREAM_TIMEOUT', 60)
+    deadline = time.time() + timeout
+    try:
+        yield 'retry: {}\n\n'.format(EVENT_STREAM_RETRY)
+        while True:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                break
+            event = subscription.get(
+                timeout=min(EVENT_STREAM_HEARTBEAT, remaining)
+            )
+            if event is None:
+                yield ': heartbeat\n\n'
+            else:
+                yield 'event: {}\ndata: {}\n\n'.format(
+                    event['type'],
+                    json.dumps(event['data'])
+                )
+    finally:
+        subscription.close()
+
+
+class GameEventsView(View):
+    """Server-Sent Events stream of shots, turns, defeats and winners in a
+    game, pushed as AttackView commits them."""
+
+    def get(self, request, game_id, *args, **kwargs):
+        player_team = get_viewer_team(request, game_id)
+        subscription = get_hub().subscribe(player_team.game_id)
+
+        # Waiting for events needs no database access, so don't hold a
+        # connection open for the lifetime of the stream.
+        if not connection.in_atomic_block:
+            connection.close()
+
+        response = StreamingHttpResponse(
+            stream_events(subscription),
+            content_type='text/event-stream'
+        )
+        response['Cache-Control'] = 'no-cache'
+        return response
+
 
 class CreateGameView(View):
 
@@ -81,23 +379,24 @@ class CreateGameView(View):
         if request.user.is_authenticated():
             form = CreateGameForm(request.POST, max_players=MAX_PLAYERS)
             if form.is_valid():
-                opponent_usernames = []
-                for i in range(0, MAX_PLAYERS):
-                    field_name = 'opponent_username_{}'.format(i)
-                    opponent_usernames.append(
-                        form.cleaned_data[field_name]
+                opponent_usernames = form.get_opponent_usernames()
+
+                # Look up the creator and every opponent at once, by
+                # username alone so the lookup can use its index
+                players_by_username = {
+                    player.user.username: player
+                    for player in Player.objects.select_related(
+                        'user'
+                    ).filter(
+                        user__username__in=[
+                            request.user.username
+                        ] + opponent_usernames
                     )
-
-                try:
-                    opponent_users = []
-                    for opponent_username in opponent_usernames:
-                        if len(opponent_username) > 0:
-                            opponent_users.append(
-                                User.objects.get(
-                                    username=opponent_username
-                                )
-                            )
-                except User.DoesNotExist:
+                }
+                if any(
+                    opponent_username not in players_by_username
+                    for opponent_username in opponent_usernames
+                ):
                     error_message = 'User does not exist! '\
                         'Are you sure the username is correct?'
                     messages.error(
@@ -109,39 +408,70 @@ class CreateGameView(View):
                     }
                     return render(request, self.template_name, context)
 
-                user_player = Player.objects.get(user=request.user)
-                opponent_players = [
-                    Player.objects.get(
-                        user=opponent_user
-                    )
-                    for opponent_user in opponent_users
+                players = [players_by_username[request.user.username]] + [
+                    players_by_username[opponent_username]
+                    for opponent_username in opponent_usernames
                 ]
 
-                # Create a game plus teams and ships for both players
-                # Creation in Game -> Team -> Ships order is important
-                # to satisfy ForeignKey dependencies.
-                game = Game()
-                game.save()
-                user_team = Team(player=user_player, game=game, last_turn=-2)
-                opponent_teams = [
-                    Team(
-                        player=opponent_player,
-                        game=game,
-                        last_turn=-1
+                game = Game(
+                    width=form.cleaned_data['width'],
+                    height=form.cleaned_data['height'],
+                    fleet=form.cleaned_data['fleet'],
+                    alive_count=len(players)
+                )
+                try:
+                    fleets = [
+                        make_ships(
+                            None,
+                            game.get_fleet(),
+                            width=game.width,
+                            height=game.height
+                        )
+                        for player in players
+                    ]
+                except ValueError:
+                    messages.error(
+                        request,
+                        'Those ships don\'t fit on a board that size!'
+                    )
+                    context = {
+                        'form': form
+                    }
+                    return render(request, self.template_name, context)
+
+                # Create a game plus teams and ships for every player, with
+                # one insert per table. The creator moves first.
+                with transaction.atomic():
+                    game.save()
+
+                    new_teams = []
+                    for i, (player, ships) in enumerate(zip(players, fleets)):
+                        team = Team(
+                            player=player,
+                            game=game,
+                            last_turn=-2 if i == 0 else -1
+                        )
+                        place_ships(team, ships, game.width, game.height)
+                        new_teams.append(team)
+                    Team.objects.bulk_create(new_teams)
+
+                    # bulk_create doesn't set primary keys on every database,
+                    # so read the teams back in the order they were created
+                    teams = list(game.teams.order_by('id'))
+                    for team, ships in zip(teams, fleets):
+                        for ship in ships:
+                            ship.team = team
+                    Ship.objects.bulk_create(
+                        [ship for ships in fleets for ship in ships]
+                    )
+                    GameEvent.objects.bulk_create(
+                        creation_events(game, teams, fleets)
                     )
-                    for opponent_player in opponent_players
-                ]
-                user_team.save()
-                for opponent_team in opponent_teams:
-                    opponent_team.save()
-
-                user_ships = make_ships(user_team, Ship.LENGTHS)
-                for opponent_team in opponent_teams:
-                    opponent_ships = make_ships(opponent_team, Ship.LENGTHS)
-                    for user_ship in user_ships:
-                        user_ship.save()
-                    for opponent_ship in opponent_ships:
-                        opponent_ship.save()
+
+                    game.next_team = teams[0]
+                    game.save(update_fields=['next_team'])
+
+                    record_games_started(teams)
 
                 return HttpResponseRedirect(reverse('game', args=[game.id]))
             else:
@@ -159,110 +489,129 @@ class AttackView(View):
     def post(self, request, game_id, *args, **kwargs):
         if request.user.is_authenticated():
             try:
-                game = Game.objects.get(pk=game_id)
-            except Game.DoesNotExist:
-                raise Http404("Game does not exist.")
-
-            player = Player.objects.get(user=request.user)
-
-            # Verify the player is involved in this game
-            teams = game.teams.all()
-            player_team = None
-            for team in teams:
-                if team.player == player:
-                    player_team = team
-            if player_team is None:
-                raise Http404("Player is not authorised.")
-
-            # Verify it is the player's turn to attack
-            is_next = is_team_next(player_team, game)
-            if not is_next:
-                messages.error(request, 'It\'s not your turn!')
+                with transaction.atomic():
+                    response, attacks = self.attack(request, game_id)
+            except OperationalError as e:
+                # e.g. SQLite giving up waiting for another attack's lock
+                if not is_lock_error(e):
+                    raise
+                messages.error(request, GAME_BUSY_MESSAGE)
                 return HttpResponseRedirect(reverse('game', args=[game_id]))
 
-            other_teams = []
-            for team in teams:
-                if team is not player_team and team.alive:
-                    other_teams.append(team)
-
-            attack_form = AttackForm(request.POST, other_teams=other_teams)
-            if attack_form.is_valid():
-                target_x = attack_form.cleaned_data['target_x']
-                target_y = attack_form.cleaned_data['target_y']
-                target_team = attack_form.cleaned_data['target_team']
-
-                other_team = Team.objects.get(pk=target_team)
-
-                # Verify shot hasn't already been attempted
-                past_shots = Shot.objects.filter(
-                    game=game,
-                    attacking_team=player_team,
-                    defending_team=other_team,
-                    x=target_x,
-                    y=target_y
-                )
+            # Only tell other players about the attacks once they're
+            # committed
+            for attack in attacks:
+                publish_attack(**attack)
+            return response
+        else:
+            messages.warning(request, 'You must be logged in to do that.')
+            return HttpResponseRedirect('/login')
 
-                if len(past_shots) > 0:
-                    messages.error(request, 'You\'ve already shot there!')
-                    return HttpResponseRedirect(
-                        reverse('game', args=[game_id])
-                    )
+    def attack(self, request, game_id):
+        """Makes the attack in the POSTed form, followed by the moves of any
+        bots due to move after it. Returns the response, plus the arguments
+        to publish_attack for each shot fired."""
+        game_url = reverse('game', args=[game_id])
 
-                shot = Shot(
-                    game=game,
-                    attacking_team=player_team,
-                    defending_team=other_team,
-                    x=target_x,
-                    y=target_y
-                )
+        # Lock the game so that attacks on the same game are made one at a
+        # time, each seeing the teams as the previous one left them
+        try:
+            game = lock_game(game_id)
+        except Game.DoesNotExist:
+            raise Http404("Game does not exist.")
+
+        stored_game = StoredGame.load(game)
+        engine = stored_game.engine
+
+        # Verify the player is involved in this game
+        player_team = None
+        for team in stored_game.teams:
+            if team.player.user_id == request.user.id:
+                player_team = team
+        if player_team is None:
+            raise Http404("Player is not authorised.")
+
+        if is_game_over(game):
+            messages.error(request, 'This game is over!')
+            return HttpResponseRedirect(game_url), []
+
+        # Verify it is the player's turn to attack
+        if not is_team_next(player_team, game):
+            messages.error(request, 'It\'s not your turn!')
+            return HttpResponseRedirect(game_url), []
+
+        other_teams = []
+        for team in stored_game.teams:
+            if team is not player_team and team.alive:
+                other_teams.append(team)
+
+        attack_form = AttackForm(
+            request.POST,
+            other_teams=other_teams,
+            width=game.width,
+            height=game.height
+        )
+        if not attack_form.is_valid():
+            return HttpResponseRedirect('/'), []
+
+        hit_x = int(attack_form.cleaned_data['target_x'])
+        hit_y = int(attack_form.cleaned_data['target_y'])
+        other_team = stored_game.team(
+            int(attack_form.cleaned_data['target_team'])
+        )
+
+        shot = Shot(
+            game=game,
+            attacking_team=player_team,
+            defending_team=other_team,
+            x=hit_x,
+            y=hit_y,
+            turn=game.turn
+        )
+        try:
+            shot.result = engine.fire(other_team.id, hit_x, hit_y)
+            # The unique constraint on shots also catches tiles missing from
+            # a board's hit mask, such as in games not yet rebuilt
+            with transaction.atomic():
                 shot.save()
-
-                player_team.last_turn = game.turn
-                player_team.save()
-
-                game.turn = game.turn + 1
-                game.save()
-
-                # Check for hit
-                ship_tiles = set()
-                for ship in other_team.ships.all():
-                    ship_tiles.update(set(ship.get_tiles()))
-                other_team_hit = (int(target_x), int(target_y)) in ship_tiles
-
-                # Check for death
-                past_shot_tiles = set([
-                    (past_shot.x, past_shot.y)
-                    for past_shot in Shot.objects.filter(
-                        game=game,
-                        defending_team=other_team
+        except (DuplicateShot, IntegrityError):
+            messages.error(request, 'You\'ve already shot there!')
+            return HttpResponseRedirect(game_url), []
+
+        stored_game.save()
+
+        if len(stored_game.teams) > MAX_PLAYERS:
+            game_url = '{}?target={}'.format(game_url, other_team.id)
+
+        other_team_defeated = not other_team.alive
+        if other_team_defeated:
+            record_loss(other_team)
+
+        winner = stored_game.team(engine.winner())
+        if winner is not None:
+            record_win(winner)
+
+        if shot.result != Shot.RESULTS['MISS']:
+            messages.success(request, 'Hit!')
+            if shot.result == Shot.RESULTS['SUNK']:
+                messages.success(request, 'You sank a ship!')
+            if other_team_defeated:
+                messages.success(
+                    request,
+                    'You defeated {name}!'.format(
+                        name=other_team.player.user.username
                     )
-                ])
-                hit_tiles = past_shot_tiles.intersection(ship_tiles)
-                if len(hit_tiles) == len(ship_tiles):
-                    other_team.alive = False
-                    other_team.save()
-                other_team_defeated = not other_team.alive
-
-                # Check for winner
-                alive_teams = game.teams.filter(alive=True)
-                if len(alive_teams) == 1:
-                    alive_teams[0].winner = True
-                    alive_teams[0].save()
-
-                if other_team_hit:
-                    messages.success(request, 'Hit!')
-                    if other_team_defeated:
-                        messages.success(
-                            request,
-                            'You defeated {name}!'.format(
-                                name=other_team.player.user.username
-                            )
-                        )
-                else:
-                    messages.warning(request, 'Miss!')
-                return HttpResponseRedirect(reverse('game', args=[game_id]))
-            else:
-                return HttpResponseRedirect('/')
+                )
         else:
-            messages.warning(request, 'You must be logged in to do that.')
-            return HttpResponseRedirect('/login')
+            messages.warning(request, 'Miss!')
+
+        attacks = [{
+            'game': game,
+            'shot': shot,
+            'defending_team': other_team,
+            'next_team': stored_game.team(engine.next_team()),
+            'winner': winner,
+        }]
+        attacks.extend(play_bots(stored_game))
+        record_attacks(stored_game, attacks, shot.turn)
+        return HttpResponseRedirect(game_url), attacks
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
 from players.models import Player
+from players.models import PlayerStats
 
 admin.site.register(Player)
+admin.site.register(PlayerStats)
@@ -0,0 +1,20 @@
+from django.conf.urls import url
+
+from players.views import LeaderboardJsonView
+from players.views import LeaderboardView
+
+
+# Included at the top level rather than under /players/, where the
+# leaderboard would hide the profile of a player named "leaderboard"
+urlpatterns = [
+    url(
+        r'^leaderboard/$',
+        LeaderboardView.as_view(),
+        name='leaderboard'
+    ),
+    url(
+        r'^leaderboard\.json$',
+        LeaderboardJsonView.as_view(),
+        name='leaderboard_json'
+    ),
+]
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from players.models import Player
+from players.models import PlayerStats
+from players.util import compute_stats
+
+
+class Command(BaseCommand):
+    help = 'Recomputes the PlayerStats of every player from the Team table.'
+
+    def handle(self, *args, **options):
+        counts = compute_stats()
+
+        with transaction.atomic():
+            existing_ids = set(
+                PlayerStats.objects.values_list('player_id', flat=True)
+            )
+            new_stats = []
+            for player_id in Player.objects.values_list('id', flat=True):
+                win_count, loss_count, in_progress_count = counts.get(
+                    player_id,
+                    (0, 0, 0)
+                )
+                stats = PlayerStats(
+                    player_id=player_id,
+                    win_count=win_count,
+                    loss_count=loss_count,
+                    in_progress_count=in_progress_count
+                )
+                stats.update_ranking()
+                if player_id in existing_ids:
+                    stats.save(force_update=True)
+                else:
+                    new_stats.append(stats)
+            PlayerStats.objects.bulk_create(new_stats)
+
+        self.stdout.write('Backfilled stats for {} players.'.format(
+            len(existing_ids) + len(new_stats)
+        ))
@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import transaction
+
+from players.models import Player
+from players.models import PlayerStats
+
+
+class Command(BaseCommand):
+    help = 'Creates a computer player which can be invited to games by '\
+        'username like any other player.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Username of the new bot.')
+
+    def handle(self, *args, **options):
+        username = options['username']
+        if User.objects.filter(username=username).exists():
+            raise CommandError('User {} already exists.'.format(username))
+
+        with transaction.atomic():
+            # Bots never log in
+            user = User.objects.create_user(username)
+            player = Player(user=user, is_bot=True)
+            player.save()
+            PlayerStats(player=player).save()
+
+        self.stdout.write('Created bot {}.'.format(username))
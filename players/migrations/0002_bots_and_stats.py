@@ -0,0 +1,42 @@
+from django.db import migrations
+from django.db import models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('players', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayerStats',
+            fields=[
+                (
+                    'player',
+                    models.OneToOneField(
+                        primary_key=True,
+                        serialize=False,
+                        related_name='stats',
+                        to='players.Player'
+                    )
+                ),
+                ('win_count', models.IntegerField(default=0)),
+                ('loss_count', models.IntegerField(default=0)),
+                ('in_progress_count', models.IntegerField(default=0)),
+                ('games_played', models.IntegerField(default=0)),
+                ('win_rate', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='player',
+            name='is_bot',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AlterIndexTogether(
+            name='playerstats',
+            index_together=set(
+                [('win_count', 'win_rate', 'games_played', 'player')]
+            ),
+        ),
+    ]
@@ -4,8 +4,49 @@ from django.db import models
 
 class Player(models.Model):
     user = models.OneToOneField(User)
+    # Bots take their turns automatically once the previous team has moved
+    is_bot = models.BooleanField(default=False)
 
     def __str__(self):
         return '{username}'.format(
             username=self.user.username
         )
+
+
+class PlayerStats(models.Model):
+    """Win, loss and in-progress game counts for a Player, kept up to date as
+    games are created and finished."""
+    player = models.OneToOneField(
+        Player,
+        primary_key=True,
+        related_name='stats'
+    )
+
+    win_count = models.IntegerField(default=0)
+    loss_count = models.IntegerField(default=0)
+    in_progress_count = models.IntegerField(default=0)
+
+    # Leaderboard ranking, derived from the counters above
+    games_played = models.IntegerField(default=0)
+    win_rate = models.IntegerField(default=0)  # Wins per 1000 games played
+
+    class Meta:
+        index_together = [
+            ('win_count', 'win_rate', 'games_played', 'player'),
+        ]
+
+    def update_ranking(self):
+        """Recomputes the ranking fields from the win and loss counters."""
+        self.games_played = self.win_count + self.loss_count
+        if self.games_played > 0:
+            self.win_rate = self.win_count * 1000 // self.games_played
+        else:
+            self.win_rate = 0
+
+    def __str__(self):
+        return '{username} ({wins}W {losses}L {in_progress}P)'.format(
+            username=self.player.user.username,
+            wins=self.win_count,
+            losses=self.loss_count,
+            in_progress=self.in_progress_count
+        )
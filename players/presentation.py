@@ -1,6 +1,11 @@
 from collections import namedtuple
 
-from games.models import Team
+from django.db.models import Q
+
+from players.models import PlayerStats
+from players.util import get_stats
+
+LEADERBOARD_PAGE_SIZE = 50
 
 
 class PlayerPresenter(namedtuple(
@@ -10,23 +15,107 @@ class PlayerPresenter(namedtuple(
 
     @classmethod
     def from_player(cls, player):
-        winning_teams = Team.objects.filter(
-            player=player,
-            winner=True
+        stats = get_stats(player)
+
+        return cls(
+            username=player.user.username,
+            win_count=stats.win_count,
+            loss_count=stats.loss_count,
+            in_progress_count=stats.in_progress_count,
         )
-        losing_teams = Team.objects.filter(
-            player=player,
-            alive=False
+
+
+class LeaderboardEntryPresenter(namedtuple(
+    'LeaderboardEntryPresenter',
+    ['rank', 'username', 'win_count', 'loss_count', 'games_played',
+     'win_percentage']
+)):
+
+    @classmethod
+    def from_stats(cls, stats, rank):
+        return cls(
+            rank=rank,
+            username=stats.player.user.username,
+            win_count=stats.win_count,
+            loss_count=stats.loss_count,
+            games_played=stats.games_played,
+            win_percentage=stats.win_rate / 10.0
         )
-        in_progress_teams = Team.objects.filter(
-            player=player,
-            winner=False,
-            alive=True
+
+
+class LeaderboardPresenter(namedtuple(
+    'LeaderboardPresenter',
+    ['entries', 'next_cursor']
+)):
+    """A page of players ranked by wins, then win rate, then games played.
+    Pages are keyset paginated on the ranking of the last entry shown, so
+    every page costs a single index range scan."""
+
+    @staticmethod
+    def make_cursor(rank, stats):
+        return '{}.{}.{}.{}.{}'.format(
+            rank,
+            stats.win_count,
+            stats.win_rate,
+            stats.games_played,
+            stats.player_id
         )
 
-        return cls(
-            username=player.user.username,
-            win_count=len(winning_teams),
-            loss_count=len(losing_teams),
-            in_progress_count=len(in_progress_teams),
+    @staticmethod
+    def parse_cursor(cursor):
+        """Returns the (rank, win_count, win_rate, games_played, player_id)
+        stored in a cursor, raising ValueError if it is malformed."""
+        values = tuple(int(value) for value in cursor.split('.'))
+        if len(values) != 5:
+            raise ValueError('Invalid leaderboard cursor: {}'.format(cursor))
+        return values
+
+    @classmethod
+    def from_cursor(cls, cursor=None, page_size=LEADERBOARD_PAGE_SIZE):
+        ranked_stats = PlayerStats.objects.filter(
+            games_played__gt=0
+        ).select_related('player__user').order_by(
+            '-win_count',
+            '-win_rate',
+            '-games_played',
+            '-player_id'
         )
+
+        rank = 0
+        if cursor:
+            rank, win_count, win_rate, games_played, player_id = \
+                cls.parse_cursor(cursor)
+            # Everything ranked strictly below the cursor. The leading
+            # win_count bound lets the database seek straight to it.
+            ranked_stats = ranked_stats.filter(
+                Q(win_count__lt=win_count) |
+                Q(win_count=win_count, win_rate__lt=win_rate) |
+                Q(
+                    win_count=win_count,
+                    win_rate=win_rate,
+                    games_played__lt=games_played
+                ) |
+                Q(
+                    win_count=win_count,
+                    win_rate=win_rate,
+                    games_played=games_played,
+                    player_id__lt=player_id
+                ),
+                win_count__lte=win_count
+            )
+
+        # Fetch one extra row to find out whether there is a next page
+        page = list(ranked_stats[:page_size + 1])
+        entries = [
+            LeaderboardEntryPresenter.from_stats(stats, rank + i + 1)
+            for i, stats in enumerate(page[:page_size])
+        ]
+
+        next_cursor = None
+        if len(page) > page_size:
+            next_cursor = cls.make_cursor(
+                rank + page_size,
+                page[page_size - 1]
+            )
+
+        return cls(entries=entries, next_cursor=next_cursor)
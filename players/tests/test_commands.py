@@ -0,0 +1,74 @@
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils.six import StringIO
+
+from games.models import Game
+from games.models import Team
+from players.models import Player
+from players.models import PlayerStats
+
+
+class BackfillPlayerStatsTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+        self.user3 = User.objects.create_user('user3', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player3 = Player(user=self.user3)
+        self.player1.save()
+        self.player2.save()
+        self.player3.save()
+
+        self.game = Game()
+        self.game.save()
+
+        Team(player=self.player1, game=self.game, winner=True).save()
+        Team(player=self.player2, game=self.game, alive=False).save()
+
+        # Stale stats are overwritten
+        PlayerStats(player=self.player1, in_progress_count=3).save()
+
+    def test_backfill(self):
+        out = StringIO()
+        call_command('backfill_player_stats', stdout=out)
+
+        self.assertIn('Backfilled stats for 3 players', out.getvalue())
+
+        stats = {
+            stats.player_id: (
+                stats.win_count,
+                stats.loss_count,
+                stats.in_progress_count
+            )
+            for stats in PlayerStats.objects.all()
+        }
+        self.assertEqual(stats, {
+            self.player1.id: (1, 0, 0),
+            self.player2.id: (0, 1, 0),
+            self.player3.id: (0, 0, 0),
+        })
+
+
+class CreateBotTestCase(TestCase):
+
+    def test_create_bot(self):
+        out = StringIO()
+        call_command('create_bot', 'bot', stdout=out)
+
+        self.assertIn('Created bot bot', out.getvalue())
+        player = Player.objects.get(user__username='bot')
+        self.assertTrue(player.is_bot)
+        self.assertFalse(player.user.has_usable_password())
+        # Bots have stats like any other player, so they're ranked
+        self.assertTrue(PlayerStats.objects.filter(player=player).exists())
+
+    def test_create_bot_existing_user(self):
+        User.objects.create_user('bot', '', 'password')
+
+        with self.assertRaises(CommandError):
+            call_command('create_bot', 'bot', stdout=StringIO())
@@ -4,6 +4,8 @@ from django.test import TestCase
 from games.models import Game
 from games.models import Team
 from players.models import Player
+from players.models import PlayerStats
+from players.presentation import LeaderboardPresenter
 from players.presentation import PlayerPresenter
 
 
@@ -50,3 +52,71 @@ class PlayerPresenterTestCase(TestCase):
         self.assertEqual(presenter.win_count, 1)
         self.assertEqual(presenter.loss_count, 1)
         self.assertEqual(presenter.in_progress_count, 1)
+
+
+class LeaderboardPresenterTestCase(TestCase):
+
+    def setUp(self):
+        # (username, wins, losses)
+        records = [
+            ('user1', 3, 1),
+            ('user2', 3, 0),
+            ('user3', 1, 1),
+            ('user4', 1, 1),
+            ('user5', 0, 4),
+            ('user6', 0, 0),
+        ]
+        for username, win_count, loss_count in records:
+            user = User.objects.create_user(username, '', 'password')
+            player = Player(user=user)
+            player.save()
+            stats = PlayerStats(
+                player=player,
+                win_count=win_count,
+                loss_count=loss_count
+            )
+            stats.update_ranking()
+            stats.save()
+
+    def test_from_cursor(self):
+        leaderboard = LeaderboardPresenter.from_cursor()
+
+        self.assertEqual(
+            [entry.username for entry in leaderboard.entries],
+            ['user2', 'user1', 'user4', 'user3', 'user5']
+        )
+        self.assertEqual(
+            [entry.rank for entry in leaderboard.entries],
+            [1, 2, 3, 4, 5]
+        )
+        self.assertEqual(leaderboard.entries[0].win_percentage, 100.0)
+        self.assertEqual(leaderboard.entries[1].win_percentage, 75.0)
+        self.assertIsNone(leaderboard.next_cursor)
+
+    def test_from_cursor_paginated(self):
+        usernames = []
+        ranks = []
+        cursor = None
+        while True:
+            with self.assertNumQueries(1):
+                leaderboard = LeaderboardPresenter.from_cursor(
+                    cursor,
+                    page_size=2
+                )
+            usernames += [entry.username for entry in leaderboard.entries]
+            ranks += [entry.rank for entry in leaderboard.entries]
+            cursor = leaderboard.next_cursor
+            if cursor is None:
+                break
+
+        self.assertEqual(
+            usernames,
+            ['user2', 'user1', 'user4', 'user3', 'user5']
+        )
+        self.assertEqual(ranks, [1, 2, 3, 4, 5])
+
+    def test_invalid_cursor(self):
+        with self.assertRaises(ValueError):
+            LeaderboardPresenter.from_cursor('1.2.3')
+        with self.assertRaises(ValueError):
+            LeaderboardPresenter.from_cursor('a.b.c.d.e')
@@ -0,0 +1,91 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from games.models import Game
+from games.models import Team
+from players.models import Player
+from players.models import PlayerStats
+from players.util import compute_stats
+from players.util import get_stats
+from players.util import record_games_started
+from players.util import record_loss
+from players.util import record_win
+
+
+class PlayerStatsTestCase(TestCase):
+
+    def setUp(self):
+        self.user1 = User.objects.create_user('user1', '', 'password')
+        self.user2 = User.objects.create_user('user2', '', 'password')
+
+        self.player1 = Player(user=self.user1)
+        self.player2 = Player(user=self.user2)
+        self.player1.save()
+        self.player2.save()
+
+        self.game = Game()
+        self.game.save()
+
+        self.team1 = Team(player=self.player1, game=self.game)
+        self.team2 = Team(player=self.player2, game=self.game, alive=False)
+        self.team1.save()
+        self.team2.save()
+
+    def test_compute_stats(self):
+        self.assertEqual(compute_stats(), {
+            self.player1.id: (0, 0, 1),
+            self.player2.id: (0, 1, 0),
+        })
+        self.assertEqual(compute_stats([self.player2]), {
+            self.player2.id: (0, 1, 0),
+        })
+
+    def test_get_stats_creates_missing_stats(self):
+        stats = get_stats(self.player2)
+
+        self.assertEqual(stats.loss_count, 1)
+        self.assertEqual(PlayerStats.objects.get(player=self.player2), stats)
+
+    def test_get_stats_existing_stats(self):
+        PlayerStats(player=self.player1, win_count=5).save()
+        player = Player.objects.get(pk=self.player1.id)
+
+        with self.assertNumQueries(1):
+            stats = get_stats(player)
+
+        self.assertEqual(stats.win_count, 5)
+        self.assertEqual(stats.in_progress_count, 0)
+
+    def test_record_results(self):
+        get_stats(self.player1)
+        get_stats(self.player2)
+
+        record_games_started([self.team1, self.team2, self.team2])
+        record_loss(self.team2)
+        record_win(self.team1)
+
+        stats1 = PlayerStats.objects.get(player=self.player1)
+        stats2 = PlayerStats.objects.get(player=self.player2)
+        self.assertEqual(
+            (stats1.win_count, stats1.loss_count, stats1.in_progress_count),
+            (1, 0, 1)
+        )
+        self.assertEqual(
+            (stats2.win_count, stats2.loss_count, stats2.in_progress_count),
+            (0, 2, 1)
+        )
+        self.assertEqual((stats1.games_played, stats1.win_rate), (1, 1000))
+        self.assertEqual((stats2.games_played, stats2.win_rate), (2, 0))
+
+    def test_record_results_win_rate(self):
+        stats = PlayerStats(player=self.player1, win_count=1, loss_count=1)
+        stats.update_ranking()
+        stats.save()
+
+        record_win(self.team1)
+        stats = PlayerStats.objects.get(player=self.player1)
+        self.assertEqual((stats.games_played, stats.win_rate), (3, 666))
+
+        record_loss(self.team1)
+        stats = PlayerStats.objects.get(player=self.player1)
+        self.assertEqual((stats.games_played, stats.win_rate), (4, 500))
@@ -1,9 +1,12 @@
+import json
+
 from django.contrib.auth.models import User
 from django.core.urlresolvers import reverse
 from django.test import TestCase
 from pyquery import PyQuery
 
 from players.models import Player
+from players.models import PlayerStats
 
 
 class PlayerProfileViewTestCase(TestCase):
@@ -26,3 +29,64 @@ class PlayerProfileViewTestCase(TestCase):
         pq = PyQuery(resp.content)
 
         self.assertEqual(pq('h2').text(), user.username)
+
+    def test_user_named_leaderboard(self):
+        user = User.objects.create_user('leaderboard', '', 'password')
+        player = Player(user=user)
+        player.save()
+
+        url = reverse('player_profile', args=[user.username])
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        pq = PyQuery(resp.content)
+
+        self.assertEqual(pq('h2').text(), user.username)
+
+
+class LeaderboardViewTestCase(TestCase):
+
+    def setUp(self):
+        for i, win_count in enumerate([2, 5, 0]):
+            user = User.objects.create_user(
+                'user{}'.format(i + 1),
+                '',
+                'password'
+            )
+            player = Player(user=user)
+            player.save()
+            stats = PlayerStats(player=player, win_count=win_count)
+            stats.update_ranking()
+            stats.save()
+
+    def test_get(self):
+        url = reverse('leaderboard')
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        pq = PyQuery(resp.content)
+
+        links = [e.text() for e in pq('.leaderboard a').items()]
+        self.assertEqual(links, ['user2', 'user1'])
+        self.assertEqual(len(pq('.next-page')), 0)
+
+    def test_get_invalid_cursor(self):
+        url = reverse('leaderboard')
+        resp = self.client.get(url, {'after': 'nonsense'})
+
+        self.assertEqual(resp.status_code, 404)
+
+    def test_get_json(self):
+        url = reverse('leaderboard_json')
+        resp = self.client.get(url)
+
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content.decode('utf-8'))
+
+        self.assertEqual(
+            [entry['username'] for entry in data['entries']],
+            ['user2', 'user1']
+        )
+        self.assertEqual(data['entries'][0]['rank'], 1)
+        self.assertEqual(data['entries'][0]['win_count'], 5)
+        self.assertIsNone(data['next_cursor'])
@@ -0,0 +1,104 @@
+from collections import Counter
+
+from django.db import IntegrityError
+from django.db import transaction
+from django.db.models import Case
+from django.db.models import F
+from django.db.models import IntegerField
+from django.db.models import Sum
+from django.db.models import When
+
+from games.models import Team
+from players.models import PlayerStats
+
+
+def count_flag(**conditions):
+    return Sum(Case(
+        When(then=1, **conditions),
+        default=0,
+        output_field=IntegerField()
+    ))
+
+
+def compute_stats(players=None):
+    """Counts wins, losses and in-progress games from the Team table in a
+    single query. Returns a dict of player id to (wins, losses, in progress).
+    Players without any teams are omitted."""
+    teams = Team.objects.all()
+    if players is not None:
+        teams = teams.filter(player__in=players)
+    rows = teams.values('player_id').annotate(
+        win_count=count_flag(winner=True),
+        loss_count=count_flag(alive=False),
+        in_progress_count=count_flag(winner=False, alive=True)
+    ).order_by()
+    return {
+        row['player_id']: (
+            row['win_count'],
+            row['loss_count'],
+            row['in_progress_count']
+        )
+        for row in rows
+    }
+
+
+def get_stats(player):
+    """Returns a player's PlayerStats, computing and storing them from the
+    Team table if the player has none yet."""
+    try:
+        return player.stats
+    except PlayerStats.DoesNotExist:
+        pass
+
+    win_count, loss_count, in_progress_count = compute_stats(
+        [player]
+    ).get(player.id, (0, 0, 0))
+    stats = PlayerStats(
+        player=player,
+        win_count=win_count,
+        loss_count=loss_count,
+        in_progress_count=in_progress_count
+    )
+    stats.update_ranking()
+    try:
+        with transaction.atomic():
+            stats.save(force_insert=True)
+    except IntegrityError:
+        # Created concurrently by another request
+        stats = PlayerStats.objects.get(player=player)
+    player.stats = stats
+    return stats
+
+
+def record_games_started(teams):
+    """Counts a new in-progress game for the player of each team. Players
+    without PlayerStats are skipped, as get_stats computes them in full."""
+    multiplicities = Counter(team.player_id for team in teams)
+    player_ids_by_count = {}
+    for player_id, count in multiplicities.items():
+        player_ids_by_count.setdefault(count, []).append(player_id)
+
+    for count, player_ids in player_ids_by_count.items():
+        PlayerStats.objects.filter(player_id__in=player_ids).update(
+            in_progress_count=F('in_progress_count') + count
+        )
+
+
+def record_loss(team):
+    """Moves a finished game from in-progress to lost for a team's player."""
+    PlayerStats.objects.filter(player_id=team.player_id).update(
+        in_progress_count=F('in_progress_count') - 1,
+        loss_count=F('loss_count') + 1,
+        games_played=F('games_played') + 1,
+        win_rate=F('win_count') * 1000 / (F('games_played') + 1)
+    )
+
+
+def record_win(team):
+    """Moves a finished game from in-progress to won for a team's player."""
+    PlayerStats.objects.filter(player_id=team.player_id).update(
+        in_progress_count=F('in_progress_count') - 1,
+        win_count=F('win_count') + 1,
+        games_played=F('games_played') + 1,
+        win_rate=(F('win_count') + 1) * 1000 / (F('games_played') + 1)
+    )
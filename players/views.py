@@ -1,9 +1,10 @@
-from django.contrib.auth.models import User
 from django.http import Http404
+from django.http import JsonResponse
 from django.shortcuts import render
 from django.views.generic import View
 
 from players.models import Player
+from players.presentation import LeaderboardPresenter
 from players.presentation import PlayerPresenter
 
 
@@ -13,13 +14,47 @@ class PlayerProfileView(View):
 
     def get(self, request, username, *args, **kwargs):
         try:
-            user = User.objects.get(username=username)
-        except User.DoesNotExist:
+            player = Player.objects.select_related('user', 'stats').get(
+                user__username=username
+            )
+        except Player.DoesNotExist:
             raise Http404("Member does not exist")
 
-        player = Player.objects.get(user=user)
-
         context = {
             'player': PlayerPresenter.from_player(player),
         }
         return render(request, self.template_name, context)
+
+
+class LeaderboardView(View):
+
+    template_name = 'players/leaderboard.html'
+
+    def get(self, request, *args, **kwargs):
+        try:
+            leaderboard = LeaderboardPresenter.from_cursor(
+                request.GET.get('after')
+            )
+        except ValueError:
+            raise Http404("Leaderboard page does not exist")
+
+        context = {
+            'leaderboard': leaderboard,
+        }
+        return render(request, self.template_name, context)
+
+
+class LeaderboardJsonView(View):
+
+    def get(self, request, *args, **kwargs):
+        try:
+            leaderboard = LeaderboardPresenter.from_cursor(
+                request.GET.get('after')
+            )
+        except ValueError:
+            raise Http404("Leaderboard page does not exist")
+
+        return JsonResponse({
+            'entries': [entry._asdict() for entry in leaderboard.entries],
+            'next_cursor': leaderboard.next_cursor,
+        })
@@ -1,3 +1,116 @@
 $(document).ready(function() {
-    
-});
\ No newline at end of file
+    var POLL_INTERVAL = 3000;
+
+    var $game = $('#game');
+    if ($game.length === 0) {
+        return;
+    }
+
+    var shotsUrl = $game.data('shots-url');
+    var eventsUrl = $game.data('events-url');
+    var turn = parseInt($game.data('turn'), 10);
+    var playerTeamId = parseInt($game.data('player-team-id'), 10);
+    var isPlayerNext = $game.data('player-next') === true;
+
+    function boardFor(teamId) {
+        return $game.find('.board[data-team-id="' + teamId + '"]');
+    }
+
+    function columnName(x) {
+        var name = '';
+        for (x += 1; x > 0; x = Math.floor((x - 1) / 26)) {
+            name = String.fromCharCode(65 + (x - 1) % 26) + name;
+        }
+        return name;
+    }
+
+    function applyShot(shot) {
+        var $board = boardFor(shot.defending_team_id);
+        var $tile = $board.find(
+            '[data-x="' + shot.x + '"][data-y="' + shot.y + '"]'
+        );
+
+        // Large boards only list the tiles which have been marked
+        if ($tile.length === 0) {
+            $tile = $('<li>')
+                .attr({'data-x': shot.x, 'data-y': shot.y})
+                .text(columnName(shot.x) + shot.y)
+                .appendTo($board.find('.board-marks'));
+        }
+        // Heatmaps are only redrawn on reload, but shot tiles can't
+        // hold a ship the player doesn't know about
+        $tile.removeClass('heat-1 heat-2 heat-3 heat-4 heat-5');
+        $tile.addClass('tile-hit');
+        if (shot.result !== 'miss') {
+            $tile.addClass('tile-occupied');
+        }
+    }
+
+    function applyTeam(team) {
+        var status = '';
+        if (team.winner) {
+            status = ' - Winner!';
+        } else if (!team.alive) {
+            status = ' - defeated';
+        }
+        // Teams of large games may be listed without their boards
+        $game.find('[data-team-id="' + team.id + '"] .team-status')
+            .text(status);
+    }
+
+    function applyTurn(data) {
+        turn = Math.max(turn, data.turn);
+
+        // The attack form is only rendered for the next player, so
+        // reload once it becomes this player's turn.
+        if (data.next_team_id === playerTeamId && !isPlayerNext) {
+            window.location.reload();
+        }
+    }
+
+    function fetchShots() {
+        return $.getJSON(shotsUrl, {since: turn}).done(function(data) {
+            $.each(data.shots, function(i, shot) {
+                applyShot(shot);
+            });
+            $.each(data.teams || [], function(i, team) {
+                applyTeam(team);
+            });
+            applyTurn(data);
+        });
+    }
+
+    function poll() {
+        fetchShots().always(function() {
+            setTimeout(poll, POLL_INTERVAL);
+        });
+    }
+
+    function listen() {
+        var source = new EventSource(eventsUrl);
+
+        // Catch up on anything missed before (re)connecting.
+        source.onopen = fetchShots;
+
+        source.addEventListener('shot', function(e) {
+            applyShot(JSON.parse(e.data));
+        });
+        source.addEventListener('defeated', function(e) {
+            var data = JSON.parse(e.data);
+            applyTeam({id: data.team_id, alive: false, winner: false});
+        });
+        source.addEventListener('winner', function(e) {
+            var data = JSON.parse(e.data);
+            applyTeam({id: data.team_id, alive: true, winner: true});
+        });
+        source.addEventListener('turn', function(e) {
+            applyTurn(JSON.parse(e.data));
+        });
+    }
+
+    if (window.EventSource && eventsUrl) {
+        listen();
+    } else {
+        setTimeout(poll, POLL_INTERVAL);
+    }
+});